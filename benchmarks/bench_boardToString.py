@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+'''
+Regression benchmark for the GBB serializer. The concatenating serializer
+the board used to have is kept here as a reference; the per-cell cost of
+boardToString should stay flat as boards grow.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_boardToString.py [cells ...]
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'pygobstones'))
+from gui.views.boardPrint.parseBoard import Board, Cell, boardToString
+
+DEFAULT_CELLS = [10000, 40000, 160000]
+
+# The concatenating serializer is quadratic; past this it takes minutes
+CONCATENATING_LIMIT = 40000
+
+
+def concatenatingBoardToString(board):
+    text = 'GBB/1.0\n'
+    text = text + 'size ' + str(board.size[0]) + ' ' + str(board.size[1]) + '\n'
+    cells = ''
+    for pos in board.cells.keys():
+        stones = board.cells[pos].stones
+        cells = cells + 'cell ' + str(pos[0]) + ' ' + str(pos[1]) + ' '
+        for c in ['blue', 'black', 'red', 'green']:
+            if c == 'blue':
+                cells = cells + 'Azul ' + str(stones[c]) + ' '
+            elif c == 'black':
+                cells = cells + 'Negro ' + str(stones[c]) + ' '
+            elif c == 'red':
+                cells = cells + 'Rojo ' + str(stones[c]) + ' '
+            elif c == 'green':
+                cells = cells + 'Verde ' + str(stones[c]) + '\n'
+    text = text + cells
+    return text + 'head ' + str(board.head[0]) + ' ' + str(board.head[1]) + '\n'
+
+
+def generateBoard(cells):
+    side = int(round(cells ** 0.5))
+    board = Board((side, side), {}, (0, 0))
+    for x in range(side):
+        for y in range(side):
+            board.addCell((x, y), Cell(random.randint(0, 30), random.randint(0, 30),
+                                       random.randint(0, 30), random.randint(0, 30)))
+    return board
+
+
+def best(function, board, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        function(board)
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or DEFAULT_CELLS
+    print('%10s %22s %22s' % ('cells', 'concatenating (us/cell)',
+                              'boardToString (us/cell)'))
+    for cells in sizes:
+        board = generateBoard(cells)
+        total = len(board.cells)
+        if total <= CONCATENATING_LIMIT:
+            concatenating = '%22.3f' % (
+                best(concatenatingBoardToString, board) * 1000000.0 / total,)
+        else:
+            concatenating = '%22s' % ('-',)
+        print('%10d %s %22.3f' % (total, concatenating,
+                                  best(boardToString, board) * 1000000.0 / total))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+'''
+Memory and throughput of board cells: creation, stone access and the
+getAllStones key used by clothings. The dict based cell the board used to
+have is kept here as a reference.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_cell.py [cells]
+'''
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'pygobstones'))
+from gui.views.boardPrint.parseBoard import Cell
+
+
+class DictCell(object):
+
+    def __init__(self, blues=0, blacks=0, reds=0, greens=0):
+        self.stones = {"blue": blues, "black": blacks, "red": reds,
+                "green": greens}
+
+    def getStones(self, color):
+        return self.stones[color]
+
+    def getAllStones(self):
+        return (str(self.stones['blue']),
+                str(self.stones['black']),
+                str(self.stones['red']),
+                str(self.stones['green']),
+                )
+
+
+def footprint(cell):
+    size = sys.getsizeof(cell)
+    if hasattr(cell, '__dict__'):
+        size += sys.getsizeof(cell.__dict__)
+        attributes = cell.__dict__.values()
+    else:
+        attributes = [getattr(cell, name) for name in cell.__slots__]
+    return size + sum(sys.getsizeof(attribute) for attribute in attributes
+                      if isinstance(attribute, (dict, tuple)))
+
+
+def timed(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+
+def create(cellClass, n):
+    return [cellClass(i % 7, i % 5, i % 3, i % 2) for i in range(n)]
+
+
+def access(cells):
+    for cell in cells:
+        cell.getStones('blue')
+        cell.getStones('black')
+        cell.getStones('red')
+        cell.getStones('green')
+
+
+def keys(cells):
+    for _ in range(3):
+        for cell in cells:
+            cell.getAllStones()
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 200000
+    print('%10s %14s %12s %12s %12s' % ('cell', 'bytes / cell', 'create (s)',
+                                       'access (s)', 'keys x3 (s)'))
+    for cellClass in (DictCell, Cell):
+        start = time.time()
+        cells = create(cellClass, n)
+        creation = time.time() - start
+        print('%10s %14d %12.3f %12.3f %12.3f' % (
+            cellClass.__name__, footprint(cells[0]), creation,
+            timed(access, cells), timed(keys, cells)))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+'''
+Cost of syntax highlighting a large generated program, for the compiled
+highlighter and for the one that built a QRegExp per rule and per block,
+which is kept here as a reference. Two cases are measured: highlighting
+the whole document, and opening a block comment on its first line, which
+rehighlights every line below it, as typing at the top of a file does.
+
+Usage (from the repository root, needs PyQt4 and a display):
+
+    python benchmarks/bench_highlighter.py [lines ...]
+'''
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'pygobstones'))
+from PyQt4 import QtCore, QtGui
+from gui.textEditor import (GobstonesHighlighter, HighlightingBlockRule,
+    HighlightingRegExpRule, BlockState)
+
+DEFAULT_LINES = [1000, 5000]
+
+PROCEDURE = '''procedure PonerN_%d(n, color)
+  {- Pone n bolitas de color -}
+  {
+  repeat (n) { Poner(color) }
+  if (hayBolitas(Rojo) && puedeMover(Norte)) { Mover(Norte) }
+  else { Sacar(Azul) } -- nothing else
+  x := nroBolitas(Verde) + 2 * 3
+  while (x > 0 && not puedeMover(Este)) { x := x - 1 }
+  }
+'''
+
+
+class PerBlockRegExpHighlighter(GobstonesHighlighter):
+
+    def highlightBlock(self, text):
+        prev_block_state = self.previousBlockState()
+        block_state = BlockState.NONE
+        begin_comment_index = len(text)
+        end_comment_index = None
+        comment_format = None
+
+        for rule in self.highlightingRules:
+            if isinstance(rule, HighlightingBlockRule):
+                if prev_block_state == rule.expected_state:
+                    begin_comment_index = 0
+                    if text.lastIndexOf(rule.end) == -1:
+                        end_comment_index = len(text)
+                        block_state = rule.expected_state
+                    else:
+                        block_state = BlockState.NONE
+                        end_comment_index = text.lastIndexOf(rule.end) + len(rule.end)
+                    comment_format = rule.format
+                elif prev_block_state <= BlockState.NONE and text.indexOf(rule.begin) != -1 and text.indexOf(rule.begin) < begin_comment_index:
+                    begin_comment_index = text.indexOf(rule.begin)
+                    if text.lastIndexOf(rule.end) == -1 or (text.lastIndexOf(rule.end) == text.indexOf(rule.begin) and text.lastIndexOf(rule.end) != -1):
+                        end_comment_index = len(text)
+                        block_state = rule.expected_state
+                    else:
+                        end_comment_index = text.lastIndexOf(rule.end) + len(rule.end)
+                        block_state = BlockState.NONE
+                    comment_format = rule.format
+            elif isinstance(rule, HighlightingRegExpRule):
+                expression = QtCore.QRegExp(rule.pattern)
+                index = expression.indexIn(text)
+                while index >= 0:
+                    length = expression.matchedLength()
+                    self.setFormat(index, length, rule.format)
+                    index = expression.indexIn(text, index + length)
+
+        if not comment_format is None:
+            self.setFormat(begin_comment_index, end_comment_index, comment_format)
+
+        if prev_block_state > BlockState.NONE and block_state <= BlockState.NONE and comment_format is None:
+            block_state = prev_block_state
+            comment_rule = filter(lambda r: isinstance(r, HighlightingBlockRule) and r.expected_state == block_state, self.highlightingRules)[0]
+            self.setFormat(0, len(text), comment_rule.format)
+
+        self.setCurrentBlockState(block_state)
+
+
+def generateProgram(lines):
+    procedures = [PROCEDURE % (number,)
+                  for number in range(lines // PROCEDURE.count('\n') + 1)]
+    return ''.join(procedures) + 'program { PonerN_0(3, Rojo) }\n'
+
+
+def bench(highlighter_class, text):
+    document = QtGui.QTextDocument()
+    document.setPlainText(text)
+    highlighter = highlighter_class(document)
+    start = time.time()
+    highlighter.rehighlight()
+    whole = time.time() - start
+
+    cursor = QtGui.QTextCursor(document)
+    start = time.time()
+    cursor.insertText('{-')
+    top = time.time() - start
+    return document.blockCount(), whole, top
+
+
+def main(argv):
+    application = QtGui.QApplication(sys.argv)
+    sizes = [int(arg) for arg in argv] or DEFAULT_LINES
+    print('%-12s %8s %12s %16s' % ('highlighter', 'lines', 'whole (s)',
+                                   'edit at top (s)'))
+    for lines in sizes:
+        text = generateProgram(lines)
+        for name, highlighter_class in [('per block', PerBlockRegExpHighlighter),
+                                        ('compiled', GobstonesHighlighter)]:
+            blocks, whole, top = bench(highlighter_class, text)
+            print('%-12s %8d %12.3f %16.3f' % (name, blocks, whole, top))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+'''
+Latency from the moment a worker sends a message to the moment the GUI
+side gets it, comparing the timer poll ProgramRun used to have with the
+MessageReader thread. The Qt signal hop to the GUI thread is not included.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_messageLatency.py [messages] [poll period (s)]
+'''
+
+import os
+import sys
+import time
+import random
+import Queue as queue
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygobstones.commons.concurrent as concurrent
+from pygobstones.commons.messaging import MessageCommunicator, MessageReader
+
+
+def sender(communicator, messages, seed):
+    random.seed(seed)
+    for _ in range(messages):
+        time.sleep(random.uniform(0, 0.05))
+        communicator.send('LOG', time.time())
+    communicator.send('OK', time.time())
+
+
+def startSender(messages):
+    communicator = MessageCommunicator(concurrent.Queue(), concurrent.Queue())
+    process = concurrent.Process(target=sender,
+                                 args=(communicator.opposite(), messages, 1))
+    process.start()
+    return communicator, process
+
+
+def polling(messages, period):
+    communicator, process = startSender(messages)
+    latencies = []
+    while True:
+        time.sleep(period)
+        try:
+            while True:
+                message = communicator.receive_nowait()
+                latencies.append(time.time() - message.body)
+                if message.header == 'OK':
+                    process.join()
+                    return latencies
+        except queue.Empty:
+            pass
+
+
+def reading(messages):
+    communicator, process = startSender(messages)
+    latencies = []
+
+    def received(message):
+        latencies.append(time.time() - message.body)
+        if message.header == 'OK':
+            reader.stop()
+
+    reader = MessageReader(communicator, received)
+    reader.start()
+    reader.join()
+    process.join()
+    return latencies
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(argv):
+    messages = int(argv[0]) if argv else 100
+    period = float(argv[1]) if len(argv) > 1 else 1.0
+    print('%16s %10s %10s %10s %10s' % ('delivery', 'p50 (ms)', 'p90 (ms)',
+                                       'p99 (ms)', 'max (ms)'))
+    for name, latencies in [('poll %.3fs' % (period,), polling(messages, period)),
+                            ('MessageReader', reading(messages))]:
+        print('%16s %10.2f %10.2f %10.2f %10.2f' % (
+            name, percentile(latencies, 0.5) * 1000,
+            percentile(latencies, 0.9) * 1000,
+            percentile(latencies, 0.99) * 1000, max(latencies) * 1000))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+'''
+Measures the per-cell cost of parsing GBB boards.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_parseBoard.py [cells ...]
+
+By default boards of 10k, 100k and 1M cells are generated, every cell with
+the four colors set, which is the worst case for the parser.
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'pygobstones'))
+from gui.views.boardPrint.parseBoard import parseABoardString
+
+DEFAULT_CELLS = [10000, 100000, 1000000]
+
+
+def generateBoardString(cells):
+    side = int(round(cells ** 0.5))
+    lines = ['GBB/1.0', 'size %d %d' % (side, side)]
+    for x in range(side):
+        for y in range(side):
+            lines.append('cell %d %d Azul %d Negro %d Rojo %d Verde %d' %
+                         (x, y, random.randint(0, 30), random.randint(0, 30),
+                          random.randint(0, 30), random.randint(0, 30)))
+    lines.extend(['head 0 0', '%%', ''])
+    return side * side, '\n'.join(lines)
+
+
+def bench(cells, repeat=3):
+    total, text = generateBoardString(cells)
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        parseABoardString(text)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return total, best
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or DEFAULT_CELLS
+    print('%10s %12s %14s' % ('cells', 'total (s)', 'per cell (us)'))
+    for cells in sizes:
+        total, elapsed = bench(cells)
+        print('%10d %12.3f %14.3f' % (total, elapsed,
+                                      elapsed * 1000000.0 / total))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch runner: runs every program matching the program globs on
+every board matching the board globs, across a pool of processes, and
+writes one JSON line per run. Qt is never imported.
+
+    python -m pygobstones.batch -p 'submissions/*.gbs' -b 'boards/*.gbb'
+
+Every run is bounded by a time limit, so one runaway submission cannot
+stall the batch. With --render-dir the final boards are also rendered to
+images, in processes of their own, which are the only ones to import Qt.
+"""
+
+from __future__ import absolute_import
+
+import argparse
+import glob
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+import time
+
+import pygobstones.gui.views.boardPrint.parseBoard as parseBoard
+from pygobstones.language.programExecution import (EjecutionFailureHandler,
+    SyncProgramRun, RunLimits, create_pool, get_worker_class)
+from pygobstones.language.boardSuite import END_OF_INPUT, RecordHandler
+
+def get_run_mode(check):
+    from pygobstoneslang import ProgramWorker
+    if check:
+        return ProgramWorker.RunMode.ONLY_CHECK
+    return ProgramWorker.RunMode.FULL
+
+
+def expand(patterns):
+    """ Sorted paths matching any of the glob patterns, without repeats """
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(os.path.expanduser(pattern)))
+    return sorted(paths)
+
+
+def read_board(filename):
+    """ Validated GBB text of a board file in the text or binary format """
+    with open(filename, 'rb') as f:
+        return parseBoard.boardToString(parseBoard.parseABoard(f.read()))
+
+
+FAILURE_KINDS = EjecutionFailureHandler({
+    EjecutionFailureHandler.LIMIT_FAILURE: 'limit',
+    EjecutionFailureHandler.STATIC_FAILURE: 'static',
+    EjecutionFailureHandler.DYNAMIC_FAILURE: 'dynamic',
+    })
+
+
+def failure_kind(exception):
+    """ limit, static, dynamic or other, chosen like failure handlers """
+    kinds = FAILURE_KINDS.get_handlers_for(exception.__class__.__name__)
+    if len(kinds) == 0:
+        return 'other'
+    return kinds[0]
+
+
+def failure_record(exception):
+    record = {'type': exception.__class__.__name__,
+              'kind': failure_kind(exception),
+              'message': getattr(exception, 'msg', str(exception))}
+    area = getattr(exception, 'area', None)
+    if not area is None:
+        position = area.interval()[0]
+        record['row'] = position.row
+        record['col'] = position.col
+    return record
+
+
+def run_task(task, pool, limits=None):
+    """ Runs a (program, board, run_mode, version) task on a worker of the
+    pool and returns its JSON record.
+    """
+    program, board, run_mode, version = task
+    record = {'program': program, 'board': board}
+    start = time.time()
+    try:
+        with open(program) as f:
+            source = f.read()
+        board_string = read_board(board)
+    except (IOError, parseBoard.BoardParseException) as exception:
+        record['status'] = 'error'
+        record['failure'] = failure_record(exception)
+        return record
+
+    handler = RecordHandler()
+    execution = SyncProgramRun(version, handler, pool=pool, limits=limits)
+    handler.execution = execution
+    result = execution.run(os.path.abspath(program), source, board_string,
+                           run_mode)
+    if isinstance(result, Exception):
+        record['status'] = 'failure'
+        record['failure'] = failure_record(result)
+    else:
+        record['status'] = 'ok'
+        record['final_board'] = result[0]
+        record['result'] = result[1]
+    record['log'] = handler.log_messages
+    record['time'] = time.time() - start
+    return record
+
+
+def flat_name(path):
+    """ Path without extension, relative to the current directory, as a
+    single file name """
+    name = os.path.splitext(os.path.relpath(path))[0]
+    return name.replace(os.sep, '_').replace('..', '')
+
+
+def image_name(program, board, extension):
+    return '%s--%s.%s' % (flat_name(program), flat_name(board), extension)
+
+
+renderers = {}
+
+
+def render_board(task):
+    """ Renders a (GBB text, image file, clothing, cell side) task. Runs in
+    a process of the render pool, and returns the image file and the error
+    that prevented rendering it, if any.
+    """
+    board_string, filename, clothing, side = task
+    try:
+        from pygobstones.gui.views.boardPrint.boardRenderer import (
+            BoardRenderer, ensureApplication)
+        ensureApplication()
+        renderer = renderers.get((clothing, side))
+        if renderer is None:
+            renderer = BoardRenderer(clothing, side)
+            renderers[(clothing, side)] = renderer
+        if not renderer.save(parseBoard.parseABoard(board_string), filename):
+            return filename, 'could not write the image'
+    except Exception as exception:
+        return filename, '%s: %s' % (exception.__class__.__name__, exception)
+    return filename, None
+
+
+class BoardImages(object):
+    """ Renders the final boards of the ok records to `directory`, on a pool
+    of `jobs` processes, while the batch goes on.
+    """
+
+    def __init__(self, directory, clothing='Gobstones.xml', side=40,
+                 extension='png', jobs=None):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        if clothing != 'Gobstones.xml':
+            clothing = os.path.abspath(clothing)
+        self.directory = directory
+        self.clothing = clothing
+        self.side = side
+        self.extension = extension
+        self.processes = multiprocessing.Pool(jobs)
+        self.renders = []
+
+    def submit(self, record):
+        """ Starts rendering the final board of the record and adds the
+        file it goes to as its image """
+        filename = os.path.join(self.directory, image_name(
+            record['program'], record['board'], self.extension))
+        record['image'] = filename
+        self.renders.append(self.processes.apply_async(render_board,
+            ((record['final_board'], filename, self.clothing, self.side),)))
+
+    def close(self):
+        """ Waits for every image and returns the (file, error) pairs of the
+        ones that could not be rendered """
+        self.processes.close()
+        self.processes.join()
+        failures = [render.get() for render in self.renders]
+        return [failure for failure in failures if not failure[1] is None]
+
+
+def run_batch(tasks, out, jobs=None, limits=None, pool=None, images=None):
+    """ Runs the tasks on `jobs` worker processes at a time, writing their
+    records to `out` as they finish. Each worker is supervised from a
+    thread of this process, which kills it if it goes over the limits.
+    The final boards of the runs that end are handed to `images`, if any.
+    Returns the number of runs and the seconds it took.
+    """
+    jobs = jobs or multiprocessing.cpu_count()
+    if pool is None:
+        pool = create_pool(get_worker_class(), size=jobs, use_threads=False)
+    start = time.time()
+    runs = 0
+    supervisors = multiprocessing.pool.ThreadPool(jobs)
+    try:
+        for record in supervisors.imap_unordered(
+                lambda task: run_task(task, pool, limits), tasks):
+            if not images is None and record['status'] == 'ok':
+                images.submit(record)
+            out.write(json.dumps(record, default=repr) + '\n')
+            runs += 1
+    finally:
+        supervisors.close()
+        supervisors.join()
+        pool.shutdown()
+    return runs, time.time() - start
+
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog='python -m pygobstones.batch',
+        description='Runs Gobstones programs on boards without the GUI.')
+    parser.add_argument('-p', '--programs', action='append', required=True,
+                        metavar='GLOB', help='programs to run (.gbs)')
+    parser.add_argument('-b', '--boards', action='append', required=True,
+                        metavar='GLOB', help='initial boards (.gbb)')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='JSON lines output, stdout by default')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='processes to use, one per CPU by default')
+    parser.add_argument('--lang', default='gobstones',
+                        choices=['gobstones', 'xgobstones'])
+    parser.add_argument('--check', action='store_true',
+                        help='only check the programs, do not run them')
+    parser.add_argument('--time-limit', type=float, default=10.0,
+                        metavar='SECONDS', help='wall time of each run')
+    parser.add_argument('--call-limit', type=int, default=None,
+                        metavar='CALLS',
+                        help='function calls a worker may make for a run, '
+                             'parsing and compiling the program included')
+    parser.add_argument('--memory-limit', type=int, default=None,
+                        metavar='MB', help='resident memory of each worker')
+    parser.add_argument('--cache', action='store_true',
+                        help='keep static verdicts in ~/.pygobstones/cache')
+    parser.add_argument('--render-dir', metavar='DIR', default=None,
+                        help='render the final boards to images in DIR')
+    parser.add_argument('--render-format', default='png',
+                        choices=['png', 'jpg', 'bmp', 'svg'],
+                        help='format of the rendered boards')
+    parser.add_argument('--clothing', metavar='FILE', default='Gobstones.xml',
+                        help='clothing of the rendered boards')
+    parser.add_argument('--cell-size', type=int, default=40, metavar='PIXELS',
+                        help='side of the cells of the rendered boards')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    run_mode = get_run_mode(arguments.check)
+    memory = arguments.memory_limit
+    limits = RunLimits(arguments.time_limit, arguments.call_limit,
+                       memory and memory * 2 ** 20)
+    tasks = [(program, board, run_mode, arguments.lang)
+             for program in expand(arguments.programs)
+             for board in expand(arguments.boards)]
+    if arguments.output is None:
+        out = sys.stdout
+    else:
+        out = open(arguments.output, 'w')
+    try:
+        jobs = arguments.jobs or multiprocessing.cpu_count()
+        pool = create_pool(get_worker_class(), size=jobs, use_threads=False,
+                           persist_verdicts=arguments.cache)
+        images = None
+        if not arguments.render_dir is None:
+            images = BoardImages(arguments.render_dir, arguments.clothing,
+                                 arguments.cell_size, arguments.render_format,
+                                 jobs)
+        runs, seconds = run_batch(tasks, out, jobs, limits, pool, images)
+    finally:
+        if not out is sys.stdout:
+            out.close()
+    if not images is None:
+        for filename, error in images.close():
+            sys.stderr.write('%s not rendered: %s\n' % (filename, error))
+    sys.stderr.write('%d runs in %.2f s (%.1f runs/s)\n' %
+                     (runs, seconds, runs / seconds if seconds else 0.0))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
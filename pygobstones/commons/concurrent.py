@@ -1,6 +1,10 @@
 import threading
 import multiprocessing
+import multiprocessing.sharedctypes
 
 Queue = multiprocessing.Queue
+Pipe = multiprocessing.Pipe
 Process = multiprocessing.Process
-Thread = threading.Thread
\ No newline at end of file
+Thread = threading.Thread
+RawArray = multiprocessing.sharedctypes.RawArray
+RawValue = multiprocessing.sharedctypes.RawValue
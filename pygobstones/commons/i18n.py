@@ -123,6 +123,9 @@ ES = {
     'Execution completed':
     'Ejecución finalizada',
 
+    'The final board could not be read':
+    'No se pudo leer el tablero final',
+
     'Open board editor':
     'Abre el editor de tableros',
 
@@ -187,6 +190,8 @@ ES = {
 
     'show logger': 'Mostrar logger',
 
+    'save the log to a file': 'Guardar el log en un archivo',
+
     'show rose of winds image': 'Mostrar imagen de rosa de los vientos',
 
     'show cell numbers': 'Mostrar números de celdas',
@@ -215,6 +220,38 @@ ES = {
 
     'Check failed': 'Ocurrió un problema en el Chequeo',
 
+    'Execution limit reached': 'Se alcanzó un límite de ejecución',
+
+    'Run on a board directory...': 'Ejecutar en un directorio de tableros...',
+
+    'Run on random boards...': 'Ejecutar en tableros aleatorios...',
+
+    'Runs the current program on every board of a directory':
+        'Ejecuta el programa actual en cada tablero de un directorio',
+
+    'Runs the current program on random boards':
+        'Ejecuta el programa actual en tableros aleatorios',
+
+    'Number of boards:': 'Cantidad de tableros:',
+
+    'There are no boards in the directory':
+        'No hay tableros en el directorio',
+
+    'Board suite': 'Conjunto de tableros',
+
+    'Outcome': 'Resultado',
+
+    'Time': 'Tiempo',
+
+    'Message': 'Mensaje',
+
+    'Waiting': 'En espera',
+
+    'Invalid board': 'Tablero inválido',
+
+    '{0} of {1} boards run, {2} completed':
+        '{0} de {1} tableros ejecutados, {2} completos',
+
     'Error saving the file': 'Error al guardar el archivo',
 
     'The file name dont be equals to library':
@@ -1,19 +1,194 @@
+import ctypes
+import Queue as queue
 import pygobstones.commons.concurrent as concurrent
 
+""" Transports for create_channel """
+THREAD = 'thread'
+QUEUE = 'queue'
+PIPE = 'pipe'
+SHARED_MEMORY = 'shared_memory'
+
 class Message:
     def __init__(self, header, body = None):
         self.header = header
         self.body = body
         
 class MessageCommunicator: 
-    def __init__(self, queue_in=concurrent.Queue(), queue_out=concurrent.Queue()):
+    def __init__(self, queue_in=None, queue_out=None):
+        if queue_in is None:
+            queue_in = concurrent.Queue()
+        if queue_out is None:
+            queue_out = concurrent.Queue()
         self.queue_in = queue_in
         self.queue_out = queue_out
     def send(self, header, body=None):
         self.queue_out.put(Message(header, body))
-    def receive(self):
-        return self.queue_in.get()        
+    def receive(self, timeout=None):
+        return self.queue_in.get(True, timeout)
     def receive_nowait(self):
         return self.queue_in.get_nowait()
+    def flush(self):
+        """ Waits until the sent messages are written, closing the queue """
+        if hasattr(self.queue_out, 'join_thread'):
+            self.queue_out.close()
+            self.queue_out.join_thread()
     def opposite(self):
-        return MessageCommunicator(self.queue_out, self.queue_in)
\ No newline at end of file
+        return MessageCommunicator(self.queue_out, self.queue_in)
+
+class PipeCommunicator:
+    """ Communicator over the two ends of a duplex pipe. Like the queue
+    based one, receiving raises Queue.Empty when the timeout expires.
+    """
+    def __init__(self, connection=None, other_end=None):
+        if connection is None:
+            connection, other_end = concurrent.Pipe()
+        self.connection = connection
+        self.other_end = other_end
+    def send(self, header, body=None):
+        self.connection.send(Message(header, body))
+    def receive(self, timeout=None):
+        if not timeout is None and not self.connection.poll(timeout):
+            raise queue.Empty()
+        return self.connection.recv()
+    def receive_nowait(self):
+        return self.receive(0)
+    def flush(self):
+        pass
+    def opposite(self):
+        return PipeCommunicator(self.other_end, self.connection)
+
+class SharedPayload:
+    """ Placeholder sent instead of a payload stored in a SharedRing """
+    def __init__(self, start, length):
+        self.start = start
+        self.length = length
+
+class SharedRing:
+    """ Single producer, single consumer byte ring in shared memory. The
+    producer only moves `head` and the consumer only moves `tail`, and
+    payloads are read in the order they were written, as messages arrive
+    in order through the queue that carries their SharedPayload.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = concurrent.RawArray(ctypes.c_char, capacity)
+        self.head = concurrent.RawValue(ctypes.c_ulonglong, 0)
+        self.tail = concurrent.RawValue(ctypes.c_ulonglong, 0)
+    def write(self, data):
+        """ Stores data and returns its SharedPayload, or None if there is
+        no room for it right now.
+        """
+        length = len(data)
+        start = self.head.value
+        if length > self.capacity - (start - self.tail.value):
+            return None
+        address = ctypes.addressof(self.buffer)
+        offset = start % self.capacity
+        first = min(length, self.capacity - offset)
+        ctypes.memmove(address + offset, data, first)
+        if first < length:
+            ctypes.memmove(address, data[first:], length - first)
+        self.head.value = start + length
+        return SharedPayload(start, length)
+    def read(self, payload):
+        address = ctypes.addressof(self.buffer)
+        offset = payload.start % self.capacity
+        first = min(payload.length, self.capacity - offset)
+        data = ctypes.string_at(address + offset, first)
+        if first < payload.length:
+            data += ctypes.string_at(address, payload.length - first)
+        self.tail.value = payload.start + payload.length
+        return data
+
+class SharedMemoryCommunicator:
+    """ Sends strings of at least `threshold` bytes, on their own or as
+    items of a tuple body, through a shared memory ring instead of
+    pickling them into the queue. Falls back to the queue when the ring
+    is full.
+    """
+    def __init__(self, communicator=None, ring_out=None, ring_in=None,
+                 capacity=16 * 1024 * 1024, threshold=64 * 1024):
+        if communicator is None:
+            communicator = MessageCommunicator()
+            ring_out = SharedRing(capacity)
+            ring_in = SharedRing(capacity)
+        self.communicator = communicator
+        self.ring_out = ring_out
+        self.ring_in = ring_in
+        self.threshold = threshold
+    def send(self, header, body=None):
+        if isinstance(body, tuple):
+            body = tuple([self.store(item) for item in body])
+        else:
+            body = self.store(body)
+        self.communicator.send(header, body)
+    def store(self, item):
+        if isinstance(item, str) and len(item) >= self.threshold:
+            return self.ring_out.write(item) or item
+        return item
+    def load(self, item):
+        if isinstance(item, SharedPayload):
+            return self.ring_in.read(item)
+        return item
+    def loaded(self, message):
+        if isinstance(message.body, tuple):
+            message.body = tuple([self.load(item) for item in message.body])
+        else:
+            message.body = self.load(message.body)
+        return message
+    def receive(self, timeout=None):
+        return self.loaded(self.communicator.receive(timeout))
+    def receive_nowait(self):
+        return self.loaded(self.communicator.receive_nowait())
+    def flush(self):
+        self.communicator.flush()
+    def opposite(self):
+        return SharedMemoryCommunicator(self.communicator.opposite(),
+                                        self.ring_in, self.ring_out,
+                                        threshold=self.threshold)
+
+def create_channel(transport=QUEUE, **options):
+    """ Returns one end of a new channel, with its own queues, pipe or
+    shared memory; `opposite` gives the other end. THREAD channels only
+    work between threads of a process. Options are passed to the
+    SharedMemoryCommunicator.
+    """
+    if transport == THREAD:
+        return MessageCommunicator(queue.Queue(), queue.Queue())
+    elif transport == QUEUE:
+        return MessageCommunicator()
+    elif transport == PIPE:
+        return PipeCommunicator()
+    elif transport == SHARED_MEMORY:
+        return SharedMemoryCommunicator(**options)
+    raise ValueError('Unknown transport %s' % (transport,))
+
+class MessageReader(concurrent.Thread):
+    """ Background thread that hands every message received by a
+    communicator to `callback` as soon as it arrives. The queue is read
+    with a timeout so that `stop` takes effect within `poll_interval`,
+    and the reader ends by itself after a message whose header is in
+    `until`. Owners `stop` and `join` it once they are done with it.
+    """
+    def __init__(self, communicator, callback, poll_interval=0.1, until=()):
+        concurrent.Thread.__init__(self)
+        self.daemon = True
+        self.communicator = communicator
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.until = until
+        self.stopped = False
+    def run(self):
+        while not self.stopped:
+            try:
+                message = self.communicator.receive(self.poll_interval)
+            except queue.Empty:
+                continue
+            except (EOFError, IOError):
+                break
+            if not self.stopped:
+                self.callback(message)
+            if message.header in self.until:
+                break
+    def stop(self):
+        self.stopped = True
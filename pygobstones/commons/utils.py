@@ -1,4 +1,7 @@
 import os
+import time
+import logging
+from contextlib import contextmanager
 
 def read_file(fn):
     f = open(fn, 'r')
@@ -13,3 +16,22 @@ def clothing_dir_for_file(filepath):
 
 def clothing_for_file_exists(filepath):
     return os.path.exists(clothing_dir_for_file(str(filepath)))
+
+
+# Profiling
+
+TIMING_LOGGER = 'pygobstones.timing'
+
+def timing_logger():
+    """ Logger of the timings, which emits INFO records once the
+    application logger is set up """
+    return logging.getLogger(TIMING_LOGGER)
+
+@contextmanager
+def log_time(logger, label, level=logging.INFO):
+    """ Logs at `level` how long the enclosed block took """
+    start = time.time()
+    try:
+        yield
+    finally:
+        logger.log(level, '%s: %.3f s', label, time.time() - start)
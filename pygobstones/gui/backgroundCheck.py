@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from PyQt4 import QtCore
+from pygobstones.language.programRun import *
+
+
+class BackgroundCheckHandler(EjecutionHandler):
+
+    def __init__(self, backgroundCheck):
+        self.backgroundCheck = backgroundCheck
+
+    def success(self, board_string, result):
+        self.backgroundCheck.checkFinished(None)
+
+    def failure(self, exception):
+        self.backgroundCheck.checkFinished(exception)
+
+
+class BackgroundCheck(QtCore.QObject):
+    """ Checks the program being edited once the user stops typing for
+    DELAY milliseconds. It has its own ProgramRun and worker pool, so it
+    never stops or waits for a Run, and shares the verdicts of the main
+    pool, so an explicit Check of a program already checked here is
+    answered at once. Edits made while a check runs are checked after it.
+    `checked` is emitted with None when the program is OK, or with the
+    failure. A static check does not look at the board, so the smallest
+    one is sent instead of the user's.
+    """
+
+    DELAY = 600
+    CHECK_BOARD = 'GBB/1.0\nsize 1 1\nhead 0 0\n%%\n'
+    TIME_LIMIT = 10.0
+    checked = QtCore.pyqtSignal(object)
+
+    def __init__(self, mainW, verdicts=None):
+        super(BackgroundCheck, self).__init__()
+        self.mainW = mainW
+        self.pending = False
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DELAY)
+        self.timer.timeout.connect(self.check)
+        pool = create_pool(get_worker_class(), size=1, verdicts=verdicts)
+        self.programRun = ProgramRun(mainW.getLang(),
+                                     BackgroundCheckHandler(self), pool=pool,
+                                     limits=RunLimits(wall_time=self.TIME_LIMIT))
+        self.programRun.warm_up()
+
+    def schedule(self):
+        """ Checks the program after DELAY, restarting the wait on each call """
+        self.timer.start()
+
+    def check(self):
+        if self.programRun.running:
+            self.pending = True
+            return
+        self.pending = False
+        try:
+            self.programRun.gobstones_version = self.mainW.getLang()
+            self.programRun.run(str(self.mainW.fileOption.getFileName()),
+                                self.mainW.programText(),
+                                self.CHECK_BOARD,
+                                ProgramRun.RunMode.ONLY_CHECK)
+        except Exception as exception:
+            if self.programRun.running:
+                self.programRun.stop()
+            self.checkFinished(exception)
+
+    def checkFinished(self, exception):
+        self.checked.emit(exception)
+        if self.pending:
+            self.schedule()
+
+    def shutdown(self):
+        self.timer.stop()
+        self.programRun.shutdown()
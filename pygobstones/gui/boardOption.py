@@ -225,10 +225,12 @@ class BoardOption(object):
     def loadBoard(self):
         filename = openFileName(self.parent, '*.gbb')
         if not filename == "":
-            fname = open(filename)
-            data = fname.read()
-            self.parent.setInitialBoard(data)
-            fname.close()
+            try:
+                self.parent.loadInitialBoardFile(filename)
+            except BoardParseException as e:
+                (filepath, name) = os.path.split(str(filename))
+                ErrorWindow(i18n('The file <{0}> has an error\n in line: {1} - column: {2}').
+                    format(name, e.line, e.column))
 
     def openBoardOptionWindow(self, generator):
         bw = BoardOptionsWindow(self.parent, generator)
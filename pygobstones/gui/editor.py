@@ -70,6 +70,12 @@ class Editor(QtGui.QWidget):
         self.ui.boardEditor.setBoard(self.board)
         self.ui.boardEditor.populate()
 
+    def loadInitialBoardFile(self, filename):
+        self.boardGenerator.loadInitialBoard(filename)
+        self.board = self.boardGenerator.getStringBoard()
+        self.ui.boardEditor.setBoard(self.board)
+        self.ui.boardEditor.populate()
+
     def setInitialBoardToMainWindow(self):
         self.board = boardToString(self.ui.boardEditor.getEditedBoard())
         self.parent.setInitialBoard(self.board)
@@ -102,14 +108,13 @@ class Editor(QtGui.QWidget):
         self.reset_combo_load()
 
     def saveBoardFromDisk(self):
-        self.board = boardToString(self.ui.boardEditor.getEditedBoard())
         filename = saveFileName(self, '*.gbb')
         if not filename == QtCore.QString(''):
             (filep, filen) = os.path.split(str(filename))
             if not filename[-4:] == '.gbb':
                 filename = filename + '.gbb'
             myFile = open(filename, 'w')
-            myFile.write(self.board)
+            writeBoard(self.ui.boardEditor.getEditedBoard(), myFile)
             myFile.close()
         self.reset_combo_persist()
 
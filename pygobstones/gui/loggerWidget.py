@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import os
+import codecs
+from PyQt4 import QtGui
+from PyQt4 import QtCore
+
+
+class LoggerWidget(QtGui.QPlainTextEdit):
+    """ Log panel. Lines are appended at the end of the document, never
+    rewriting it, and only the last `maxLines` are kept. Lines appended in
+    the same event loop tick are inserted together once control returns
+    to the loop. Every line can also be spilled to a file, which keeps the
+    whole log.
+    """
+
+    MAX_LINES = 5000
+
+    def __init__(self, parent=None, maxLines=MAX_LINES):
+        super(LoggerWidget, self).__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(maxLines)
+        self.pending = []
+        self.spillFile = None
+        self.flushTimer = QtCore.QTimer(self)
+        self.flushTimer.setSingleShot(True)
+        self.flushTimer.setInterval(0)
+        self.flushTimer.timeout.connect(self.flush)
+
+    def appendLine(self, line):
+        self.pending.append(QtCore.QString(line))
+        if not self.flushTimer.isActive():
+            self.flushTimer.start()
+
+    def flush(self):
+        if len(self.pending) == 0:
+            return
+        lines, self.pending = self.pending, []
+        text = QtCore.QStringList(lines).join('\n')
+        self.appendPlainText(text)
+        self.moveCursor(QtGui.QTextCursor.End)
+        if not self.spillFile is None:
+            self.spillFile.write(unicode(text) + u'\n')
+            self.spillFile.flush()
+
+    def clear(self):
+        self.pending = []
+        QtGui.QPlainTextEdit.clear(self)
+
+    def spillTo(self, filename):
+        """ Appends every line logged from now on to `filename` """
+        self.stopSpilling()
+        directory = os.path.dirname(filename)
+        if directory != '' and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.spillFile = codecs.open(filename, 'a', 'utf-8')
+
+    def stopSpilling(self):
+        if not self.spillFile is None:
+            self.spillFile.close()
+            self.spillFile = None
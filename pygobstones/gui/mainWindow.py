@@ -11,16 +11,22 @@ from .preferencesWindow import PreferencesWindow
 from .editOption import EditOption
 from .boardOption import *
 from .helpOption import HelpOption
+from .suiteWindow import SuiteWindow
+from .backgroundCheck import BackgroundCheck
+from .errorWindow import ErrorWindow
 from pygobstones.language.programRun import *
+from pygobstones.language.boardSuite import boards_from_directory, random_boards
 from views.boardPrint.board import *
 from views.boardPrint.boardViewer import *
 from resultsMainWindow import *
 from pygobstones.commons.i18n import *
-from pygobstones.commons.paths import root_path
+from pygobstones.commons.paths import root_path, pygobstones_user_path
+from pygobstones.commons.utils import log_time, timing_logger
 from views.boardPrint.parseBoard import *
 import time
 import views.resources
 import logging
+import multiprocessing
 
 GOBSTONES = 'Gobstones 3.0.0'
 XGOBSTONES = 'XGobstones 1.0.0'
@@ -44,7 +50,12 @@ class MainWindow(QtGui.QMainWindow):
         self.initialBoardGenerator = InitialBoardGenerator()
         self.guiInterpreterHandler = GUIInterpreterHandler(self)
         self.programRun = ProgramRun(self.getLang(),
-                                    self.guiInterpreterHandler)
+                                    self.guiInterpreterHandler,
+                                    BoardFormat.BINARY)
+        self.programRun.warm_up()
+        self.suitePool = None
+        self.suiteWindow = None
+        self.initBackgroundCheck()
         self.rootDirectory = root_path()
         self.runButton = RunButton(self, self.ui.actionRun,
              self.ui.actionStop)
@@ -81,6 +92,23 @@ class MainWindow(QtGui.QMainWindow):
         self.ui.actionLicense.triggered.connect(self.viewLicense)
         self.ui.actionAbout.triggered.connect(self.viewAbout)
         self.ui.actionCheck.triggered.connect(self.check)
+        self.ui.actionRunOnBoardDirectory.triggered.connect(self.runOnBoardDirectory)
+        self.ui.actionRunOnRandomBoards.triggered.connect(self.runOnRandomBoards)
+
+    def initBackgroundCheck(self):
+        self.backgroundCheck = BackgroundCheck(self, self.programRun.pool.verdicts)
+        self.backgroundCheck.checked.connect(self.showDiagnostic)
+        self.ui.textEditFile.edit.textChanged.connect(self.backgroundCheck.schedule)
+
+    def showDiagnostic(self, exception):
+        area = getattr(exception, 'area', None)
+        if area is None:
+            self.ui.textEditFile.setDiagnostic(None)
+        else:
+            self.ui.textEditFile.setDiagnostic(area.interval()[0].row)
+        if not exception is None and not self.programRun.running:
+            self.ui.statusbar.showMessage(QtCore.QString(i18n('Check failed') +
+                ': ' + getattr(exception, 'msg', str(exception))), 5000)
 
     def initPreferencesDictionary(self):
         global preferencesDictionary
@@ -89,8 +117,15 @@ class MainWindow(QtGui.QMainWindow):
                                  'cellNumbers': True,
                                  'lineNumbers': True,
                                  'autoIndentation': False,
+                                 'logToFile': False,
                                 }
 
+    def activateLogToFile(self, boolean):
+        if boolean:
+            self.ui.logger.spillTo(os.path.join(pygobstones_user_path(), 'log.txt'))
+        else:
+            self.ui.logger.stopSpilling()
+
     def initLoggerSize(self):
         if MainWindow.getPreference('logger'):
             self.ui.splitter.setSizes([800, 80])
@@ -110,6 +145,9 @@ class MainWindow(QtGui.QMainWindow):
     def setInitialBoard(self, board):
         self.initialBoardGenerator.setInitialBoard(board)
 
+    def loadInitialBoardFile(self, filename):
+        self.initialBoardGenerator.loadInitialBoard(filename)
+
     def setAtNothingBoardOptions(self):
         self.initialBoardGenerator.set_nothing_options()
 
@@ -186,6 +224,14 @@ class MainWindow(QtGui.QMainWindow):
 
     def closeEvent(self, event):
         self.fileOption.closeApp(event)
+        if event.isAccepted():
+            self.programRun.shutdown()
+            self.backgroundCheck.shutdown()
+            self.ui.logger.stopSpilling()
+            if not self.suiteWindow is None:
+                self.suiteWindow.close()
+            if not self.suitePool is None:
+                self.suitePool.shutdown()
 
     def loadBoard(self):
         self.boardOption.loadBoard()
@@ -280,6 +326,35 @@ class MainWindow(QtGui.QMainWindow):
         self.checkButton = CheckButton(self)
         self.checkButton.start()
 
+    def runOnBoardDirectory(self):
+        directory = QtGui.QFileDialog.getExistingDirectory(self,
+            i18n('Run on a board directory...'))
+        if not directory.isEmpty():
+            boards = boards_from_directory(str(directory))
+            if len(boards) == 0:
+                ErrorWindow(i18n('There are no boards in the directory'))
+            else:
+                self.runOnBoards(boards)
+
+    def runOnRandomBoards(self):
+        count, accepted = QtGui.QInputDialog.getInt(self,
+            i18n('Run on random boards...'), i18n('Number of boards:'),
+            100, 1, 10000)
+        if accepted:
+            self.runOnBoards(random_boards(count))
+
+    def runOnBoards(self, boards):
+        """ Runs the program on every board in parallel, on a pool of its
+        own so the Run button stays free.
+        """
+        if self.suitePool is None:
+            self.suitePool = create_pool(get_worker_class(), BoardFormat.BINARY,
+                                         size=multiprocessing.cpu_count())
+        if not self.suiteWindow is None:
+            self.suiteWindow.close()
+        self.suiteWindow = SuiteWindow(self, boards)
+        self.suiteWindow.start(self.suitePool)
+
     def changeLang(self):
         if self.lang == GOBSTONES:
             self.lang = XGOBSTONES
@@ -297,7 +372,9 @@ class MainWindow(QtGui.QMainWindow):
                             ("The languaje was changed to ") + self.lang)
         self.updateWindowTitle()
         self.programRun = ProgramRun(self.getLang(),
-            self.guiInterpreterHandler)
+            self.guiInterpreterHandler, BoardFormat.BINARY,
+            self.programRun.pool)
+        self.backgroundCheck.schedule()
 
     def getLang(self):
         if self.lang == GOBSTONES:
@@ -320,6 +397,8 @@ class GUIInterpreterHandler(EjecutionFailureHandler, EjecutionHandler):
             EjecutionFailureHandler.PARSER_FAILURE: self.interpreter_log_failure,
             EjecutionFailureHandler.STATIC_FAILURE: self.interpreter_log_failure,
             EjecutionFailureHandler.DYNAMIC_FAILURE: self.interpreter_boom_failure,
+            EjecutionFailureHandler.LIMIT_FAILURE: self.interpreter_limit_failure,
+            EjecutionFailureHandler.BOARD_FAILURE: self.interpreter_log_default_exception,
         }
         super(GUIInterpreterHandler, self).__init__(self.failure_dict)
 
@@ -334,18 +413,33 @@ class GUIInterpreterHandler(EjecutionFailureHandler, EjecutionHandler):
     def success(self, board_string, result):
         if not self.interactiveRunning:
             if not self.wasStoped:
+                logger = timing_logger()
+                try:
+                    if isBinaryBoard(board_string):
+                        with log_time(logger, 'Final board decoding'):
+                            finalBoard = parseABoardBinary(board_string)
+                    else:
+                        with log_time(logger, 'Final board line endings'):
+                            board_string = self.prepareString(board_string)
+                        with log_time(logger, 'Final board parsing'):
+                            finalBoard = parseABoardString(board_string)
+                except BoardParseException as exception:
+                    self.failure(BoardParseException(
+                        i18n('The final board could not be read') + ': ' +
+                        exception.msg, exception.line, exception.column))
+                    return
                 self.mainW.ui.statusbar.showMessage(QtCore.QString
                 (i18n('Execution completed')))
-                self.results = Results(self.mainW)
-                board = self.prepareString(board_string)
-                self.results.setInitialBoard(BoardViewer(self,
-                self.mainW.initialBoardGenerator.board, self.mainW.getClothing()))
-                self.results.setFinalBoard(BoardViewer(self,
-                parseABoardString(board), self.mainW.getClothing()))
-                self.results.setRetVars(result)
-                self.setCodeInResults()
-                self.results.ui.tabWidgetResults.setCurrentIndex(2)
-                self.results.show()
+                with log_time(logger, 'Results window creation'):
+                    self.results = Results(self.mainW)
+                    self.results.setInitialBoard(BoardViewer(self,
+                    self.mainW.initialBoardGenerator.board, self.mainW.getClothing()))
+                    self.results.setFinalBoard(BoardViewer(self,
+                    finalBoard, self.mainW.getClothing()))
+                    self.results.setRetVars(result)
+                    self.setCodeInResults()
+                    self.results.ui.tabWidgetResults.setCurrentIndex(2)
+                    self.results.show()
                 self.mainW.resetButtonsRunAndStop()
                 self.showInLog(i18n('Execution completed'))
                 self.log('----------------'+
@@ -384,18 +478,10 @@ class GUIInterpreterHandler(EjecutionFailureHandler, EjecutionHandler):
 
     def showInLog(self, msg):
         # This method not required that the state is not stopped
-        loggermsg = self.mainW.ui.logger.document().toPlainText()
-        self.mainW.ui.logger.setText(loggermsg + '\n -> ' + QtCore.QString().fromUtf8(msg))
-        self.mainW.ui.logger.moveCursor(QtGui.QTextCursor.End)
+        self.mainW.ui.logger.appendLine(' -> ' + QtCore.QString().fromUtf8(msg))
 
     def prepareString(self, board):
-        myPrettyBoard = ''
-        for s in board:
-            if not (ord(s) is 13 or ord(s) is 10):
-                myPrettyBoard += s
-            if ord(s) is 10:
-                myPrettyBoard += '\n'
-        return myPrettyBoard
+        return board.replace('\r', '')
 
     def interpreter_log_default_exception(self, exception):
         if not self.wasStoped:
@@ -414,6 +500,14 @@ class GUIInterpreterHandler(EjecutionFailureHandler, EjecutionHandler):
             self.log(exception.msg)
             self.mainW.resetButtonsRunAndStop()
 
+    def interpreter_limit_failure(self, exception):
+        if not self.wasStoped:
+            self.mainW.ui.statusbar.showMessage(QtCore.QString
+                (i18n('Execution limit reached')))
+            self.showInLog(i18n('Execution limit reached'))
+            self.log(exception.msg)
+            self.mainW.resetButtonsRunAndStop()
+
     def showRowAndColError(self, exception):
         self.showInLog(i18n('In row: ') +
         str(exception.area.interval()[0].row) + ' // ' +
@@ -461,9 +555,15 @@ class RunButton(QtGui.QWidget):
 
     def start(self, interpreter):
         self.actionRun.setEnabled(False)
+        try:
+            initialBoard = self.mainW.getInitialBoard()
+        except BoardParseException as exception:
+            # The cells of a board loaded from a file are read here
+            self.mainW.guiInterpreterHandler.failure(exception)
+            return
         interpreter.run(str(self.mainW.fileOption.getFileName()),
             self.mainW.programText(),
-            self.mainW.getInitialBoard())
+            initialBoard)
 
     def stopInterpreter(self):
         self.mainW.guiInterpreterHandler.wasStoped = True
@@ -526,6 +626,7 @@ class InteractiveWindow(QtGui.QDialog):
         self.setStyleSheet( "InteractiveWindow{background-image:url(':/backgroundWidget.png');}")
         self.load_views = None
         self.forceQuit = False
+        self.boardV = None
 
     def init_switcher(self):
         if len(self.filesNames) == 1:
@@ -644,10 +745,16 @@ class InteractiveWindow(QtGui.QDialog):
         painter.end()
 
     def setBoard(self, board):
-        self.boardV = BoardViewer(self, parseABoardString(board), self.add_extension(self.current_clothing))
-        self.boardV.setParent(self.ui.boardViewer)
-        self.ui.boardViewer.removeTab(0)
-        self.ui.boardViewer.insertTab(0, self.boardV, i18n('Board'))
+        clothing = self.add_extension(self.current_clothing)
+        if not self.boardV is None and self.ui.boardViewer.widget(0) is self.boardV:
+            if self.boardV.getClothing() != clothing:
+                self.boardV.setClothing(clothing)
+            self.boardV.setBoard(parseABoard(board))
+        else:
+            self.boardV = BoardViewer(self, parseABoard(board), clothing)
+            self.boardV.setParent(self.ui.boardViewer)
+            self.ui.boardViewer.removeTab(0)
+            self.ui.boardViewer.insertTab(0, self.boardV, i18n('Board'))
 
     def add_extension(self, path):
         if not path.endswith('xml'):
@@ -11,8 +11,8 @@ class PreferencesWindow(QtGui.QDialog):
     def __init__(self, mainW):
         super(PreferencesWindow, self).__init__()
         self.mainW = mainW
-        self.setGeometry(300, 300, 300, 150)
-        self.setMaximumSize(300,150)
+        self.setGeometry(300, 300, 300, 170)
+        self.setMaximumSize(300,170)
         self.setWindowTitle(i18n('Preferences'))
         self.setStyleSheet("QDialog {background-color:'white'; border:2px solid #4682b4; border-color:'#4682b4';}")
         self.initActions()
@@ -50,6 +50,12 @@ class PreferencesWindow(QtGui.QDialog):
             autoIndentation.toggle()
         autoIndentation.stateChanged.connect(self.activateAutoIndentation)
 
+        logToFile = QtGui.QCheckBox(i18n('save the log to a file'), self)
+        logToFile.move(20, 120)
+        if gui.mainWindow.MainWindow.getPreference('logToFile'):
+            logToFile.toggle()
+        logToFile.stateChanged.connect(self.activateLogToFile)
+
         vLayout = QtGui.QVBoxLayout()
         hLayout = QtGui.QHBoxLayout()
         hLayout.addStretch(1)
@@ -63,6 +69,7 @@ class PreferencesWindow(QtGui.QDialog):
         vCheckLayout.addWidget(cellNumbers)
         vCheckLayout.addWidget(lineNumbers)
         vCheckLayout.addWidget(autoIndentation)
+        vCheckLayout.addWidget(logToFile)
 
         hLayout.addWidget(acceptButton)
         vLayout.addLayout(vCheckLayout)
@@ -105,6 +112,14 @@ class PreferencesWindow(QtGui.QDialog):
             self.mainW.setPreference('autoIndentation', False)
             self.mainW.editOption.activateAutoIndentation(False)
 
+    def activateLogToFile(self, state):
+        if state == QtCore.Qt.Checked:
+            self.mainW.setPreference('logToFile', True)
+            self.mainW.activateLogToFile(True)
+        else:
+            self.mainW.setPreference('logToFile', False)
+            self.mainW.activateLogToFile(False)
+
     def accept(self):
         self.mainW.initLoggerSize()
         self.close()
@@ -82,7 +82,7 @@ class Results(QtGui.QWidget):
             filename = assure_extension(filename, 'gbb')
             (filep, filen) = os.path.split(str(filename))
             myFile = open(filename, 'w')
-            myFile.write(boardToString(self.finalBoard))
+            writeBoard(self.finalBoard, myFile)
             myFile.close()
         else:
             pass
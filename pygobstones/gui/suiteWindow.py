@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+from PyQt4 import QtGui
+from PyQt4 import QtCore
+from resultsMainWindow import Results
+from views.boardPrint.boardViewer import BoardViewer, BoardViewerError
+from views.boardPrint.parseBoard import parseABoard
+from pygobstones.commons.i18n import *
+from pygobstones.language.boardSuite import SuiteRun, SuiteOutcome
+from pygobstones.language.programExecution import RunLimits
+
+
+class SuiteDispatcher(QtCore.QObject):
+    """ Carries the outcomes of a suite from its threads to the GUI thread """
+    outcome = QtCore.pyqtSignal(object)
+    finished = QtCore.pyqtSignal()
+
+
+class SuiteWindow(QtGui.QWidget):
+    """ Grid with the outcome of the program on every board of a suite.
+    Double clicking a row opens the results of that board.
+    """
+
+    COLUMNS = ['Board', 'Outcome', 'Time', 'Message']
+    TIME_LIMIT = 10.0
+
+    def __init__(self, mainW, boards):
+        super(SuiteWindow, self).__init__()
+        self.mainW = mainW
+        self.boards = boards
+        self.outcomes = {}
+        self.results = None
+        self.suiteRun = None
+        self.setWindowTitle(i18n('Board suite'))
+        self.setGeometry(200, 200, 640, 480)
+        self.setWindowIcon(QtGui.QIcon(':/logoGobstones.png'))
+        self.initTableAndButtons()
+        self.dispatcher = SuiteDispatcher()
+        self.dispatcher.outcome.connect(self.showOutcome)
+        self.dispatcher.finished.connect(self.suiteFinished)
+
+    def initTableAndButtons(self):
+        self.table = QtGui.QTableWidget(len(self.boards), len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels([i18n(c) for c in self.COLUMNS])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QtGui.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtGui.QAbstractItemView.SelectRows)
+        self.table.cellDoubleClicked.connect(self.openResults)
+        for row, (name, board) in enumerate(self.boards):
+            self.table.setItem(row, 0, QtGui.QTableWidgetItem(name))
+            self.table.setItem(row, 1, QtGui.QTableWidgetItem(i18n('Waiting')))
+
+        self.summary = QtGui.QLabel(self)
+        self.stopButton = QtGui.QPushButton(i18n('Stop'), self)
+        self.stopButton.clicked.connect(self.stop)
+        hLayout = QtGui.QHBoxLayout()
+        hLayout.addWidget(self.summary)
+        hLayout.addStretch(1)
+        hLayout.addWidget(self.stopButton)
+
+        vLayout = QtGui.QVBoxLayout()
+        vLayout.addWidget(self.table)
+        vLayout.addLayout(hLayout)
+        self.setLayout(vLayout)
+        self.updateSummary()
+
+    def start(self, pool):
+        self.suiteRun = SuiteRun(self.mainW.getLang(), pool, pool.size,
+                                 RunLimits(wall_time=self.TIME_LIMIT))
+        self.suiteRun.run(str(self.mainW.fileOption.getFileName()),
+                          self.mainW.programText(), self.boards,
+                          self.dispatcher.outcome.emit,
+                          self.dispatcher.finished.emit)
+        self.show()
+
+    def stop(self):
+        if not self.suiteRun is None:
+            self.suiteRun.cancel()
+
+    def closeEvent(self, event):
+        self.stop()
+        event.accept()
+
+    def showOutcome(self, outcome):
+        self.outcomes[outcome.index] = outcome
+        row = outcome.index
+        status = QtGui.QTableWidgetItem(i18n(self.statusText(outcome.status)))
+        status.setForeground(QtGui.QBrush(self.statusColor(outcome.status)))
+        self.table.setItem(row, 1, status)
+        self.table.setItem(row, 2, QtGui.QTableWidgetItem('%.2f s' % (outcome.time,)))
+        if not outcome.exception is None:
+            message = getattr(outcome.exception, 'msg', str(outcome.exception))
+            self.table.setItem(row, 3, QtGui.QTableWidgetItem(message))
+        self.updateSummary()
+
+    def suiteFinished(self):
+        self.stopButton.setEnabled(False)
+        self.updateSummary()
+
+    def statusText(self, status):
+        return {SuiteOutcome.OK: 'Execution completed',
+                SuiteOutcome.FAILURE: 'Boom !!!',
+                SuiteOutcome.ERROR: 'Invalid board',
+                SuiteOutcome.CANCELLED: 'Execution interrupted by the user',
+                }[status]
+
+    def statusColor(self, status):
+        if status == SuiteOutcome.OK:
+            return QtGui.QColor('#2e8b57')
+        elif status == SuiteOutcome.CANCELLED:
+            return QtGui.QColor('gray')
+        return QtGui.QColor('#b22222')
+
+    def updateSummary(self):
+        passed = len([o for o in self.outcomes.values()
+                      if o.status == SuiteOutcome.OK])
+        self.summary.setText(i18n('{0} of {1} boards run, {2} completed').
+            format(len(self.outcomes), len(self.boards), passed))
+
+    def openResults(self, row, column):
+        outcome = self.outcomes.get(row)
+        if outcome is None or outcome.status == SuiteOutcome.ERROR:
+            return
+        clothing = self.mainW.getClothing()
+        self.results = Results(self.mainW)
+        self.results.setWindowTitle(outcome.name)
+        self.results.setInitialBoard(BoardViewer(self,
+            parseABoard(outcome.initial_board), clothing))
+        if outcome.status == SuiteOutcome.OK:
+            self.results.setFinalBoard(BoardViewer(self,
+                parseABoard(outcome.final_board), clothing))
+            self.results.setRetVars(outcome.result)
+        else:
+            self.results.setFinalBoard(BoardViewerError())
+            self.results.setRetVars(None)
+        self.results.ui.tabWidgetResults.setCurrentIndex(2)
+        self.results.show()
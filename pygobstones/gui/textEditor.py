@@ -1,6 +1,7 @@
 from PyQt4 import QtCore, QtGui
 import sys
 import pygobstoneslang.lang as lang
+from pygobstones.language.nameIndex import NameIndex, NameParser
 from PyQt4.QtCore import QAbstractItemModel
 import json
 from PyQt4.QtGui import QStringListModel
@@ -16,10 +17,18 @@ class GobstonesCompleter(QtGui.QCompleter):
             "puedeMover",
         ]
 
+    parsed = QtCore.pyqtSignal(object)
+    parseFailed = QtCore.pyqtSignal(object)
+
     def __init__(self, parent=None):
         QtGui.QCompleter.__init__(self, [], parent)
         self.set_words()
         self.gobstones = lang.Gobstones(lang.GobstonesOptions(lang_version="xgobstones"))
+        self.parsed.connect(self.success)
+        self.parseFailed.connect(self.failure)
+        self.parser = NameParser(NameIndex(self.gobstones.parse_names),
+                                 self.parsed.emit, self.parseFailed.emit)
+        self.parser.start()
 
     def success(self, names):
 
@@ -41,10 +50,10 @@ class GobstonesCompleter(QtGui.QCompleter):
         self.setModel(QStringListModel(self.words))
 
     def update(self, filename="", current_text=""):
-        try:
-            self.success(self.gobstones.parse_names(filename, current_text))
-        except Exception as e:
-            self.failure(e)
+        """ Parses the names in the background, the words are set when the
+        names arrive.
+        """
+        self.parser.request(filename, current_text)
 
 
 class GobstonesTextEditor(QtGui.QFrame):
@@ -82,6 +91,7 @@ class GobstonesTextEditor(QtGui.QFrame):
 
             self.gbseditor = gbseditor
             self.drawLineNumbers = True
+            self.diagnostics = []
             self.setFrameStyle(QtGui.QFrame.NoFrame)
             self.highlight()
             #self.setLineWrapMode(QPlainTextEdit.NoWrap)
@@ -294,7 +304,22 @@ class GobstonesTextEditor(QtGui.QFrame):
             hi_selection.cursor = self.textCursor()
             hi_selection.cursor.clearSelection()
 
-            self.setExtraSelections([hi_selection])
+            self.setExtraSelections([hi_selection] + self.diagnostics)
+
+        def setDiagnostic(self, row=None):
+            """ Underlines the line `row`, counted from 1, or clears it """
+            self.diagnostics = []
+            if not row is None:
+                block = self.document().findBlockByNumber(row - 1)
+                if block.isValid():
+                    selection = QtGui.QTextEdit.ExtraSelection()
+                    selection.format.setUnderlineStyle(QtGui.QTextCharFormat.WaveUnderline)
+                    selection.format.setUnderlineColor(QtGui.QColor('red'))
+                    selection.cursor = QtGui.QTextCursor(block)
+                    selection.cursor.movePosition(QtGui.QTextCursor.EndOfBlock,
+                                                  QtGui.QTextCursor.KeepAnchor)
+                    self.diagnostics.append(selection)
+            self.highlight()
 
         def numberbarPaint(self, number_bar, event):
 
@@ -361,6 +386,9 @@ class GobstonesTextEditor(QtGui.QFrame):
     def updateCompleter(self, filename, current_text):
         self.edit.updateCompleter(filename, current_text)
 
+    def setDiagnostic(self, row=None):
+        self.edit.setDiagnostic(row)
+
     def showEditor(self):
 
         if self.drawLineNumbers:
@@ -507,12 +535,52 @@ def gen_highlighting_rules(xs, format, highlighting_class=HighlightingBasicRule)
     return [highlighting_class(x, format) for x in xs]
 
 
+def merge_regexp_rules(rules):
+    """ One rule matching any of the patterns of the given rules, which
+    share a format. Longer patterns go first, so an operator wins over its
+    prefixes as it did when each rule was applied on its own.
+    """
+    if len(rules) == 1:
+        return rules[0]
+    patterns = sorted([str(rule.pattern.pattern()) for rule in rules],
+                      key=len, reverse=True)
+    return HighlightingRegExpRule('|'.join(['(?:%s)' % (p,) for p in patterns]),
+                                  rules[0].format)
+
+
 class GobstonesHighlighter( QtGui.QSyntaxHighlighter ):
 
     def __init__( self, parent ):
         super(GobstonesHighlighter, self).__init__(parent)
         self.parent = parent
         self.create_rules()
+        self.compile_rules()
+
+    def compile_rules(self):
+        """ Merges each run of regexp rules with the same format into a
+        single alternation, so a block is scanned once per format, and
+        indexes the block rules by the state they continue. The resulting
+        QRegExps are reused for every block.
+        """
+        self.blockRules = []
+        self.blockRulesByState = {}
+        self.inlineRules = []
+        pending = []
+        for rule in self.highlightingRules:
+            if isinstance(rule, HighlightingBlockRule):
+                self.blockRules.append(rule)
+                self.blockRulesByState[rule.expected_state] = rule
+                continue
+            if (len(pending) > 0 and (not isinstance(rule, HighlightingRegExpRule)
+                                      or not rule.format is pending[0].format)):
+                self.inlineRules.append(merge_regexp_rules(pending))
+                pending = []
+            if isinstance(rule, HighlightingRegExpRule):
+                pending.append(rule)
+            else:
+                self.inlineRules.append(rule)
+        if len(pending) > 0:
+            self.inlineRules.append(merge_regexp_rules(pending))
 
     def create_rules(self):
         keyword_format = QtGui.QTextCharFormat()
@@ -607,30 +675,29 @@ class GobstonesHighlighter( QtGui.QSyntaxHighlighter ):
         end_comment_index = None
         comment_format = None
 
-        for rule in self.highlightingRules:
-            if isinstance(rule, HighlightingBlockRule):
-                if prev_block_state == rule.expected_state:
-                    begin_comment_index = 0
-                    if text.lastIndexOf(rule.end) == -1:
-                        end_comment_index = len(text)
-                        block_state = rule.expected_state
-                    else:
-                        block_state = BlockState.NONE
-                        end_comment_index = text.lastIndexOf(rule.end) + len(rule.end)
-                    comment_format = rule.format
-                elif prev_block_state <= BlockState.NONE and text.indexOf(rule.begin) != -1 and text.indexOf(rule.begin) < begin_comment_index:
-                    begin_comment_index = text.indexOf(rule.begin)
-                    if text.lastIndexOf(rule.end) == -1 or (text.lastIndexOf(rule.end) == text.indexOf(rule.begin) and text.lastIndexOf(rule.end) != -1):
-                        end_comment_index = len(text)
-                        block_state = rule.expected_state
-                    else:
-                        end_comment_index = text.lastIndexOf(rule.end) + len(rule.end)
-                        block_state = BlockState.NONE
-                    comment_format = rule.format
+        for rule in self.blockRules:
+            if prev_block_state == rule.expected_state:
+                begin_comment_index = 0
+                if text.lastIndexOf(rule.end) == -1:
+                    end_comment_index = len(text)
+                    block_state = rule.expected_state
                 else:
-                    pass
-            elif isinstance(rule, HighlightingRegExpRule):
-                expression = QtCore.QRegExp( rule.pattern )
+                    block_state = BlockState.NONE
+                    end_comment_index = text.lastIndexOf(rule.end) + len(rule.end)
+                comment_format = rule.format
+            elif prev_block_state <= BlockState.NONE and text.indexOf(rule.begin) != -1 and text.indexOf(rule.begin) < begin_comment_index:
+                begin_comment_index = text.indexOf(rule.begin)
+                if text.lastIndexOf(rule.end) == -1 or (text.lastIndexOf(rule.end) == text.indexOf(rule.begin) and text.lastIndexOf(rule.end) != -1):
+                    end_comment_index = len(text)
+                    block_state = rule.expected_state
+                else:
+                    end_comment_index = text.lastIndexOf(rule.end) + len(rule.end)
+                    block_state = BlockState.NONE
+                comment_format = rule.format
+
+        for rule in self.inlineRules:
+            if isinstance(rule, HighlightingRegExpRule):
+                expression = rule.pattern
                 index = expression.indexIn( text )
                 while index >= 0:
                     length = expression.matchedLength()
@@ -651,13 +718,11 @@ class GobstonesHighlighter( QtGui.QSyntaxHighlighter ):
 
         if prev_block_state > BlockState.NONE and block_state <= BlockState.NONE and comment_format is None:
             block_state = prev_block_state
-            comment_rule = filter(lambda r: isinstance(r, HighlightingBlockRule) and r.expected_state == block_state, self.highlightingRules)[0]
-            self.setFormat(0, len(text), comment_rule.format)
+            self.setFormat(0, len(text), self.blockRulesByState[block_state].format)
 
         self.setCurrentBlockState(block_state)
 
 
-
 class XGobstonesHighlighter(GobstonesHighlighter):
 
     def create_rules(self):
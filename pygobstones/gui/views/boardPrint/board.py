@@ -1,9 +1,25 @@
 # -*- coding: utf-8 -*-
 
 import random
-import parseBoard
+from array import array
+
+COLORS = ('blue', 'black', 'red', 'green')
+# Colors may be given by name or by their index in COLORS
+COLOR_INDEX = dict((color, index) for index, color in enumerate(COLORS))
+COLOR_INDEX.update((index, index) for index in range(len(COLORS)))
+
 
-class Board():
+def unsignedTypecode(itemsize):
+    '''Typecode of the arrays of unsigned integers of itemsize bytes, whose
+    size depends on the platform'''
+    for typecode in 'BHIL':
+        if array(typecode).itemsize == itemsize:
+            return typecode
+    raise ImportError('No array typecode for %d byte unsigned integers'
+                      % (itemsize,))
+
+
+class Board(object):
 
     def __init__(self, size, cells, head):
         # size and head must be a touple x,y
@@ -48,6 +64,41 @@ class Board():
     def isCurrentCell(self, coords):
         return self.head == coords
 
+    def isInside(self, position):
+        '''Whether position is a cell of the board, any position is while
+        the board has no size'''
+        if self.size is None:
+            return True
+        return (0 <= position[0] < self.size[0] and
+                0 <= position[1] < self.size[1])
+
+    def iterCells(self):
+        '''Yield ((x, y), counts) for the cells with stones, sorted by
+        position. Stored cells out of the size of the board are not part of
+        it and are never yielded'''
+        cells = self.cells
+        isInside = self.isInside
+        for position in sorted(cells):
+            counts = cells[position].getKey()
+            if any(counts) and isInside(position):
+                yield position, counts
+
+    def iterAllCells(self):
+        '''Yield ((x, y), counts) for every cell of the board, empty ones
+        included, sorted by position. A board without size has no cells'''
+        if self.size is None:
+            return
+        cells = self.cells
+        empty = (0, 0, 0, 0)
+        width, height = self.size
+        for x in range(width):
+            for y in range(height):
+                cell = cells.get((x, y))
+                if cell is None:
+                    yield (x, y), empty
+                else:
+                    yield (x, y), cell.getKey()
+
     def getStonesOfColorOnCell(self, color, coord):
         if self.isEmptyCell(coord[0], coord[1]):
             return 0
@@ -151,27 +202,235 @@ class Board():
     def isDownRight(self, x, y):
         return x == self.getX() - 1 and y == 0
 
-class Cell():
+class ArrayBoard(Board):
+    '''Board backed by a single contiguous buffer of unsigned integers.
+
+    The buffer holds 4 planes of width * height counters, one per color in
+    COLORS order, and cell (x, y) lives at offset y * width + x of each
+    plane. The buffer is exposed as the 'stones' attribute, so whole-board
+    operations can work on it directly (e.g. with
+    numpy.frombuffer(board.stones, 'u4').reshape(4, height, width)).
+
+    Cells are not stored: getCell and the 'cells' attribute build Cell
+    snapshots on demand, and a cell without stones is an empty cell.'''
+
+    TYPECODE = unsignedTypecode(4)
+
+    def __init__(self, size, cells, head):
+        self.size = None
+        self.head = head
+        self.stones = array(self.TYPECODE)
+        if not size is None:
+            self.setSize(size[0], size[1])
+        if cells:
+            self.cells = cells
+
+    @classmethod
+    def fromBoard(cls, board):
+        return cls(board.size, board.cells, board.head)
+
+    def setSize(self, x, y):
+        stones = array(self.TYPECODE, [0]) * (4 * x * y)
+        if not self.size is None:
+            oldX, oldY = self.size
+            width = min(x, oldX)
+            for color in range(4):
+                for row in range(min(y, oldY)):
+                    old = color * oldX * oldY + row * oldX
+                    new = color * x * y + row * x
+                    stones[new:new + width] = self.stones[old:old + width]
+        self.size = (x, y)
+        self.stones = stones
+
+    def offset(self, x, y):
+        if not (0 <= x < self.size[0] and 0 <= y < self.size[1]):
+            raise IndexError('Cell (%s, %s) is out of a %sx%s board'
+                             % (x, y, self.size[0], self.size[1]))
+        return y * self.size[0] + x
+
+    def planeSize(self):
+        return self.size[0] * self.size[1]
+
+    def getCell(self, x, y):
+        i = self.offset(x, y)
+        plane = self.planeSize()
+        stones = self.stones
+        return Cell(stones[i], stones[plane + i], stones[2 * plane + i],
+                    stones[3 * plane + i])
+
+    def isEmptyCell(self, x, y):
+        i = self.offset(x, y)
+        plane = self.planeSize()
+        stones = self.stones
+        return not (stones[i] or stones[plane + i] or
+                    stones[2 * plane + i] or stones[3 * plane + i])
+
+    def addCell(self, position, cell):
+        i = self.offset(int(position[0]), int(position[1]))
+        plane = self.planeSize()
+        for color, count in enumerate(cell.getKey()):
+            self.stones[color * plane + i] = count
+
+    def getStonesOfColorOnCell(self, color, coord):
+        return self.stones[COLOR_INDEX[color] * self.planeSize() +
+                           self.offset(coord[0], coord[1])]
+
+    def putStoneOfColorOnCell(self, color, coord):
+        self.stones[COLOR_INDEX[color] * self.planeSize() +
+                    self.offset(coord[0], coord[1])] += 1
+
+    def quitStoneOfColorOnCell(self, color, coord):
+        i = COLOR_INDEX[color] * self.planeSize() + self.offset(coord[0], coord[1])
+        if self.stones[i] > 0:
+            self.stones[i] -= 1
+
+    def getCells(self):
+        cells = {}
+        width = self.size[0]
+        plane = self.planeSize()
+        stones = self.stones
+        for i in range(plane):
+            blue, black, red, green = (stones[i], stones[plane + i],
+                                       stones[2 * plane + i], stones[3 * plane + i])
+            if blue or black or red or green:
+                cells[(i % width, i // width)] = Cell(blue, black, red, green)
+        return cells
+
+    def setCells(self, cells):
+        self.clear()
+        for position, cell in cells.items():
+            self.addCell(position, cell)
+
+    cells = property(getCells, setCells)
+
+    def iterCells(self):
+        for position, counts in self.iterAllCells():
+            if any(counts):
+                yield position, counts
+
+    def iterAllCells(self):
+        if self.size is None:
+            return
+        width, height = self.size
+        plane = width * height
+        stones = self.stones
+        for x in range(width):
+            for i in range(x, plane, width):
+                yield (x, i // width), (stones[i], stones[plane + i],
+                                        stones[2 * plane + i],
+                                        stones[3 * plane + i])
+
+    def clear(self):
+        self.stones = array(self.TYPECODE, [0]) * len(self.stones)
+
+    def countStones(self, color):
+        plane = self.planeSize()
+        start = COLOR_INDEX[color] * plane
+        return sum(self.stones[start:start + plane])
+
+
+class LazyBoard(Board):
+    '''Board whose cells are built by loadCells the first time they are
+    needed, so its size and head can be used before reading the cells.'''
+
+    def __init__(self, size, loadCells, head):
+        self.size = size
+        self.head = head
+        self.loadCells = loadCells
+        self.loadedCells = None
+
+    def getCells(self):
+        if self.loadedCells is None:
+            self.loadedCells = self.loadCells()
+            self.loadCells = None
+        return self.loadedCells
+
+    def setCells(self, cells):
+        self.loadedCells = cells
+        self.loadCells = None
+
+    cells = property(getCells, setCells)
+
+
+class Cell(object):
+    '''Stones of a cell, kept as an immutable tuple of counts in COLORS
+    order. The tuple doubles as the key of the cell contents (see getKey),
+    so it can be used for lookups without building anything per call.'''
+
+    __slots__ = ('counts', 'allStones')
 
     def __init__(self, blues=0, blacks=0, reds=0, greens=0):
-        self.stones = {"blue": blues, "black": blacks, "red": reds,
-                "green": greens}
+        self.counts = (blues, blacks, reds, greens)
+        self.allStones = None
+
+    @property
+    def stones(self):
+        return dict(zip(COLORS, self.counts))
 
     def getStones(self, color):
-        return self.stones[color]
+        return self.counts[COLOR_INDEX[color]]
+
+    def getKey(self):
+        return self.counts
 
     def getAllStones(self):
-        return (str(self.stones['blue']),
-                str(self.stones['black']),
-                str(self.stones['red']),
-                str(self.stones['green']),
-                )
+        if self.allStones is None:
+            self.allStones = tuple(map(str, self.counts))
+        return self.allStones
 
     def putStone(self, color):
-        self.stones[color] += 1
+        self.addStones(color, 1)
 
     def quitStone(self, color):
-        self.stones[color] -= 1
+        self.addStones(color, -1)
+
+    def addStones(self, color, quantity):
+        counts = list(self.counts)
+        counts[COLOR_INDEX[color]] += quantity
+        self.counts = tuple(counts)
+        self.allStones = None
+
+
+def changedCells(old, new):
+    '''Sorted positions of the cells whose stones differ between two boards
+       of the same size, None if their sizes differ'''
+    if tuple(old.size) != tuple(new.size):
+        return None
+    if isinstance(old, ArrayBoard) and isinstance(new, ArrayBoard):
+        return changedArrayCells(old, new)
+    oldCells = old.cells
+    newCells = new.cells
+    empty = (0, 0, 0, 0)
+    changed = []
+    for position in set(oldCells) | set(newCells):
+        before = oldCells.get(position)
+        after = newCells.get(position)
+        before = empty if before is None else tuple(before.getKey())
+        after = empty if after is None else tuple(after.getKey())
+        if before != after:
+            changed.append(position)
+    return sorted(changed)
+
+
+def changedArrayCells(old, new):
+    '''changedCells for ArrayBoards. The bytes of the stones are compared a
+       row at a time, only the rows that differ are looked at cell by cell'''
+    oldBytes = old.stones.tostring()
+    newBytes = new.stones.tostring()
+    if oldBytes == newBytes:
+        return []
+    width, height = old.size
+    rowBytes = width * old.stones.itemsize
+    changed = set()
+    for row, start in enumerate(range(0, len(oldBytes), rowBytes)):
+        end = start + rowBytes
+        if oldBytes[start:end] != newBytes[start:end]:
+            y = row % height
+            first = row * width
+            for x in range(width):
+                if old.stones[first + x] != new.stones[first + x]:
+                    changed.add((x, y))
+    return sorted(changed)
 
 
 class InitialBoardGenerator():
@@ -198,6 +457,11 @@ class InitialBoardGenerator():
     def setInitialBoard(self, boardString):
         self.board = parseBoard.parseABoardString(boardString)
 
+    def loadInitialBoard(self, filename):
+        '''Loads the board of a file. Its size and head are checked now,
+           its cells are parsed the first time they are needed'''
+        self.board = parseBoard.parseABoardFile(filename)
+
     def nothingBalls(self, board):
         self.options[0] = 0
 
@@ -289,3 +553,7 @@ class RandomBoardGenerator(InitialBoardGenerator):
         self.headPositionFunction(self.board)
         self.ballsFunction(self.board)
         return self
+
+
+# parseBoard imports the classes above, so it is imported once they exist
+import parseBoard
@@ -7,6 +7,7 @@ from PyQt4.QtCore import *
 from PyQt4.QtGui import *
 from board import *
 from parseBoard import *
+from spriteAtlas import decodedImage
 import resources
 import pygobstones.gui as gui
 
@@ -155,8 +156,7 @@ class Cell(QGraphicsItem):
     def paint(self, painter, option, widget):
         bgRect = self.boundingRect()
         
-        img = QImage(':/' + self.imgName + '.png')
-        painter.drawImage(bgRect, img)
+        painter.drawImage(bgRect, decodedImage(':/' + self.imgName + '.png'))
         
         if self.isHead:
             pen2 = QPen(QColor("#CC0000"))
@@ -231,8 +231,6 @@ class StoneEditor(QGraphicsItem):
         if self.hover:
             painter.fillRect(bgRect, QBrush(QColor(self.color), Qt.Dense2Pattern))
         if self.quantity > 0:
-            image = ':/' + self.color + '.png'
-            img = QImage(image)
-            painter.drawImage(bgRect, img)
+            painter.drawImage(bgRect, decodedImage(':/' + self.color + '.png'))
             painter.setPen(QPen(QColor('white')))
             painter.drawText(bgRect, Qt.AlignCenter, str(self.quantity))
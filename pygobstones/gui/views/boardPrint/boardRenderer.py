@@ -0,0 +1,229 @@
+import sys
+import os
+from PyQt4 import QtGui
+from PyQt4 import QtCore
+from board import *
+import resources
+from spriteAtlas import SpriteAtlas, forgetImage
+from clothingRegistry import ClothingRegistry
+
+clothings = ClothingRegistry(forgetImage)
+
+
+def createBoardPainter(clothing, atlas=None):
+    if clothing == "Gobstones.xml":
+        return GobstonesStandard(atlas)
+    elif "PixelBoard.xml" in clothing:
+        return GobstonesPixelBoard()
+    else:
+        return GobstonesClothing(clothing, atlas)
+
+
+def ensureApplication():
+    '''Qt application needed to paint, created when there is none. Without
+       a display it is created as a console application'''
+    application = QtGui.QApplication.instance()
+    if application is None:
+        gui = sys.platform != 'linux2' or 'DISPLAY' in os.environ
+        application = QtGui.QApplication(sys.argv, gui)
+    return application
+
+
+class BoardRenderer(object):
+    '''Paints boards with a clothing, at `side` pixels per cell and with the
+       top left cell at (`left`, `top`), on any paint device. Boards can be
+       rendered to images and SVG files without a window.'''
+
+    MARGIN = 4
+
+    def __init__(self, clothing='Gobstones.xml', side=40, left=MARGIN,
+                 top=MARGIN, atlas=None):
+        self.clothing = clothing
+        self.side = side
+        self.left = left
+        self.top = top
+        self.atlas = atlas or SpriteAtlas()
+        self.atlas.setSide(side)
+        self.painter = createBoardPainter(clothing, self.atlas)
+
+    def size(self, board):
+        return QtCore.QSize(2 * self.left + self.side * board.getX(),
+                            2 * self.top + self.side * board.getY())
+
+    def cellRect(self, board, x, y):
+        return QtCore.QRect(self.left + self.side * x,
+                            self.top + self.side * (board.getY() - 1 - y),
+                            self.side, self.side)
+
+    def paint(self, painter, board):
+        for y in range(board.getY()):
+            for x in range(board.getX()):
+                self.paintCell(painter, board, x, y)
+        self.markHead(painter, board)
+
+    def paintCell(self, painter, board, x, y):
+        pen = QtGui.QPen(QtGui.QColor(200, 50, 50))
+        pen.setWidth(1)
+        painter.setPen(pen)
+        painter.setBrush(QtGui.QColor(255, 255, 255))
+        rect = self.cellRect(board, x, y)
+        imgName = board.getImageName(x, y)
+        self.atlas.draw(painter, rect, ':/' + imgName + '.png')
+        if(not board.isEmptyCell(x, y)):
+            self.painter.draw(painter, rect, board.getCell(x, y))
+        else:
+            self.painter.draw(painter, rect, Cell(0, 0, 0, 0))
+        self.roundCellBordersOnClothing(painter, board, x, y, rect)
+
+    def roundCellBordersOnClothing(self, painter, board, x, y, rect):
+        if not self.clothing.startswith('Gobstones') and "PixelBoard" in self.clothing:
+            imgName = board.getRoundedBorderTranslucentImageName(x, y)
+            self.atlas.draw(painter, rect, ':/' + imgName + '.png')
+
+    def markHead(self, painter, board):
+        self.painter.markCurrentCell(self.cellRect(board, board.getXCurrentCell(),
+                                                   board.getYCurrentCell()), painter)
+
+    def renderTo(self, device, board):
+        painter = QtGui.QPainter()
+        painter.begin(device)
+        painter.fillRect(QtCore.QRect(QtCore.QPoint(0, 0), self.size(board)),
+                         QtGui.QColor(255, 255, 255))
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        self.paint(painter, board)
+        painter.end()
+
+    def image(self, board):
+        image = QtGui.QImage(self.size(board), QtGui.QImage.Format_ARGB32_Premultiplied)
+        self.renderTo(image, board)
+        return image
+
+    def save(self, board, filename):
+        '''Renders the board to `filename`, as SVG when it ends in .svg and
+           as an image in the format of its extension otherwise'''
+        if filename.lower().endswith('.svg'):
+            from PyQt4 import QtSvg
+            generator = QtSvg.QSvgGenerator()
+            generator.setFileName(filename)
+            generator.setSize(self.size(board))
+            generator.setViewBox(QtCore.QRect(QtCore.QPoint(0, 0), self.size(board)))
+            self.renderTo(generator, board)
+            return True
+        return self.image(board).save(filename)
+
+
+class GobstonesBoardPainter(object):
+    
+    def __init__(self):
+        pass
+    
+    def draw(self, painter, rect, cell):
+        pass
+    
+    def markCurrentCell(self, rect, painter):
+        pen = QtGui.QPen(QtGui.QColor("#CC0000"))
+        pen.setWidth(3)
+        painter.setPen(pen)
+        
+        painter.drawRect(QtCore.QRect(rect.left(), rect.top(), rect.width(), 0))
+        painter.drawRect(QtCore.QRect(rect.left() + rect.width(), rect.top(), 0, rect.height()))
+        painter.drawRect(QtCore.QRect(rect.left(), rect.top() + rect.height(), rect.width(), 0))
+        painter.drawRect(QtCore.QRect(rect.left(), rect.top(), 0, rect.height()))
+        
+        
+class GobstonesPixelBoard(GobstonesBoardPainter):    
+    
+    def draw(self, painter, rect, cell):
+        painter.fillRect(rect, self.cellToColor(cell))
+
+    def cellToColor(self, cell):
+        return QtGui.QColor(cell.getStones("red") * 10, 
+                            cell.getStones("green") * 10, 
+                            cell.getStones("blue") * 10, 
+                            cell.getStones("black") * 10)
+    
+    def markCurrentCell(self, rect, painter):
+        pass
+    
+
+class GobstonesClothing(GobstonesBoardPainter):
+
+    def __init__(self, clothing, atlas=None):
+        self.atlas = atlas or SpriteAtlas()
+        self.gobstonesStandard = GobstonesStandard(self.atlas)
+        self.clothing = clothing
+        self.images = clothings.get(self.clothing)
+
+    def draw(self, painter, rect, cell):
+        image = self.images.image(cell.getKey())
+        if not image is None:
+            self.atlas.draw(painter, rect, image)
+        else:
+            self.gobstonesStandard.draw(painter, rect, cell)
+
+
+class GobstonesStandard(GobstonesBoardPainter):
+
+    def __init__(self, atlas=None):
+        self.atlas = atlas or SpriteAtlas()
+        self.complementaryColors = {"blue": QtGui.QColor(255, 255, 0),
+                                    "green": QtGui.QColor(255, 0, 0),
+                                    "black": QtGui.QColor(255, 255, 255),
+                                     "red": QtGui.QColor(50, 250, 100)}
+        self.colors = {"blue": QtGui.QColor(0, 0, 255),
+                       "green": QtGui.QColor(0, 255, 0),
+                       "black": QtGui.QColor(0, 0, 0),
+                       "red": QtGui.QColor(255, 0, 0)}
+
+    def draw(self, painter, rect, cell):
+        x0, y0, x1, y1 = rect.getRect()
+        self.newSide = x1/2
+        self.offset = x1/2
+        
+        x0 = x0 + (self.newSide * 0.1)
+        y0 = y0 + (self.newSide * 0.1)
+        self.newSide = self.newSide * 0.8
+        
+        blueStone = QtCore.QRectF(x0, y0, self.newSide, self.newSide)
+        blackStone = QtCore.QRectF(x0 + self.offset, y0, self.newSide, self.newSide)
+        greenStone = QtCore.QRectF(x0 + self.offset, y0 + self.offset, self.newSide, self.newSide)
+        redStone = QtCore.QRectF(x0, y0 + self.offset, self.newSide, self.newSide)
+        
+        self.drawSingleStone(painter, blueStone, "blue", cell)
+        self.drawSingleStone(painter, blackStone, "black", cell)
+        self.drawSingleStone(painter, greenStone, "green", cell)
+        self.drawSingleStone(painter, redStone, "red", cell)
+
+        pen = QtGui.QPen(QtGui.QColor(200, 50, 50))
+        pen.setWidth(1)
+        painter.setPen(pen)
+
+        painter.setBrush(QtGui.QColor(255, 255, 255))
+
+    def drawSingleStone(self, painter, stoneArea, colorName, cell):
+        quantity = cell.getStones(colorName)
+        if quantity > 0:
+            pen = QtGui.QPen(QtGui.QColor(0, 0, 0))
+            pen.setWidth(1)
+            painter.setPen(pen)
+
+            x0, y0, x1, y1 = stoneArea.getRect()
+
+            x0 = x0 + 2
+            y0 = y0 + 2
+            x1 = x1 * 0.8
+            y1 = y1 * 0.8
+
+            painter.setBrush(self.colors[colorName])
+            '''
+            painter.drawEllipse(x0, y0, x1, y1)
+            '''
+            self.atlas.draw(painter, stoneArea, ':/' + colorName + '.png')
+            self.drawQuantity(painter, colorName, stoneArea, quantity)
+
+    def drawQuantity(self, painter, colorName, stoneArea, quantity):
+            pen = QtGui.QPen(QtGui.QColor("white"))
+            pen.setWidth(2)
+            painter.setPen(pen)
+
+            painter.drawText(stoneArea, QtCore.Qt.AlignCenter, str(quantity))
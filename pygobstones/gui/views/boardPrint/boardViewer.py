@@ -4,7 +4,8 @@ from board import *
 import sys
 import os
 import resources
-from parseXML import ParseXML
+from spriteAtlas import SpriteAtlas
+from boardRenderer import *
 import pygobstones.gui as gui
 from pygobstones.gui.errorWindow import *
 from xml.etree.ElementTree import ParseError
@@ -24,24 +25,33 @@ class BoardViewer(QtGui.QWidget):
         self.show()
         self.lastDimensions = (0,0)
         self.surface = None
+        self.atlas = SpriteAtlas()
 
     def getBoard(self):
         return self.board
 
+    def setBoard(self, board):
+        '''Shows another board, repainting on the current surface only the
+           cells that differ from the shown one when nothing else changed'''
+        changed = None
+        if not self.surface is None and not self.contentChanged():
+            changed = changedCells(self.board, board)
+        oldHead = (self.board.getXCurrentCell(), self.board.getYCurrentCell())
+        self.board = board
+        if not changed is None:
+            try:
+                self.repaintCells(changed, oldHead)
+                self.lastBoard = board
+            except ParseError as e:
+                self.closeResultsAndShowTheXMLError(e.position)
+        self.update()
+
     def setParent(self, parent):
         self.parent = parent
 
     def is_board_error(self):
         return False
 
-    def createPainter(self):
-        if self.clothing == "Gobstones.xml":
-            return GobstonesStandard()
-        elif "PixelBoard.xml" in self.clothing:
-            return GobstonesPixelBoard()
-        else:
-            return GobstonesClothing(self.clothing)
-
     def getClothing(self):
         return self.clothing
 
@@ -52,7 +62,7 @@ class BoardViewer(QtGui.QWidget):
         return self.lastDimensions != (self.parent.width(), self.parent.height())
             
     def clothingChanged(self):
-        return id(self.lastClothing) != id(self.clothing)
+        return self.lastClothing != self.clothing
     
     def boardChanged(self):
         return id(self.lastBoard) != id(self.board)
@@ -94,9 +104,12 @@ class BoardViewer(QtGui.QWidget):
                 self.newSide = side / (max(x, y) + 2)
             
             self.offset = (width - ((self.board.getX() + 2) * self.newSide)) / 2
+            self.atlas.setSide(self.newSide)
             
             try:
-                self.painter = self.createPainter()
+                self.renderer = BoardRenderer(self.clothing, self.newSide,
+                                              self.offset + self.newSide, self.newSide,
+                                              self.atlas)
                 painter = QtGui.QPainter()
                 painter.begin(self.surface)
                 painter.fillRect(QtCore.QRect(0,0, self.parent.width(), self.parent.height()), QtGui.QColor(255, 255, 255))
@@ -104,35 +117,11 @@ class BoardViewer(QtGui.QWidget):
                 pen = QtGui.QPen(QtGui.QColor(200, 50, 50))
                 pen.setWidth(1)
                 painter.setPen(pen)
-                y0 = self.newSide * self.board.getY() + self.newSide
                 for y in range(self.board.getY()):
-                    x0 = self.offset
-                    y0 = y0 - self.newSide
                     for x in range(self.board.getX()):
-                        pen = QtGui.QPen(QtGui.QColor(200, 50, 50))
-                        pen.setWidth(1)
-                        painter.setPen(pen)
-                        painter.setBrush(QtGui.QColor(255, 255, 255))
-                        x0 = x0 + self.newSide
-                        rect = QtCore.QRect(x0, y0, self.newSide, self.newSide)
-                        '''
-                        painter.drawRect(rect)
-                        '''
-                        
-                        imgName = self.board.getImageName(x, y)
-                        img = QtGui.QImage(':/' + imgName + '.png')
-                        painter.drawImage(rect, img)
-                        
-                        if(not self.board.isEmptyCell(x, y)):
-                            self.painter.draw(painter, rect, self.board.getCell(x, y))
-                        else:
-                            self.painter.draw(painter, rect, Cell(0, 0, 0, 0))
-    
-                        self.roundCellBordersOnClothing(x, y, rect, painter)
+                        self.paintCell(painter, x, y)
     
-                x0 = self.offset + self.newSide + self.newSide * self.board.getXCurrentCell()
-                y0 = (self.newSide * self.board.getY()) - (self.newSide * self.board.getYCurrentCell())
-                self.painter.markCurrentCell(QtCore.QRect(x0, y0, self.newSide, self.newSide), painter)
+                self.markHead(painter)
                 self.drawRoseOfWinds(painter)
                 self.drawCellNumbers(painter)
                 painter.end()
@@ -151,11 +140,45 @@ class BoardViewer(QtGui.QWidget):
             except ParseError as e:
                 self.closeResultsAndShowTheXMLError(e.position)
 
-    def roundCellBordersOnClothing(self, x, y, rect, painter):
-        if not self.clothing.startswith('Gobstones') and "PixelBoard" in self.clothing:
-            imgName = self.board.getRoundedBorderTranslucentImageName(x, y)
-            img = QtGui.QImage(':/' + imgName + '.png')
-            painter.drawImage(rect, img)
+    def repaintCells(self, cells, oldHead):
+        '''Repaints the given cells and the head on the surface. A head mark
+           overflows its cell, so when the head moved the cells around its
+           old and new positions are repainted too'''
+        head = (self.board.getXCurrentCell(), self.board.getYCurrentCell())
+        dirty = set(cells)
+        dirty.add(head)
+        region = QtGui.QRegion()
+        moved = []
+        if oldHead != head:
+            moved = [oldHead, head]
+        for hx, hy in moved:
+            region = region.united(self.cellRect(hx, hy).adjusted(-2, -2, 2, 2))
+            for x in range(hx - 1, hx + 2):
+                for y in range(hy - 1, hy + 2):
+                    if 0 <= x < self.board.getX() and 0 <= y < self.board.getY():
+                        dirty.add((x, y))
+        for x, y in dirty:
+            region = region.united(self.cellRect(x, y))
+        painter = QtGui.QPainter()
+        painter.begin(self.surface)
+        painter.setClipRegion(region)
+        painter.fillRect(region.boundingRect(), QtGui.QColor(255, 255, 255))
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        for x, y in dirty:
+            self.paintCell(painter, x, y)
+        self.markHead(painter)
+        self.drawRoseOfWinds(painter)
+        self.drawCellNumbers(painter)
+        painter.end()
+
+    def cellRect(self, x, y):
+        return self.renderer.cellRect(self.board, x, y)
+
+    def paintCell(self, painter, x, y):
+        self.renderer.paintCell(painter, self.board, x, y)
+
+    def markHead(self, painter):
+        self.renderer.markHead(painter, self.board)
 
     def closeResultsAndShowTheXMLError(self, lineColumn):
         self.mainW.results.close()
@@ -166,8 +189,7 @@ class BoardViewer(QtGui.QWidget):
     def drawRoseOfWinds(self, painter):
         if gui.mainWindow.MainWindow.getPreference('roseOfWinds'):
             rect = QtCore.QRect(self.offset + (self.newSide + self.board.getX() * self.newSide), 10, self.newSide, self.newSide)
-            img = QtGui.QImage(':/rosa_vientos_sobria.png')
-            painter.drawImage(rect, img)
+            self.atlas.draw(painter, rect, ':/rosa_vientos_sobria.png')
 
     def drawCellNumbers(self, painter):
         if gui.mainWindow.MainWindow.getPreference('cellNumbers'):
@@ -223,165 +245,6 @@ class BoardViewer(QtGui.QWidget):
         e.ignore()
 
 
-class GobstonesBoardPainter(object):
-    
-    def __init__(self):
-        pass
-    
-    def draw(self, painter, rect, cell):
-        pass
-    
-    def markCurrentCell(self, rect, painter):
-        pen = QtGui.QPen(QtGui.QColor("#CC0000"))
-        pen.setWidth(3)
-        painter.setPen(pen)
-        
-        painter.drawRect(QtCore.QRect(rect.left(), rect.top(), rect.width(), 0))
-        painter.drawRect(QtCore.QRect(rect.left() + rect.width(), rect.top(), 0, rect.height()))
-        painter.drawRect(QtCore.QRect(rect.left(), rect.top() + rect.height(), rect.width(), 0))
-        painter.drawRect(QtCore.QRect(rect.left(), rect.top(), 0, rect.height()))
-        
-        
-class GobstonesPixelBoard(GobstonesBoardPainter):    
-    
-    def draw(self, painter, rect, cell):
-        painter.fillRect(rect, self.cellToColor(cell))
-
-    def cellToColor(self, cell):
-        return QtGui.QColor(cell.getStones("red") * 10, 
-                            cell.getStones("green") * 10, 
-                            cell.getStones("blue") * 10, 
-                            cell.getStones("black") * 10)
-    
-    def markCurrentCell(self, rect, painter):
-        pass
-    
-
-class GobstonesClothing(GobstonesBoardPainter):
-
-    def __init__(self, clothing):
-        self.parser = ParseXML()
-        self.gobstonesStandard = GobstonesStandard()
-        self.clothing = clothing
-        self.images = self.getDictFromXML(self.clothing)
-
-    def draw(self, painter, rect, cell):
-        stones = cell.getAllStones()
-        if self.isIn(stones, self.images):
-            if os.path.exists(self.imageLocation):
-                img = QtGui.QImage(self.imageLocation)
-                painter.drawImage(rect, img)
-            else:
-                self.gobstonesStandard.draw(painter, rect, cell)
-        else:
-            self.gobstonesStandard.draw(painter, rect, cell)
-
-    def getDictFromXML(self, clothing):
-        d = self.parser.getDictFromXML(clothing)
-        return d
-
-    def isIn(self, tupleStones, dictImages):
-        '''Return if isIn and set the image location in 
-           imageLocation attribute <-- Black Programming :'( '''
-        images_dir = os.path.join(os.path.dirname(self.clothing), 'Imagenes')
-        for key in dictImages:
-            if(self.containsSymbols(key)):
-                resOfKey = [False,False,False,False]
-                for i in range(0,4):
-                    if(self.isASymbol(key[i])):
-                        if (key[i] == '*') and (int(tupleStones[i]) >= 0):
-                            resOfKey[i] = True
-                        elif (key[i] == '+') and (int(tupleStones[i]) > 0):
-                            resOfKey[i] = True
-                    else:
-                        resOfKey[i] = tupleStones[i] == key[i]
-                if resOfKey[0] and resOfKey[1] and resOfKey[2] and resOfKey[3]:
-                    self.imageLocation = os.path.join(images_dir, self.images[key])
-                    return True
-            else:
-                if tupleStones in dictImages:
-                    self.imageLocation = os.path.join(images_dir, self.images[tupleStones])
-                    return True
-        return False
-
-    def containsSymbols(self, tupleStones):
-        res = False
-        for i in range(0, 4):
-            res = res or self.isASymbol(tupleStones[i])
-        return res
-
-    def isASymbol(self, char):
-        return (char == '*') or (char == '+')
-
-
-class GobstonesStandard(GobstonesBoardPainter):
-
-    def __init__(self):
-        self.complementaryColors = {"blue": QtGui.QColor(255, 255, 0),
-                                    "green": QtGui.QColor(255, 0, 0),
-                                    "black": QtGui.QColor(255, 255, 255),
-                                     "red": QtGui.QColor(50, 250, 100)}
-        self.colors = {"blue": QtGui.QColor(0, 0, 255),
-                       "green": QtGui.QColor(0, 255, 0),
-                       "black": QtGui.QColor(0, 0, 0),
-                       "red": QtGui.QColor(255, 0, 0)}
-
-    def draw(self, painter, rect, cell):
-        x0, y0, x1, y1 = rect.getRect()
-        self.newSide = x1/2
-        self.offset = x1/2
-        
-        x0 = x0 + (self.newSide * 0.1)
-        y0 = y0 + (self.newSide * 0.1)
-        self.newSide = self.newSide * 0.8
-        
-        blueStone = QtCore.QRectF(x0, y0, self.newSide, self.newSide)
-        blackStone = QtCore.QRectF(x0 + self.offset, y0, self.newSide, self.newSide)
-        greenStone = QtCore.QRectF(x0 + self.offset, y0 + self.offset, self.newSide, self.newSide)
-        redStone = QtCore.QRectF(x0, y0 + self.offset, self.newSide, self.newSide)
-        
-        self.drawSingleStone(painter, blueStone, "blue", cell)
-        self.drawSingleStone(painter, blackStone, "black", cell)
-        self.drawSingleStone(painter, greenStone, "green", cell)
-        self.drawSingleStone(painter, redStone, "red", cell)
-
-        pen = QtGui.QPen(QtGui.QColor(200, 50, 50))
-        pen.setWidth(1)
-        painter.setPen(pen)
-
-        painter.setBrush(QtGui.QColor(255, 255, 255))
-
-    def drawSingleStone(self, painter, stoneArea, colorName, cell):
-        quantity = cell.getStones(colorName)
-        if quantity > 0:
-            pen = QtGui.QPen(QtGui.QColor(0, 0, 0))
-            pen.setWidth(1)
-            painter.setPen(pen)
-
-            x0, y0, x1, y1 = stoneArea.getRect()
-
-            x0 = x0 + 2
-            y0 = y0 + 2
-            x1 = x1 * 0.8
-            y1 = y1 * 0.8
-
-            painter.setBrush(self.colors[colorName])
-            '''
-            painter.drawEllipse(x0, y0, x1, y1)
-            '''
-            color = ':/' + colorName + '.png'
-            img = QtGui.QImage(color)
-            painter.drawImage(stoneArea, img)
-            self.drawQuantity(painter, colorName, stoneArea, quantity)
-
-    def drawQuantity(self, painter, colorName, stoneArea, quantity):
-            pen = QtGui.QPen(QtGui.QColor("white"))
-            pen.setWidth(2)
-            painter.setPen(pen)
-
-            painter.drawText(stoneArea, QtCore.Qt.AlignCenter, str(quantity))
-
-
 class BoardViewerError(QtGui.QWidget):
 
     def __init__(self):
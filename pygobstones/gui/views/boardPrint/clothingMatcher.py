@@ -0,0 +1,69 @@
+WILDCARDS = ('*', '+')
+
+
+def isWildcardPattern(pattern):
+    for count in pattern:
+        if count in WILDCARDS:
+            return True
+    return False
+
+
+class ClothingMatcher(object):
+    '''Image of the first clothing rule, in the order of the clothing file,
+       whose pattern matches the stones of a cell. A pattern has the counts
+       of blue, black, red and green stones as strings, where '*' matches
+       any count and '+' any count but zero. A rule repeating the pattern of
+       an earlier one overrides its image.
+
+       Rules are compiled once: exact patterns into a table and wildcard
+       ones into a tree with a level per color, so a lookup does not scan
+       every rule. Lookups are memoized by the stones of the cell.'''
+
+    def __init__(self, rules):
+        self.exact = {}
+        self.tree = {}
+        self.images = []
+        self.matches = {}
+        positions = {}
+        for pattern, image in rules:
+            pattern = tuple(pattern)
+            if pattern in positions:
+                self.images[positions[pattern]] = image
+                continue
+            position = len(self.images)
+            positions[pattern] = position
+            self.images.append(image)
+            if isWildcardPattern(pattern):
+                node = self.tree
+                for count in pattern[:-1]:
+                    node = node.setdefault(count, {})
+                node[pattern[-1]] = position
+            else:
+                self.exact[pattern] = position
+
+    def match(self, stones):
+        '''Image for a cell with the given (blue, black, red, green) stone
+           counts, None if no rule matches it'''
+        stones = tuple(stones)
+        if stones in self.matches:
+            return self.matches[stones]
+        counts = tuple(map(str, stones))
+        positions = [self.exact.get(counts)]
+        self.collect(self.tree, stones, counts, 0, positions)
+        positions = [p for p in positions if not p is None]
+        image = None
+        if len(positions) > 0:
+            image = self.images[min(positions)]
+        self.matches[stones] = image
+        return image
+
+    def collect(self, node, stones, counts, color, positions):
+        if color == len(counts):
+            positions.append(node)
+            return
+        branches = [counts[color], '*']
+        if int(stones[color]) > 0:
+            branches.append('+')
+        for branch in branches:
+            if branch in node:
+                self.collect(node[branch], stones, counts, color + 1, positions)
@@ -0,0 +1,74 @@
+import os
+from parseXML import ParseXML
+from clothingMatcher import ClothingMatcher
+
+
+def modificationTime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class Clothing(object):
+    '''Compiled rules of a clothing file and the files of its images'''
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = modificationTime(path)
+        self.imagesDir = os.path.join(os.path.dirname(path), 'Imagenes')
+        rules = ParseXML().getRulesFromXML(path)
+        self.matcher = ClothingMatcher(rules)
+        self.imageTimes = dict((image, modificationTime(self.imagePath(image)))
+                               for pattern, image in rules)
+
+    def imagePath(self, image):
+        return os.path.join(self.imagesDir, image)
+
+    def image(self, stones):
+        '''File of the image for a cell with the given stone counts, None if
+           no rule matches them or the file of the image does not exist'''
+        image = self.matcher.match(stones)
+        if image is None or self.imageTimes[image] is None:
+            return None
+        return self.imagePath(image)
+
+    def refreshImages(self):
+        '''Paths of the images whose files changed since they were looked at'''
+        changed = []
+        for image, mtime in self.imageTimes.items():
+            current = modificationTime(self.imagePath(image))
+            if current != mtime:
+                self.imageTimes[image] = current
+                changed.append(self.imagePath(image))
+        return changed
+
+
+class ClothingRegistry(object):
+    '''Clothings by path, each parsed once and parsed again only when the
+       modification time of its file changes. `imageChanged` is called with
+       the path of every image file of a clothing that changed, so whoever
+       keeps it decoded can drop it.'''
+
+    def __init__(self, imageChanged=None):
+        self.clothings = {}
+        self.imageChanged = imageChanged
+
+    def get(self, path):
+        '''Clothing of the file `path`, up to date with its files. Raises
+           what parsing the file raises'''
+        path = os.path.abspath(path)
+        clothing = self.clothings.get(path)
+        if not clothing is None and clothing.mtime == modificationTime(path):
+            changed = clothing.refreshImages()
+        else:
+            clothing = Clothing(path)
+            self.clothings[path] = clothing
+            changed = [clothing.imagePath(image) for image in clothing.imageTimes]
+        if not self.imageChanged is None:
+            for image in changed:
+                self.imageChanged(image)
+        return clothing
+
+    def clear(self):
+        self.clothings.clear()
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from board import Board, Cell
+from board import Board, ArrayBoard, LazyBoard, Cell
+from array import array
+import mmap
+import os
 import re
+import struct
+import sys
 
 
 # String to Board
@@ -17,18 +22,183 @@ def transformInterpreterStringToUseInBoardViewer(lines):
     return lines.replace('GBB/1.0', '')
 
 
-def parseABoardString(lines):
+class BoardParseException(Exception):
+    '''Raised when a GBB line can not be parsed. Line and column are
+    1-based, like the ones reported by the interpreter'''
+
+    def __init__(self, msg, line, column):
+        super(BoardParseException, self).__init__(msg, line, column)
+        self.msg = msg
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        return '%s (line %d, column %d)' % (self.msg, self.line, self.column)
+
+
+_COLOR_INDEX = {'Azul': 0, 'Negro': 1, 'Rojo': 2, 'Verde': 3}
+
+_SIZE_LINE = re.compile(r'size\s+(\d+)\s+(\d+)\s*$')
+_HEAD_LINE = re.compile(r'head\s+(\d+)\s+(\d+)\s*$')
+_CELL_LINE = re.compile(
+    r'cell\s+(\d+)\s+(\d+)((?:\s+(?:Azul|Negro|Rojo|Verde)\s+\d+)*)\s*$')
+_STONES = re.compile(r'(Azul|Negro|Rojo|Verde)\s+(\d+)')
+_COORDS = re.compile(r'\s*(\d+)\s+(\d+)')
+_NUMBER = re.compile(r'[0-9]+')
+_TOKEN = re.compile(r'\S+')
+
+
+def parseABoardString(lines, boardClass=Board):
     ''' Return a Board created with the string. The string must respect
-    the format of board'''
-    string = transformInterpreterStringToUseInBoardViewer(lines)
-    stringBoard = string.split('\n')
-    board = Board(None, {}, None)
-    for line in stringBoard:
-        evaluate(line, board)
+    the format of board. Lines are processed in a single pass and a
+    BoardParseException is raised on the first malformed one. boardClass
+    allows to build another representation, i.e. an ArrayBoard'''
+    board = boardClass(None, {}, None)
+    parseBoardLines(lines.splitlines(), board)
+    return board
+
 
+def parseBoardLines(lines, board):
+    '''Process an iterable of GBB lines over the given board, stopping at
+    the "%%" line or at the end of the lines'''
+    for number, line in enumerate(lines, 1):
+        # Cell lines are most of a board, they are tried before stripping
+        if line[:4] == 'cell':
+            _addCellLine(board, line, line, number)
+            continue
+        stripped = line.strip()
+        if stripped == '%%':
+            break
+        elif stripped == '' or stripped.startswith('GBB/'):
+            continue
+        keyword = stripped[:4]
+        if keyword == 'cell':
+            _addCellLine(board, stripped, line, number)
+            continue
+        if keyword == 'size':
+            match = _SIZE_LINE.match(stripped)
+        elif keyword == 'head':
+            match = _HEAD_LINE.match(stripped)
+        else:
+            match = None
+        if match is None:
+            raise _malformedLine(line, number)
+        if keyword == 'size':
+            board.setSize(int(match.group(1)), int(match.group(2)))
+        else:
+            board.setHead(int(match.group(1)), int(match.group(2)))
     return board
 
 
+def _addCellLine(board, text, line, number):
+    '''Add the cell of text, the cell line number of the board, to the
+    board. line is the line as it was read, before stripping it'''
+    match = _CELL_LINE.match(text)
+    if match is None:
+        raise _malformedLine(line, number)
+    stones = [0, 0, 0, 0]
+    for color, quantity in _STONES.findall(match.group(3)):
+        stones[_COLOR_INDEX[color]] = int(quantity)
+    board.addCell((int(match.group(1)), int(match.group(2))),
+                  Cell(stones[0], stones[1], stones[2], stones[3]))
+
+
+def _mapFile(filename):
+    f = open(filename, 'rb')
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+
+
+def parseABoardFile(filename):
+    '''Return the board stored in a GBB or binary file. GBB files are
+    memory-mapped and only their size and head are read here, so a file
+    without a size raises right away. The cells are parsed line by line from
+    a new map of the file the first time the board needs them, raising
+    BoardParseException then if one is malformed, and a failed parse can be
+    retried'''
+    if os.path.getsize(filename) == 0:
+        return parseABoardString('')
+    data = _mapFile(filename)
+    try:
+        if isBinaryBoard(data[:len(BINARY_MAGIC)]):
+            return parseABoardBinary(data[:])
+        size = _headerLine(data, _SIZE_ANYWHERE.search(data))
+        head = _headerLine(data, _lastHeadLine(data))
+        if size is None:
+            raise BoardParseException('The board has no size line', 1, 1)
+    finally:
+        data.close()
+
+    def loadCells():
+        board = Board(size, {}, head)
+        cellsData = _mapFile(filename)
+        try:
+            parseBoardLines(iter(cellsData.readline, ''), board)
+        finally:
+            cellsData.close()
+        return board.cells
+
+    return LazyBoard(size, loadCells, head)
+
+
+_SIZE_ANYWHERE = re.compile(r'^[ \t]*size\b', re.MULTILINE)
+_HEAD_ANYWHERE = re.compile(r'^[ \t]*head\b', re.MULTILINE)
+
+
+def _lastHeadLine(data):
+    '''Find the head line looking from the end, where GBB writers put it'''
+    index = data.rfind('head')
+    while index != -1:
+        match = _HEAD_ANYWHERE.match(data, data.rfind('\n', 0, index) + 1)
+        if not match is None:
+            return match
+        index = data.rfind('head', 0, index)
+    return None
+
+
+def _headerLine(data, match):
+    '''Parse the size or head line starting at match, as a coordinate'''
+    if match is None:
+        return None
+    end = data.find('\n', match.start())
+    if end == -1:
+        end = len(data)
+    line = data[match.start():end]
+    stripped = line.strip()
+    parsed = (_SIZE_LINE if stripped[:4] == 'size' else _HEAD_LINE).match(stripped)
+    if parsed is None:
+        raise _malformedLine(line, data[:match.start()].count('\n') + 1)
+    return (int(parsed.group(1)), int(parsed.group(2)))
+
+
+def _malformedLine(line, number):
+    '''Build the exception for a line that did not match its grammar,
+    pointing at the first token that breaks it'''
+    tokens = [(m.start() + 1, m.group()) for m in _TOKEN.finditer(line)]
+    column, keyword = tokens[0]
+    if not keyword in ('size', 'head', 'cell'):
+        return BoardParseException("Unknown board keyword '%s'" % (keyword,),
+                                   number, column)
+    for index, (column, token) in enumerate(tokens[1:]):
+        if index < 2 or (keyword == 'cell' and index % 2 == 1):
+            if not token.isdigit():
+                return BoardParseException(
+                    "Expected a number but found '%s'" % (token,),
+                    number, column)
+        elif keyword == 'cell':
+            if not token in _COLOR_INDEX:
+                return BoardParseException(
+                    "Expected a color but found '%s'" % (token,),
+                    number, column)
+        else:
+            return BoardParseException("Unexpected '%s'" % (token,),
+                                       number, column)
+    return BoardParseException('Expected a number at end of line',
+                               number, len(line.rstrip()) + 1)
+
+
 def evaluate(line, board):
     '''Given a line, process the first element of the list and return the
     portion of the list that not been processed'''
@@ -43,26 +213,30 @@ def evaluate(line, board):
         pass
 
 
+def _matchCoords(line):
+    '''Match the x and y coordinates that follow the keyword of line'''
+    match = _COORDS.match(line, 4)
+    if match is None:
+        raise _malformedLine(line, 1)
+    return match
+
+
 def setSize(line, board):
-    toupleProcessXCoord = processQuantity(line[5:])
-    toupleProcessYCoord = processQuantity(line[(6 + toupleProcessXCoord[0]):])
-    board.setSize(toupleProcessXCoord[1], toupleProcessYCoord[1])
+    match = _matchCoords(line)
+    board.setSize(int(match.group(1)), int(match.group(2)))
     return board
 
 
 def setHead(line, board):
-    toupleProcessXCoord = processQuantity(line[5:])
-    toupleProcessYCoord = processQuantity(line[(6 + toupleProcessXCoord[0]):])
-    board.setHead(toupleProcessXCoord[1], toupleProcessYCoord[1])
+    match = _matchCoords(line)
+    board.setHead(int(match.group(1)), int(match.group(2)))
     return board
 
 
 def setCells(line, board):
-    toupleProcessXCoord = processQuantity(line[5:])
-    toupleProcessYCoord = processQuantity(line[(6 + toupleProcessXCoord[0]):])
-    position = (toupleProcessXCoord[1], toupleProcessYCoord[1])
-    listStones = generateStones(line[(6 + toupleProcessXCoord[0] + 1
-                                        + toupleProcessYCoord[0]):])
+    match = _matchCoords(line)
+    position = (int(match.group(1)), int(match.group(2)))
+    listStones = generateStones(line[match.end():])
     cell = Cell(listStones[0], listStones[1], listStones[2], listStones[3])
     board.addCell(position, cell)
     return board
@@ -71,41 +245,23 @@ def setCells(line, board):
 def generateStones(line):
     '''Given a line (without the string 'cell x y') return a list of stones
     quantities in orden '''
-    blues = 0
-    blacks = 0
-    greens = 0
-    reds = 0
-    while len(line) > 5:
-        if line[0] == 'A':
-            processTouple = processQuantity(line[5:])
-            blues = processTouple[1]
-            line = line[6 + processTouple[0]:]
-
-        elif line[0] == 'N':
-            processTouple = processQuantity(line[6:])
-            blacks = processTouple[1]
-            line = line[7 + processTouple[0]:]
-        elif line[0] == 'R':
-            processTouple = processQuantity(line[5:])
-            reds = processTouple[1]
-            line = line[6 + processTouple[0]:]
-        elif line[0] == 'V':
-            processTouple = processQuantity(line[6:])
-            greens = processTouple[1]
-            line = line[7 + processTouple[0]:]
-    return [blues, blacks, reds, greens]
+    stones = [0, 0, 0, 0]
+    for color, quantity in _STONES.findall(line):
+        stones[_COLOR_INDEX[color]] = int(quantity)
+    return stones
 
 
 def processQuantity(line):
     ''' Given a line, return a touple with (length, number) for the number
         in the string
-        Precondition: The string must start with a number'''
-    res = ''
-    currentIndex = 0
-    while (currentIndex < len(line)) and (not (line[currentIndex] == ' ')):
-        if not (re.match('[0-9]', line[currentIndex]) is None):
-            res = res + line[currentIndex]
-        currentIndex = currentIndex + 1
+        Raises BoardParseException if the string does not start with one'''
+    match = _NUMBER.match(line)
+    if match is None:
+        token = _TOKEN.match(line)
+        raise BoardParseException("Expected a number but found '%s'"
+                                  % ('' if token is None else token.group(),),
+                                  1, 1)
+    res = match.group()
     return (len(res), int(res))
 
 
@@ -121,36 +277,119 @@ def removeTextProcessedOfCell(line):
 # Board to String
 #----------------
 
-def boardToString(board):
-    text = 'GBB/1.0\n'
-    text = text + getSizeString(board) + getCellsStrings(board) + getHeadString(board)
-    return text
+_CELL_FORMAT = 'cell %d %d Azul %d Negro %d Rojo %d Verde %d\n'
+
+
+def boardToString(board, skipEmpty=True):
+    '''Return the board in GBB format, with the cells sorted by position.
+    Cells without stones are left out unless skipEmpty is unset, which
+    writes every cell of the board'''
+    return ''.join(iterBoardLines(board, skipEmpty))
+
+
+def writeBoard(board, out, skipEmpty=True):
+    '''Like boardToString, but streams the lines to a file object'''
+    out.writelines(iterBoardLines(board, skipEmpty))
+
+
+def iterBoardLines(board, skipEmpty=True):
+    yield 'GBB/1.0\n'
+    yield getSizeString(board)
+    for line in iterCellsLines(board, skipEmpty):
+        yield line
+    yield getHeadString(board)
 
 
 def getSizeString(board):
-    return 'size ' + str(board.size[0]) + ' ' + str(board.size[1]) + '\n'
+    return 'size %d %d\n' % (board.size[0], board.size[1])
 
 
 def getHeadString(board):
-    return 'head ' + str(board.head[0]) + ' ' + str(board.head[1]) + '\n'
+    return 'head %d %d\n' % (board.head[0], board.head[1])
+
+
+def iterCellsLines(board, skipEmpty=True):
+    cellFormat = _CELL_FORMAT
+    if skipEmpty:
+        cells = board.iterCells()
+    else:
+        cells = board.iterAllCells()
+    for (x, y), counts in cells:
+        yield cellFormat % (x, y, counts[0], counts[1], counts[2], counts[3])
 
 
 def getCellsStrings(board):
-    text = ''
-    for pos in board.cells.keys():
-        text = text + 'cell ' + str(pos[0]) + ' ' + str(pos[1]) + ' ' + getQuantities(board.cells[pos].stones)
-    return text
+    return ''.join(iterCellsLines(board))
 
 
 def getQuantities(dict_colours):
-    text = ''
-    for c in ['blue', 'black', 'red', 'green']:
-        if c == 'blue':
-            text = text + 'Azul ' + str(dict_colours[c]) + ' '
-        elif c == 'black':
-            text = text + 'Negro ' + str(dict_colours[c]) + ' '
-        elif c == 'red':
-            text = text + 'Rojo ' + str(dict_colours[c]) + ' '
-        elif c == 'green':
-            text = text + 'Verde ' + str(dict_colours[c]) + '\n'
-    return text
\ No newline at end of file
+    return 'Azul %d Negro %d Rojo %d Verde %d\n' % (
+        dict_colours['blue'], dict_colours['black'],
+        dict_colours['red'], dict_colours['green'])
+
+
+# Binary boards
+#--------------
+#
+# A binary board is a header followed by the stones buffer of an ArrayBoard
+# (4 planes of width * height counters, one per color), every number being
+# an unsigned little-endian 32 bit integer:
+#
+#   magic 'GBBB' | version | width | height | head x | head y | stones...
+
+BINARY_MAGIC = 'GBBB'
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<4sIIIII')
+
+
+def isBinaryBoard(data):
+    return data[:len(BINARY_MAGIC)] == BINARY_MAGIC
+
+
+def boardToBinary(board):
+    if not isinstance(board, ArrayBoard):
+        board = ArrayBoard.fromBoard(board)
+    stones = board.stones
+    if sys.byteorder == 'big':
+        stones = array(stones.typecode, stones)
+        stones.byteswap()
+    header = _BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION,
+                                 board.size[0], board.size[1],
+                                 board.head[0], board.head[1])
+    return header + stones.tostring()
+
+
+def parseABoardBinary(data, boardClass=ArrayBoard):
+    '''Return the board encoded by boardToBinary. The stones are loaded
+    into an ArrayBoard with a single copy, other board classes are built
+    from it'''
+    if len(data) < _BINARY_HEADER.size:
+        raise BoardParseException('Truncated binary board header', 1, 1)
+    magic, version, width, height, headX, headY = \
+        _BINARY_HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC:
+        raise BoardParseException('Not a binary board', 1, 1)
+    if version != BINARY_VERSION:
+        raise BoardParseException('Unsupported binary board version %d'
+                                  % (version,), 1, 1)
+    board = ArrayBoard(None, {}, (headX, headY))
+    board.size = (width, height)
+    payload = len(data) - _BINARY_HEADER.size
+    expected = 4 * width * height * board.stones.itemsize
+    if payload != expected:
+        raise BoardParseException('Expected %d bytes of stones but found %d'
+                                  % (expected, payload),
+                                  1, _BINARY_HEADER.size + 1)
+    board.stones.fromstring(data[_BINARY_HEADER.size:])
+    if sys.byteorder == 'big':
+        board.stones.byteswap()
+    if boardClass is ArrayBoard:
+        return board
+    return boardClass(board.size, board.cells, board.head)
+
+
+def parseABoard(data):
+    '''Return the board for data, either in GBB or in binary format'''
+    if isBinaryBoard(data):
+        return parseABoardBinary(data)
+    return parseABoardString(data)
@@ -3,11 +3,17 @@ import xml.etree.ElementTree as ET
 
 class ParseXML():
     def getDictFromXML(self, clothing):
+        self.dict = dict(self.getRulesFromXML(clothing))
+        return self.dict
+
+    def getRulesFromXML(self, clothing):
+        '''(blue, black, red, green) patterns and their images, in the order
+           of the file'''
         tree = ET.parse(clothing)
         root = tree.getroot()
 
         iterator = root.iter()
-        self.dict = {}
+        rules = []
 
         for item in iterator:
             if item.tag == 'Blue':
@@ -20,11 +26,6 @@ class ParseXML():
                 self.green = item.text
             elif item.tag == 'Image':
                 self.image = item.text
-                self.dict[(self.blue, self.black, self.red, self.green)] = self.image
-
-        return self.dict
-
-
-
-
+                rules.append(((self.blue, self.black, self.red, self.green), self.image))
 
+        return rules
@@ -0,0 +1,62 @@
+from PyQt4 import QtGui
+from PyQt4 import QtCore
+
+decodedImages = {}
+decodedGeneration = [0]
+
+
+def decodedImage(name):
+    '''Image of a resource (':/name.png') or a file, decoded once per process
+       in the format painters blit fastest'''
+    image = decodedImages.get(name)
+    if image is None:
+        image = QtGui.QImage(name)
+        if not image.isNull():
+            image = image.convertToFormat(QtGui.QImage.Format_ARGB32_Premultiplied)
+        decodedImages[name] = image
+    return image
+
+
+def forgetImage(name):
+    '''Drops the decoded image of a file that changed, and every sprite
+       scaled from the images decoded so far'''
+    decodedImages.pop(name, None)
+    decodedGeneration[0] += 1
+
+
+class SpriteAtlas(object):
+    '''Images scaled to the size they are drawn at, so drawing one is a blit
+       instead of a decode and a scale. Sprites are kept for a single cell
+       side: setting another side drops them.'''
+
+    def __init__(self):
+        self.side = None
+        self.generation = decodedGeneration[0]
+        self.sprites = {}
+
+    def setSide(self, side):
+        if side != self.side:
+            self.side = side
+            self.sprites.clear()
+
+    def sprite(self, name, width, height):
+        if self.generation != decodedGeneration[0]:
+            self.generation = decodedGeneration[0]
+            self.sprites.clear()
+        key = (name, width, height)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            image = decodedImage(name)
+            if image.isNull():
+                sprite = image
+            else:
+                sprite = image.scaled(width, height, QtCore.Qt.IgnoreAspectRatio,
+                                      QtCore.Qt.SmoothTransformation)
+            self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, painter, rect, name):
+        width = int(round(rect.width()))
+        height = int(round(rect.height()))
+        if width > 0 and height > 0:
+            painter.drawImage(rect.topLeft(), self.sprite(name, width, height))
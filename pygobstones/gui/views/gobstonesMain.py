@@ -12,6 +12,7 @@ import resources
 sys.path.append('..')
 from pygobstones.commons.i18n import *
 from pygobstones.gui.textEditor import *
+from pygobstones.gui.loggerWidget import LoggerWidget
 
  
 
@@ -69,9 +70,8 @@ class Ui_MainWindow(object):
         self.set_highlighter(GobstonesHighlighter)
         
 
-        self.logger = QtGui.QTextEdit()
+        self.logger = LoggerWidget()
         self.logger.setObjectName(_fromUtf8('logger'))
-        self.logger.setReadOnly(True)
         self.logger.setStyleSheet("font-family: Monospace, Consolas, 'Courier New'; font-weight: 100; font-size: 10pt")
         self.grid = QtGui.QGridLayout()
         self.grid.setSpacing(1)
@@ -176,6 +176,10 @@ class Ui_MainWindow(object):
         icon12 = QtGui.QIcon(":/start.png")
         self.actionRun.setIcon(icon12)
         self.actionRun.setObjectName(_fromUtf8('actionRun'))
+        self.actionRunOnBoardDirectory = QtGui.QAction(MainWindow)
+        self.actionRunOnBoardDirectory.setObjectName(_fromUtf8('actionRunOnBoardDirectory'))
+        self.actionRunOnRandomBoards = QtGui.QAction(MainWindow)
+        self.actionRunOnRandomBoards.setObjectName(_fromUtf8('actionRunOnRandomBoards'))
         self.actionStop = QtGui.QAction(MainWindow)
         icon13 = QtGui.QIcon(":/stop.png")
         self.actionStop.setIcon(icon13)
@@ -256,6 +260,9 @@ class Ui_MainWindow(object):
         self.menuGobstones.addAction(self.actionRun)
         self.menuGobstones.addAction(self.actionStop)
         self.menuGobstones.addAction(self.actionCheck)
+        self.menuGobstones.addSeparator()
+        self.menuGobstones.addAction(self.actionRunOnBoardDirectory)
+        self.menuGobstones.addAction(self.actionRunOnRandomBoards)
         self.menuBoard.addSeparator()
         self.menuBoard.addAction(self.actionLoadBoard)
         self.menuBoard.addAction(self.actionBoardOptions)
@@ -365,6 +372,14 @@ class Ui_MainWindow(object):
         self.actionCheck.setToolTip(_translate('MainWindow',
                          i18n('Checks if the program is well-formed'), None))
         self.actionCheck.setShortcut(_translate('MainWindow', 'F10', None))
+        self.actionRunOnBoardDirectory.setText(_translate('MainWindow',
+                                 i18n('Run on a board directory...'), None))
+        self.actionRunOnBoardDirectory.setToolTip(_translate('MainWindow',
+            i18n('Runs the current program on every board of a directory'), None))
+        self.actionRunOnRandomBoards.setText(_translate('MainWindow',
+                                 i18n('Run on random boards...'), None))
+        self.actionRunOnRandomBoards.setToolTip(_translate('MainWindow',
+            i18n('Runs the current program on random boards'), None))
         self.actionManual.setText(_translate('MainWindow', i18n('Manual'), None))
         self.actionManual.setToolTip(_translate('MainWindow',
                                 i18n('Open the Gobstones\'s manual'), None))
@@ -0,0 +1,164 @@
+""" Front-end of ProgramExecution for trollius event loops. Needs the
+`async` extra (trollius); importing this module raises ImportError
+without it.
+
+    @trollius.coroutine
+    def grade(source, board):
+        stream = run_program(source, board)
+        events, result = yield From(stream.collect())
+"""
+
+import collections
+import trollius
+from trollius import From, Return
+from pygobstones.language.programExecution import (EjecutionHandler,
+    ProgramExecution, BoardFormat, create_pool, get_worker_class)
+from pygobstones.language.boardSuite import END_OF_INPUT
+
+
+class AsyncProgramRun(ProgramExecution):
+    """ Dispatches the messages of the run in a trollius event loop. `run`
+    returns a future for the result.
+    """
+
+    def __init__(self, gobstones_version, handler=EjecutionHandler(),
+                 board_format=BoardFormat.TEXT, pool=None, loop=None,
+                 limits=None):
+        ProgramExecution.__init__(self, gobstones_version, handler,
+                                  board_format, pool, limits)
+        self.loop = loop or trollius.get_event_loop()
+        self.future = None
+
+    def run(self, filename, current_text, board_string, run_mode=None):
+        self.future = self.create_future()
+        self.start(filename, current_text, board_string, run_mode)
+        self.reader_init(lambda comm, message:
+            self.loop.call_soon_threadsafe(self.deliver, comm, message))
+        self.loop.call_soon(self.pool.refill)
+        return self.future
+
+    def create_future(self):
+        return trollius.Future(loop=self.loop)
+
+    def finished(self):
+        if not self.future is None and not self.future.done():
+            self.future.set_result(self.result)
+
+
+class ProgramEvent(object):
+    """ LOG, PARTIAL or READ_REQUEST message streamed by a ProgramStream """
+    LOG = 'log'
+    PARTIAL = 'partial'
+    READ_REQUEST = 'read_request'
+
+    def __init__(self, kind, body=None):
+        self.kind = kind
+        self.body = body
+
+    def __repr__(self):
+        return 'ProgramEvent(%r, %r)' % (self.kind, self.body)
+
+
+class ProgramStream(EjecutionHandler):
+    """ Handler of an AsyncProgramRun that queues its events for a
+    coroutine. `next_event` gives them one at a time as futures, resolved
+    with None once the run is over, and `result` gives a future for the
+    body of the OK message or the failure exception.
+    """
+
+    def __init__(self):
+        self.execution = None
+        self.events = collections.deque()
+        self.waiting = None
+        self.done = False
+
+    def log(self, message_string):
+        self.push(ProgramEvent(ProgramEvent.LOG, message_string))
+
+    def partial(self, board_string):
+        self.push(ProgramEvent(ProgramEvent.PARTIAL, board_string))
+
+    def read_request(self):
+        self.push(ProgramEvent(ProgramEvent.READ_REQUEST))
+
+    def success(self, board_string, result):
+        self.end()
+
+    def failure(self, exception):
+        self.end()
+
+    def send_input(self, keycode):
+        """ Answers a READ_REQUEST event """
+        self.execution.send_input(keycode)
+
+    def abort(self):
+        if self.execution.running:
+            self.execution.abort()
+
+    def push(self, event):
+        if self.waiting is None:
+            self.events.append(event)
+        else:
+            waiting, self.waiting = self.waiting, None
+            waiting.set_result(event)
+
+    def end(self):
+        self.done = True
+        if not self.waiting is None:
+            waiting, self.waiting = self.waiting, None
+            waiting.set_result(None)
+
+    def next_event(self):
+        future = self.execution.create_future()
+        if len(self.events) > 0:
+            future.set_result(self.events.popleft())
+        elif self.done:
+            future.set_result(None)
+        else:
+            self.waiting = future
+        return future
+
+    def result(self):
+        return self.execution.future
+
+    @trollius.coroutine
+    def collect(self, read_input=lambda: END_OF_INPUT):
+        """ Events of the whole run and its result. READ_REQUESTs are
+        answered with `read_input()`, the end of input by default.
+        """
+        events = []
+        while True:
+            event = yield From(self.next_event())
+            if event is None:
+                break
+            events.append(event)
+            if event.kind == ProgramEvent.READ_REQUEST:
+                self.send_input(read_input())
+        result = yield From(self.result())
+        raise Return((events, result))
+
+
+shared_pools = {}
+
+
+def shared_pool(board_format=BoardFormat.TEXT):
+    """ Pool of the worker processes of run_program, one per format """
+    if not board_format in shared_pools:
+        shared_pools[board_format] = create_pool(get_worker_class(),
+                                                 board_format)
+    return shared_pools[board_format]
+
+
+def run_program(source, board, mode=None, filename='program.gbs',
+                gobstones_version='gobstones', board_format=BoardFormat.TEXT,
+                pool=None, loop=None, limits=None):
+    """ Starts running `source` on the GBB `board` in the `mode` of
+    ProgramWorker.RunMode, FULL by default, and returns its ProgramStream.
+    Many programs can run at the same time from one event loop, they
+    share a pool of worker processes unless `pool` is given.
+    """
+    stream = ProgramStream()
+    stream.execution = AsyncProgramRun(gobstones_version, stream,
+        board_format, pool or shared_pool(board_format), loop, limits)
+    stream.execution.run(filename, source, board, mode)
+    return stream
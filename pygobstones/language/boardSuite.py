@@ -0,0 +1,170 @@
+import os
+import glob
+import time
+import threading
+import multiprocessing
+import multiprocessing.pool
+import pygobstones.commons.concurrent as concurrent
+import pygobstones.gui.views.boardPrint.parseBoard as parseBoard
+from pygobstones.gui.views.boardPrint.board import RandomBoardGenerator
+from pygobstones.language.programExecution import (EjecutionHandler,
+    SyncProgramRun)
+
+""" Keycode the GUI sends when the interactive window is closed """
+END_OF_INPUT = 4
+
+
+def boards_from_directory(directory):
+    """ (name, contents) of the .gbb files of a directory, sorted by name """
+    boards = []
+    for filename in sorted(glob.glob(os.path.join(directory, '*.gbb'))):
+        with open(filename, 'rb') as f:
+            boards.append((os.path.basename(filename), f.read()))
+    return boards
+
+
+def random_boards(count):
+    """ (name, GBB text) of `count` boards made by a RandomBoardGenerator """
+    return [('random-%d' % (number,),
+             RandomBoardGenerator().generate().getStringBoard())
+            for number in range(1, count + 1)]
+
+
+class RecordHandler(EjecutionHandler):
+    """ Collects the log of a run and answers its reads with the end of
+    input keycode.
+    """
+
+    def __init__(self):
+        self.execution = None
+        self.log_messages = []
+
+    def log(self, message_string):
+        self.log_messages.append(message_string)
+
+    def read_request(self):
+        self.execution.send_input(END_OF_INPUT)
+
+
+class SuiteOutcome(object):
+    """ How the program did on one board of the suite. `final_board` and
+    `result` are the body of the OK message, `exception` the failure.
+    """
+
+    OK = 'ok'
+    FAILURE = 'failure'
+    ERROR = 'error'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, index, name, initial_board, status, final_board=None,
+                 result=None, exception=None, time=0.0, log_messages=()):
+        self.index = index
+        self.name = name
+        self.initial_board = initial_board
+        self.status = status
+        self.final_board = final_board
+        self.result = result
+        self.exception = exception
+        self.time = time
+        self.log_messages = list(log_messages)
+
+    def __repr__(self):
+        return 'SuiteOutcome(%r, %r, %r)' % (self.index, self.name,
+                                             self.status)
+
+
+class SuiteRun(object):
+    """ Runs one program on every board of a suite, `jobs` boards at a
+    time, each on its own worker of the pool. Runs never wait for the
+    user: reads are answered with the end of input.
+    """
+
+    def __init__(self, gobstones_version, pool, jobs=None, limits=None):
+        self.gobstones_version = gobstones_version
+        self.pool = pool
+        self.jobs = jobs or multiprocessing.cpu_count()
+        self.limits = limits
+        self.cancelled = False
+        self.executions = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def run(self, filename, source, boards, on_outcome, on_finished=None,
+            run_mode=None):
+        """ Starts the suite in the background and returns. `on_outcome` is
+        called with each SuiteOutcome as the boards finish, in any order,
+        and `on_finished` with no arguments at the end. Both are called
+        from threads of the suite.
+        """
+        self.cancelled = False
+        self.thread = concurrent.Thread(target=self.run_all,
+            args=(filename, source, list(boards), run_mode, on_outcome,
+                  on_finished))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run_all(self, filename, source, boards, run_mode, on_outcome,
+                on_finished):
+        tasks = [(index, name, board, run_mode)
+                 for index, (name, board) in enumerate(boards)]
+        supervisors = multiprocessing.pool.ThreadPool(self.jobs)
+        try:
+            for outcome in supervisors.imap_unordered(
+                    lambda task: self.run_board(filename, source, *task),
+                    tasks):
+                on_outcome(outcome)
+        finally:
+            supervisors.close()
+            supervisors.join()
+            if not on_finished is None:
+                on_finished()
+
+    def run_board(self, filename, source, index, name, board, run_mode):
+        if self.cancelled:
+            return SuiteOutcome(index, name, board, SuiteOutcome.CANCELLED)
+        start = time.time()
+        try:
+            board = parseBoard.boardToString(parseBoard.parseABoard(board))
+        except parseBoard.BoardParseException as exception:
+            return SuiteOutcome(index, name, board, SuiteOutcome.ERROR,
+                                exception=exception)
+
+        handler = RecordHandler()
+        execution = SyncProgramRun(self.gobstones_version, handler,
+                                   pool=self.pool, limits=self.limits)
+        handler.execution = execution
+        with self.lock:
+            if self.cancelled:
+                return SuiteOutcome(index, name, board, SuiteOutcome.CANCELLED)
+            self.executions.add(execution)
+        try:
+            result = execution.run(filename, source, board, run_mode)
+        finally:
+            with self.lock:
+                self.executions.discard(execution)
+        elapsed = time.time() - start
+        if execution.cancelled:
+            return SuiteOutcome(index, name, board, SuiteOutcome.CANCELLED,
+                                exception=result, time=elapsed,
+                                log_messages=handler.log_messages)
+        if isinstance(result, Exception):
+            return SuiteOutcome(index, name, board, SuiteOutcome.FAILURE,
+                                exception=result, time=elapsed,
+                                log_messages=handler.log_messages)
+        return SuiteOutcome(index, name, board, SuiteOutcome.OK,
+                            final_board=result[0], result=result[1],
+                            time=elapsed, log_messages=handler.log_messages)
+
+    def cancel(self):
+        """ Interrupts the running boards, the rest are not started """
+        with self.lock:
+            self.cancelled = True
+            for execution in self.executions:
+                execution.cancel()
+
+    def is_running(self):
+        return not self.thread is None and self.thread.is_alive()
+
+    def wait(self, timeout=None):
+        if not self.thread is None:
+            self.thread.join(timeout)
@@ -0,0 +1,103 @@
+import hashlib
+import collections
+import Queue as queue
+import pygobstones.commons.concurrent as concurrent
+from pygobstones.language.verdictCache import library_path
+
+
+def text_hash(text):
+    if isinstance(text, unicode):
+        text = text.encode('utf-8')
+    return hashlib.sha1(text).hexdigest()
+
+
+class NameIndex(object):
+    """ Names defined by a program and its library, as `parse_names` gives
+    them. The names of a program are cached by the hash of its text and of
+    its library, the newest `capacity` of them are kept. The library is
+    parsed on its own once, and again only when its text changes, so its
+    names are there even while the program does not parse.
+    """
+
+    def __init__(self, parse_names, capacity=32):
+        self.parse_names = parse_names
+        self.capacity = capacity
+        self.programs = collections.OrderedDict()
+        self.library_hash = None
+        self.library_names = {}
+
+    def names(self, filename, text):
+        """ Names of the library updated with the names of the program.
+        Raises whatever `parse_names` raises for the program.
+        """
+        library_hash = self.update_library(filename)
+        key = (text_hash(text), library_hash)
+        program_names = self.programs.pop(key, None)
+        if program_names is None:
+            program_names = self.parse_names(filename, text)
+        self.programs[key] = program_names
+        while len(self.programs) > self.capacity:
+            self.programs.popitem(last=False)
+        names = dict(self.library_names)
+        names.update(program_names)
+        return names
+
+    def update_library(self, filename):
+        library = library_path(filename)
+        text = ''
+        if not library is None:
+            with open(library, 'rb') as f:
+                text = f.read()
+        library_hash = text_hash(text)
+        if library_hash != self.library_hash:
+            self.library_hash = library_hash
+            self.library_names = {}
+            if not library is None:
+                try:
+                    self.library_names = self.parse_names(library, text)
+                except Exception:
+                    pass
+        return library_hash
+
+
+class NameParser(concurrent.Thread):
+    """ Answers name requests from a thread of its own, calling `success`
+    with the names or `failure` with the exception, from that thread.
+    Requests made while it is parsing are coalesced: only the newest one
+    is parsed next.
+    """
+
+    def __init__(self, index, success, failure):
+        concurrent.Thread.__init__(self)
+        self.daemon = True
+        self.index = index
+        self.success = success
+        self.failure = failure
+        self.requests = queue.Queue()
+
+    def request(self, filename, text):
+        self.requests.put((filename, text))
+
+    def stop(self):
+        self.requests.put(None)
+
+    def run(self):
+        while True:
+            request = self.newest_request()
+            if request is None:
+                return
+            try:
+                names = self.index.names(*request)
+            except Exception as exception:
+                self.failure(exception)
+            else:
+                self.success(names)
+
+    def newest_request(self):
+        request = self.requests.get()
+        while not request is None:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+        return request
@@ -0,0 +1,476 @@
+import threading
+import Queue as queue
+import pygobstones.commons.messaging as messaging
+import pygobstones.gui.views.boardPrint.parseBoard as parseBoard
+from pygobstones.language.workerPool import WorkerPool
+from pygobstones.language.verdictCache import (VerdictCache, cache_path,
+    library_text, worker_salt)
+from pygobstones.language.runLimits import (RunLimits, LimitException,
+    TimeLimitException, CallLimitException, MemoryLimitException,
+    LimitWatchdog, LimitedCommunicator)
+
+""" Run workers in threads instead of processes """
+debug = False
+
+CANCELLED_MESSAGE = 'Execution interrupted by the user'
+
+
+def get_worker_class():
+    import pygobstoneslang
+    return pygobstoneslang.GobstonesWorker
+
+
+def reverse_list(lst):
+    return [lst.pop() for _ in range(len(lst))]
+
+
+class EjecutionHandler(object):
+
+    def success(self, board_string, result):
+        pass
+
+    def failure(self, exception):
+        pass
+
+    def log(self, message_string):
+        pass
+
+    def read_request(self):
+        pass
+
+    def partial(self, board_string):
+        pass
+
+
+class EjecutionFailureHandler(object):
+    """ Serves exception based on an internal dictionary which
+    specifies different failure handlers for each failure type.
+    """
+
+    """ Failure type constants """
+    DEFAULT = 'GobstonesException'
+    PARSER_FAILURE = 'GbsParserException|ParserException'
+    SEMANTIC_FAILURE = 'GbsLintException'
+    LIVENESS_FAILURE = 'GbsLivenessException|GbsUninitializedVarException|GbsUnusedVarException'
+    TYPECHECK_FAILURE = 'GbsTypeInferenceException'
+    TYPESYNTAX_FAILURE = 'GbsTypeSyntaxException'
+    OPTIMIZER_FAILURE = 'GbsOptimizerException'
+    COMPILER_FAILURE = 'GbsCompileException'
+    RUNTIME_FAILURE = 'GbsRuntimeException'
+    RUNTIMETYPE_FAILURE = 'GbsRuntimeTypeException'
+    VM_FAILURE = 'GbsVmException'
+    STATIC_FAILURE = '|'.join([PARSER_FAILURE,
+                               SEMANTIC_FAILURE,
+                               LIVENESS_FAILURE,
+                               TYPECHECK_FAILURE,
+                               TYPESYNTAX_FAILURE,
+                               'StaticException'])
+    LIMIT_FAILURE = 'TimeLimitException|CallLimitException|MemoryLimitException'
+    BOARD_FAILURE = 'BoardParseException'
+    DYNAMIC_FAILURE = '|'.join([RUNTIME_FAILURE,
+                                RUNTIMETYPE_FAILURE,
+                                VM_FAILURE,
+                                OPTIMIZER_FAILURE,
+                                LIMIT_FAILURE,
+                                'DynamicException'])
+
+    def __init__(self, handler_or_dict):
+        """ Receives a failure handler or a dictionary of handlers.
+        Dicionary keys are expected to be one of the constants defined in this class.
+        """
+        if isinstance(handler_or_dict, dict):
+            self.exception_handlers = handler_or_dict
+        else:
+            self.exception_handlers = {self.DEFAULT: handler_or_dict}
+
+    def failure(self, exception):
+        """ Exception will be served only once. Singular failure types have
+        the top priority. If there is no handler for the exception, general failure
+        handlers {STATIC | DYNAMIC} are dispatched to serve the exception. If it still
+        remain unserved, DEFAULT handler is dispatched.
+        """
+        exception_type = exception.__class__.__name__
+        handlers = self.get_handlers_for(exception_type)
+
+        if len(handlers) != 0:
+            handlers[0](exception)
+        else:
+            raise Exception('There is no failure handler defined for %s.' % (exception_type,))
+
+    def get_handlers_for(self, exception_type):
+        return self.sort_handlers([(failure_type, handler) for failure_type, handler in self.exception_handlers.items() if self.is_failure_type(exception_type, failure_type)])
+
+    def sort_handlers(self, handlers):
+        dict_handlers = dict(handlers)
+        sorted_list = [dict_handlers.pop(self.DEFAULT, None),
+                       dict_handlers.pop(self.DYNAMIC_FAILURE, None),
+                       dict_handlers.pop(self.STATIC_FAILURE, None)]
+        sorted_list.extend(dict_handlers.values())
+        return reverse_list(filter(None, sorted_list))
+
+    def is_failure_type(self, exception_type, failure_type):
+        return exception_type in failure_type.split('|')
+
+    def is_handler_defined(self, failure_type):
+        return self.PARSER_FAILURE in self.exception_handlers.keys()
+
+
+class BoardFormat(object):
+    """ Formats for the boards the worker sends back in OK and PARTIAL
+    messages. The initial board is always sent as GBB text, as that is
+    what the interpreter reads.
+    """
+    TEXT = 'text'
+    BINARY = 'binary'
+
+
+class BinaryBoardCommunicator(object):
+    """ Wraps the worker side communicator to re-encode the GBB boards of
+    OK and PARTIAL messages in the binary board format, so the board is
+    parsed in the worker process and the GUI only has to copy the stones
+    buffer. Anything that is not a GBB board is sent untouched.
+    """
+
+    def __init__(self, communicator):
+        self.communicator = communicator
+
+    def send(self, header, body=None):
+        if header == 'OK':
+            body = (self.encode(body[0]),) + tuple(body[1:])
+        elif header == 'PARTIAL':
+            body = self.encode(body)
+        self.communicator.send(header, body)
+
+    def receive(self, timeout=None):
+        return self.communicator.receive(timeout)
+
+    def receive_nowait(self):
+        return self.communicator.receive_nowait()
+
+    def flush(self):
+        self.communicator.flush()
+
+    def encode(self, board_string):
+        if not isinstance(board_string, basestring):
+            return board_string
+        try:
+            board = parseBoard.parseABoardString(board_string, parseBoard.ArrayBoard)
+        except parseBoard.BoardParseException:
+            return board_string
+        return parseBoard.boardToBinary(board)
+
+
+def create_pool(worker_class, board_format=BoardFormat.TEXT,
+                persist_verdicts=False, **options):
+    """ WorkerPool whose workers send their boards in `board_format` and
+    can be given a call limit. Its VerdictCache is also kept on disk if
+    `persist_verdicts` is set.
+    """
+    use_threads = options.setdefault('use_threads', debug)
+    if not 'verdicts' in options:
+        directory = None
+        if persist_verdicts:
+            directory = cache_path()
+        options['verdicts'] = VerdictCache(directory,
+                                           salt=worker_salt(worker_class))
+
+    def wrap_comm(communicator):
+        if board_format == BoardFormat.BINARY:
+            communicator = BinaryBoardCommunicator(communicator)
+        return LimitedCommunicator(communicator, not use_threads)
+    return WorkerPool(worker_class, wrap_comm=wrap_comm, **options)
+
+
+class ProgramExecution(object):
+    """ Qt free core of a program run: leases a worker, sends it the
+    program and dispatches the messages it answers with to the handler.
+    Front-ends decide how the messages are read.
+    """
+
+    def __init__(self, gobstones_version, handler=EjecutionHandler(),
+                 board_format=BoardFormat.TEXT, pool=None, limits=None):
+        """ A `pool` can be shared between runs of different languages,
+        the version is sent to the worker with each program. Call limits
+        need a pool made by `create_pool`.
+        """
+        self.running = False
+        self.process = None
+        self.worker = None
+        self.leased = None
+        self.reader = None
+        self.forward = None
+        self.watchdog = None
+        self.verdict_key = None
+        self.checking = False
+        self.cancelled = False
+        self.limits = limits or RunLimits()
+        self.result = None
+        self.handler = handler
+        self.comm = None
+        self.gobstones_version = gobstones_version
+        self.board_format = board_format
+        if pool is None:
+            pool = self.create_pool()
+        self.pool = pool
+
+    def get_worker_class(self):
+        return get_worker_class()
+
+    def get_run_mode(self, run_mode):
+        if run_mode is None:
+            from pygobstoneslang import ProgramWorker
+            run_mode = ProgramWorker.RunMode.FULL
+        return run_mode
+
+    def is_check(self, run_mode):
+        try:
+            from pygobstoneslang import ProgramWorker
+        except ImportError:
+            return False
+        return run_mode == ProgramWorker.RunMode.ONLY_CHECK
+
+    def create_pool(self):
+        return create_pool(self.get_worker_class(), self.board_format)
+
+    def warm_up(self):
+        """ Starts the idle workers of the pool ahead of the first run """
+        self.pool.refill()
+
+    def shutdown(self):
+        self.reader_stop()
+        self.destroy_worker_process()
+        self.pool.shutdown()
+
+    def create_worker_process(self):
+        if self.process is None:
+            self.leased = self.pool.lease()
+            self.comm = self.leased.comm
+            self.worker = self.leased.worker
+            self.process = self.leased.process
+
+    def destroy_worker_process(self, crashed=True):
+        if not self.process is None:
+            self.release_worker(self.leased, crashed)
+            self.leased = None
+            self.process = None
+
+    def release_worker(self, leased, crashed):
+        """ Gives the worker back to the pool, which may terminate it """
+        self.pool.release(leased, crashed)
+
+    def start(self, filename, current_text, board_string, run_mode=None):
+        self.reader_stop()
+        if not self.process is None:
+            self.destroy_worker_process()
+        run_mode = self.get_run_mode(run_mode)
+        self.result = None
+        self.forward = None
+        self.running = True
+        self.cancelled = False
+        self.checking = self.is_check(run_mode)
+        verdict = self.cached_verdict(filename, current_text)
+        if not verdict is None:
+            self.verdict_key = None
+            self.comm = messaging.create_channel(messaging.THREAD)
+            self.comm.opposite().send(*verdict)
+            return
+        self.create_worker_process()
+
+        body = (filename,
+                current_text,
+                board_string,
+                run_mode,
+                self.gobstones_version)
+        if not self.limits.calls is None:
+            body += (self.limits.calls,)
+        self.comm.send('START', body)
+
+    def cached_verdict(self, filename, current_text):
+        """ The OK of an earlier check of the same program, when checking,
+        or its static failure. The worker is not needed for either.
+        """
+        verdicts = self.pool.verdicts
+        if verdicts is None:
+            self.verdict_key = None
+            return None
+        self.verdict_key = verdicts.key(current_text, self.gobstones_version,
+                                        library_text(filename))
+        verdict = verdicts.get(self.verdict_key)
+        if verdict is None or (verdict[0] == VerdictCache.CHECKED
+                               and not self.checking):
+            return None
+        return verdict
+
+    def remember_verdict(self, message):
+        if self.verdict_key is None:
+            return
+        if message.header == 'OK' and self.checking:
+            self.pool.verdicts.put(self.verdict_key, VerdictCache.CHECKED,
+                                   message.body)
+        elif (message.header == 'FAIL' and message.body[0].__name__ in
+              EjecutionFailureHandler.STATIC_FAILURE.split('|')):
+            self.pool.verdicts.put(self.verdict_key, VerdictCache.FAILED,
+                                   message.body)
+
+    def watchdog_stop(self):
+        if not self.watchdog is None:
+            self.watchdog.stop()
+            self.watchdog = None
+
+    def reader_init(self, forward):
+        """ Reads the messages of this run in a thread, handing each of
+        them to `forward` together with the communicator it came from.
+        The failures of the run found in the supervisor, by cancel or by
+        the watchdog of its limits, are handed to `forward` as well.
+        """
+        self.forward = lambda message, comm=self.comm: forward(comm, message)
+        self.reader = messaging.MessageReader(self.comm, self.forward,
+                                              until=('OK', 'FAIL'))
+        self.reader.start()
+        if self.cancelled:
+            self.fail_locally(Exception(CANCELLED_MESSAGE))
+        elif self.limits.needs_watchdog() and not self.leased is None:
+            self.watchdog = LimitWatchdog(self.limits, self.fail_locally,
+                                          self.leased.pid())
+            self.watchdog.start()
+
+    def fail_locally(self, exception):
+        """ Fails the run with `exception` from the supervisor. The FAIL
+        goes to the front-end like the ones of the worker, but nothing is
+        written to the channel, which only the worker writes to.
+        """
+        forward = self.forward
+        if not forward is None:
+            forward(messaging.Message('FAIL', (exception.__class__,
+                                               exception.args)))
+
+    def reader_stop(self):
+        """ Stops the reader and waits for it, unless it is the caller """
+        reader, self.reader = self.reader, None
+        if not reader is None:
+            reader.stop()
+            if not reader is threading.current_thread():
+                reader.join()
+
+    def send_input(self, keycode):
+        if self.running:
+            self.comm.send('READ_DONE', keycode)
+
+    def deliver(self, comm, message):
+        """ Dispatches a message unless it is still in flight from a
+        previous run.
+        """
+        if self.running and comm is self.comm:
+            self.dispatch(message)
+
+    def dispatch(self, message):
+        if message.header in ('OK', 'FAIL'):
+            self.remember_verdict(message)
+        if message.header == 'OK':
+            self.result = message.body
+            try:
+                self.handler.success(*message.body)
+            finally:
+                self.stop()
+        elif message.header == 'FAIL':
+            reduced = message.body
+            args = list(reduced[1])
+            self.result = reduced[0](*args)
+            try:
+                self.handler.failure(self.result)
+            finally:
+                self.stop()
+        elif message.header == 'READ_REQUEST':
+            self.handler.read_request()
+        elif message.header == 'LOG':
+            self.handler.log(message.body)
+        elif message.header == 'PARTIAL':
+            self.handler.partial(message.body)
+        else:
+            print("Got an unexpected message '%s:%s'" %  (message.header, message.body))
+
+    def stop(self):
+        """ Ends the run, a worker that went over a limit is killed """
+        self.reader_stop()
+        self.watchdog_stop()
+        self.destroy_worker_process(crashed=self.cancelled or
+                                    isinstance(self.result, LimitException))
+        self.running = False
+        self.finished()
+
+    def cancel(self):
+        """ Interrupts the run from any thread. The run fails like an
+        aborted one and its worker is killed.
+        """
+        if self.running:
+            self.cancelled = True
+            self.fail_locally(Exception(CANCELLED_MESSAGE))
+
+    def abort(self):
+        self.reader_stop()
+        self.watchdog_stop()
+        self.destroy_worker_process()
+        self.running = False
+        self.result = Exception(CANCELLED_MESSAGE)
+        self.handler.failure(self.result)
+        self.finished()
+
+    def finished(self):
+        """ Called once the run is over, `result` holds the body of the OK
+        message or the failure exception.
+        """
+        pass
+
+
+class SyncProgramRun(ProgramExecution):
+    """ Runs a program in the calling thread, returning when it is over """
+
+    def run(self, filename, current_text, board_string, run_mode=None,
+            timeout=None):
+        """ Returns the body of the OK message or the failure exception.
+        Aborts the run if a message takes longer than `timeout` seconds.
+        """
+        inbox = queue.Queue()
+        self.start(filename, current_text, board_string, run_mode)
+        self.reader_init(lambda comm, message: inbox.put((comm, message)))
+        self.pool.refill()
+        try:
+            while self.running:
+                comm, message = inbox.get(True, timeout)
+                self.deliver(comm, message)
+        except queue.Empty:
+            self.abort()
+        return self.result
+
+
+class ThreadedProgramRun(ProgramExecution):
+    """ Dispatches the messages of the run from a reader thread, so the
+    handler is called from that thread. `wait` blocks until the end.
+    """
+
+    def __init__(self, *args, **kwargs):
+        ProgramExecution.__init__(self, *args, **kwargs)
+        self.done = threading.Event()
+        self.delivering = threading.RLock()
+
+    def run(self, filename, current_text, board_string, run_mode=None):
+        self.done.clear()
+        self.start(filename, current_text, board_string, run_mode)
+        self.reader_init(self.deliver)
+        self.pool.refill()
+
+    def deliver(self, comm, message):
+        """ Failures found in the supervisor come from other threads than
+        the reader, messages are dispatched one at a time.
+        """
+        with self.delivering:
+            ProgramExecution.deliver(self, comm, message)
+
+    def finished(self):
+        self.done.set()
+
+    def wait(self, timeout=None):
+        """ Returns the result, or None if the run is not over in time """
+        if self.done.wait(timeout):
+            return self.result
+        return None
@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import pygobstones.commons.concurrent as concurrent
+
+
+class LimitException(Exception):
+    """ A run went over one of its RunLimits """
+
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+        self.msg = msg
+
+
+class TimeLimitException(LimitException):
+    pass
+
+
+class CallLimitException(LimitException):
+    pass
+
+
+class MemoryLimitException(LimitException):
+    pass
+
+
+class RunLimits(object):
+    """ Limits of a single run, None meaning unlimited.
+
+    `wall_time` is in seconds and `memory` is the resident set size of
+    the worker process in bytes, both enforced by a LimitWatchdog in the
+    supervisor. `calls` is the number of Python function calls the worker
+    makes from its START on, enforced in the worker itself by a
+    LimitedCommunicator. The interpreter has no hook to count the steps of
+    the program, so these calls include parsing and compiling it, and
+    counting them slows the run down.
+    """
+
+    def __init__(self, wall_time=None, calls=None, memory=None):
+        self.wall_time = wall_time
+        self.calls = calls
+        self.memory = memory
+
+    def needs_watchdog(self):
+        return not self.wall_time is None or not self.memory is None
+
+
+def process_rss(pid):
+    """ Resident set size of a process in bytes, None if unknown """
+    try:
+        with open('/proc/%d/statm' % (pid,)) as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+class LimitWatchdog(concurrent.Thread):
+    """ Checks the wall time and the memory of a run every `interval`
+    seconds. When a limit is hit, the LimitException is handed to `fail`,
+    which ends the run in the supervisor; the channel of the worker is
+    left alone.
+    """
+
+    def __init__(self, limits, fail, pid=None, interval=0.05):
+        concurrent.Thread.__init__(self)
+        self.daemon = True
+        self.limits = limits
+        self.fail = fail
+        self.pid = pid
+        self.interval = interval
+        self.stopped = False
+
+    def run(self):
+        start = time.time()
+        while not self.stopped:
+            time.sleep(self.interval)
+            exception = self.check(time.time() - start)
+            if not exception is None and not self.stopped:
+                self.stopped = True
+                self.fail(exception)
+
+    def check(self, elapsed):
+        if not self.limits.wall_time is None and elapsed > self.limits.wall_time:
+            return TimeLimitException('Time limit exceeded (%.1f s)' %
+                                      (self.limits.wall_time,))
+        if not self.limits.memory is None and not self.pid is None:
+            rss = process_rss(self.pid)
+            if not rss is None and rss > self.limits.memory:
+                return MemoryLimitException('Memory limit exceeded (%d MB)' %
+                                            (self.limits.memory // 2 ** 20,))
+        return None
+
+    def stop(self):
+        self.stopped = True
+
+
+class LimitedCommunicator(object):
+    """ Wraps the worker side communicator. A START message may carry the
+    call limit as a sixth item, which is removed before the worker sees
+    it; the Python calls made from then on by the worker thread are
+    counted with a profile function and going over the limit fails the
+    run. A worker process sends the FAIL and exits right away from the
+    profile function, since an exception raised there could be caught by
+    the interpreter; a worker thread gets a CallLimitException raised.
+    """
+
+    def __init__(self, communicator, exit_process=True):
+        self.communicator = communicator
+        self.exit_process = exit_process
+        self.calls = 0
+
+    def send(self, header, body=None):
+        self.communicator.send(header, body)
+
+    def receive(self, timeout=None):
+        return self.limited(self.communicator.receive(timeout))
+
+    def receive_nowait(self):
+        return self.limited(self.communicator.receive_nowait())
+
+    def flush(self):
+        self.communicator.flush()
+
+    def limited(self, message):
+        if message.header == 'START' and len(message.body) > 5:
+            calls = message.body[5]
+            message.body = message.body[:5]
+            if not calls is None:
+                self.count_calls(calls)
+        return message
+
+    def count_calls(self, limit):
+        self.calls = 0
+
+        def profile(frame, event, arg):
+            if event == 'call':
+                self.calls += 1
+                if self.calls > limit:
+                    self.exceeded(limit)
+        sys.setprofile(profile)
+
+    def exceeded(self, limit):
+        sys.setprofile(None)
+        exception = CallLimitException('Call limit exceeded (%d calls)' %
+                                       (limit,))
+        self.send('FAIL', (exception.__class__, (exception.msg,)))
+        if self.exit_process:
+            self.flush()
+            os._exit(0)
+        raise exception
@@ -0,0 +1,120 @@
+import os
+import sys
+import hashlib
+import tempfile
+import threading
+import collections
+import cPickle as pickle
+from pygobstones.commons.paths import pygobstones_user_path
+
+
+def cache_path():
+    return os.path.join(pygobstones_user_path(), 'cache')
+
+
+def library_path(filename):
+    """ Path of the Biblioteca.gbs a program sees: the one next to it, or
+    the one in the working directory. None if there is none.
+    """
+    for directory in [os.path.dirname(str(filename)), os.getcwd()]:
+        library = os.path.join(directory, 'Biblioteca.gbs')
+        if os.path.isfile(library):
+            return library
+    return None
+
+
+def library_text(filename):
+    """ Text of the Biblioteca.gbs a program sees, empty if there is none """
+    library = library_path(filename)
+    if library is None:
+        return ''
+    with open(library, 'rb') as f:
+        return f.read()
+
+
+def worker_salt(worker_class):
+    """ Identifies the interpreter, so an upgrade does not reuse verdicts """
+    module = sys.modules.get(worker_class.__module__)
+    return '%s.%s %s' % (worker_class.__module__, worker_class.__name__,
+                         getattr(module, '__version__', ''))
+
+
+class VerdictCache(object):
+    """ Content addressed cache of what the static phases of the
+    interpreter said about a program: the OK of a check, or a static
+    failure. Keys are hashes of the source, the language version and the
+    library text. The newest `capacity` verdicts are kept in memory and,
+    when a `directory` is given, every verdict is also stored there.
+    """
+
+    CHECKED = 'OK'
+    FAILED = 'FAIL'
+
+    def __init__(self, directory=None, capacity=1024, salt=''):
+        self.directory = directory
+        self.capacity = capacity
+        self.salt = salt
+        self.verdicts = collections.OrderedDict()
+        self.lock = threading.Lock()
+        if not directory is None and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                self.directory = None
+
+    def key(self, source, gobstones_version, library):
+        digest = hashlib.sha1()
+        for part in [self.salt, gobstones_version, library, source]:
+            if isinstance(part, unicode):
+                part = part.encode('utf-8')
+            digest.update('%d:' % (len(part),))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """ The (header, body) verdict for key, or None """
+        with self.lock:
+            verdict = self.verdicts.pop(key, None)
+            if not verdict is None:
+                self.verdicts[key] = verdict
+                return verdict
+        verdict = self.load(key)
+        if not verdict is None:
+            self.remember(key, verdict)
+        return verdict
+
+    def put(self, key, header, body):
+        self.remember(key, (header, body))
+        self.store(key, (header, body))
+
+    def remember(self, key, verdict):
+        with self.lock:
+            self.verdicts.pop(key, None)
+            self.verdicts[key] = verdict
+            while len(self.verdicts) > self.capacity:
+                self.verdicts.popitem(last=False)
+
+    def load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, key), 'rb') as f:
+                return pickle.load(f)
+        except (IOError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError):
+            return None
+
+    def store(self, key, verdict):
+        if self.directory is None:
+            return
+        try:
+            fd, temporary = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(verdict, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(temporary, os.path.join(self.directory, key))
+        except (IOError, OSError, pickle.PicklingError):
+            pass
+
+    def clear(self):
+        with self.lock:
+            self.verdicts.clear()
@@ -0,0 +1,176 @@
+import os
+import signal
+import logging
+import threading
+import Queue as queue
+import pygobstones.commons.messaging as messaging
+import pygobstones.commons.concurrent as concurrent
+
+
+class PooledWorker(object):
+    """ A started worker process together with the communicator used to
+    talk to it from the GUI side.
+    """
+
+    def __init__(self, comm, worker, process):
+        self.comm = comm
+        self.worker = worker
+        self.process = process
+        self.runs = 0
+
+    def pid(self):
+        """ Process id of the worker, None if it is a thread """
+        if hasattr(self.process, 'terminate'):
+            return self.process.pid
+        return None
+
+    def is_alive(self):
+        if hasattr(self.process, 'is_alive'):
+            return self.process.is_alive()
+        return True
+
+    def terminate(self, grace=0.2):
+        """ Sends SIGTERM, and SIGKILL if the worker is still alive after
+        `grace` seconds. Worker threads cannot be stopped.
+        """
+        if hasattr(self.process, 'terminate'):
+            self.process.terminate()
+            self.process.join(grace)
+            if self.process.is_alive():
+                os.kill(self.process.pid, signal.SIGKILL)
+                self.process.join()
+
+
+class WorkerPool(object):
+    """ Keeps `size` worker processes started and idle, waiting for their
+    START message, so running a program does not pay the fork and the
+    interpreter setup.
+
+    A leased worker goes back to the pool when it is released, unless it
+    crashed or already served `max_runs` programs, in which case it is
+    terminated. GobstonesWorker serves a single program per process, so
+    `max_runs` defaults to 1 and every lease is followed by a `refill`.
+    Pools can be shared between threads, and `background` runs the slow
+    parts, starting and terminating workers, off the calling thread.
+    """
+
+    def __init__(self, worker_class, size=2, max_runs=1,
+                 wrap_comm=None, use_threads=False,
+                 transport=messaging.QUEUE, verdicts=None):
+        """ `worker_class` builds a worker from its communicator and
+        `wrap_comm`, when given, decorates the worker side communicator.
+        Every worker gets its own channel of the given `transport`.
+        `verdicts` is the VerdictCache shared by the runs on this pool.
+        """
+        self.worker_class = worker_class
+        self.size = size
+        self.max_runs = max_runs
+        self.wrap_comm = wrap_comm
+        self.use_threads = use_threads
+        self.transport = transport
+        self.verdicts = verdicts
+        self.idle = []
+        self.starting = 0
+        self.lock = threading.Lock()
+        self.helper = None
+        self.tasks = None
+
+    def create_worker(self):
+        comm = messaging.create_channel(self.transport)
+        worker_comm = comm.opposite()
+        if not self.wrap_comm is None:
+            worker_comm = self.wrap_comm(worker_comm)
+        worker = self.worker_class(worker_comm)
+
+        if self.use_threads:
+            process = concurrent.Thread(target=worker.run)
+        else:
+            process = concurrent.Process(target=worker.run)
+        process.daemon = True
+        process.start()
+        return PooledWorker(comm, worker, process)
+
+    def lease(self):
+        """ Returns an idle worker, starting one if there is none alive """
+        pooled = None
+        with self.lock:
+            while len(self.idle) > 0:
+                pooled = self.idle.pop(0)
+                if pooled.is_alive():
+                    break
+                pooled.terminate()
+                pooled = None
+        if pooled is None:
+            pooled = self.create_worker()
+        pooled.runs += 1
+        return pooled
+
+    def release(self, pooled, crashed=False):
+        with self.lock:
+            if not (crashed or pooled.runs >= self.max_runs
+                    or not pooled.is_alive() or len(self.idle) >= self.size):
+                self.idle.append(pooled)
+                return
+        pooled.terminate()
+
+    def refill(self):
+        """ Starts workers until there are `size` idle ones. The missing
+        workers are reserved before starting them, so concurrent refills
+        do not start more than `size` between them. Reservations that were
+        not started are given back if starting a worker fails.
+        """
+        with self.lock:
+            self.idle = [pooled for pooled in self.idle if pooled.is_alive()]
+            missing = max(0, self.size - len(self.idle) - self.starting)
+            self.starting += missing
+        started = 0
+        try:
+            while started < missing:
+                pooled = self.create_worker()
+                with self.lock:
+                    started += 1
+                    self.starting -= 1
+                    self.idle.append(pooled)
+        finally:
+            with self.lock:
+                self.starting -= missing - started
+
+    def background(self, function, *args):
+        """ Calls function(*args) in the helper thread of the pool, after
+        the calls given before. Failures are logged.
+        """
+        with self.lock:
+            if self.helper is None:
+                self.tasks = queue.Queue()
+                self.helper = concurrent.Thread(target=self.run_tasks,
+                                                args=(self.tasks,))
+                self.helper.daemon = True
+                self.helper.start()
+            self.tasks.put((function, args))
+
+    def run_tasks(self, tasks):
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            function, args = task
+            try:
+                function(*args)
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'Worker pool task %s failed', function.__name__)
+
+    def shutdown(self):
+        """ Waits for the calls given to `background` and terminates the
+        idle workers
+        """
+        with self.lock:
+            helper, self.helper = self.helper, None
+            if not helper is None:
+                self.tasks.put(None)
+        if not helper is None and not helper is threading.current_thread():
+            helper.join()
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for pooled in idle:
+            pooled.terminate()
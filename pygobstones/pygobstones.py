@@ -9,6 +9,7 @@ import sys
 import os
 import platform
 from commons.paths import root_path, pygobstones_user_path
+from commons.utils import timing_logger
 import logging
 import traceback
 
@@ -71,6 +72,7 @@ def setup_logger():
     logger.addHandler(filehandler) 
     logger.addHandler(consolehandler)
     logger.setLevel(logging.WARNING)
+    timing_logger().setLevel(logging.INFO)
 
 def main():
     setup_logger()
@@ -90,6 +90,7 @@ setup(
     extras_require={
         'dev': ['check-manifest'],
         'test': ['coverage'],
+        'async': ['trollius'],
     },
 
     # If there are data files included in your packages that need to be
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from workers import StreamingWorker, threadPool
+
+try:
+    import trollius
+    from trollius import From, Return
+    from pygobstones.language.asyncProgramRun import *
+except ImportError:
+    trollius = None
+
+
+@unittest.skipIf(trollius is None, 'needs the async extra (trollius)')
+class TestRunProgram(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = trollius.new_event_loop()
+        self.pool = threadPool(StreamingWorker)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_run_program_GivenAReadRequest_andStreamTheEventsInOrder(self):
+        '''Events are streamed in order and the stream ends with the run'''
+        stream = run_program('program', 'board', 'full', pool=self.pool,
+                             loop=self.loop)
+        events = []
+        while True:
+            event = self.loop.run_until_complete(stream.next_event())
+            if event is None:
+                break
+            events.append((event.kind, event.body))
+            if event.kind == ProgramEvent.READ_REQUEST:
+                stream.send_input(7)
+        self.assertEquals(events, [('partial', 'board'),
+                                   ('read_request', None), ('log', 7)])
+        self.assertEquals(self.loop.run_until_complete(stream.result()),
+                          ('board', 'full'))
+
+    def test_collect_GivenTwoRunsInACoroutine_andAnswerReadsWithEndOfInput(self):
+        '''Runs share the loop, and collect gives their events and results'''
+        @trollius.coroutine
+        def runBoth():
+            first = run_program('program', 'a', 'full', pool=self.pool,
+                                loop=self.loop)
+            second = run_program('boom', 'b', 'full', pool=self.pool,
+                                 loop=self.loop)
+            results = yield From(trollius.gather(first.collect(),
+                                                 second.collect(),
+                                                 loop=self.loop))
+            raise Return(results)
+
+        (events, result), (_, failure) = self.loop.run_until_complete(runBoth())
+        self.assertEquals([event.kind for event in events],
+                          ['partial', 'read_request', 'log'])
+        self.assertEquals(events[2].body, END_OF_INPUT)
+        self.assertEquals(result, ('a', 'full'))
+        self.assertTrue(isinstance(failure, ValueError))
+
+
+if __name__ == '__main__':
+    unittest.main()
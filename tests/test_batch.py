@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import os
+import shutil
+import tempfile
+import StringIO
+from pygobstones.batch import *
+from workers import ReadingWorker, FailingWorker, HangingWorker, threadPool
+
+
+class CollectingImages(object):
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, record):
+        self.submitted.append(record['final_board'])
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.program = self.writeFile('program.gbs', 'program {}')
+        self.board = self.writeFile('board.gbb',
+                                    'GBB/1.0\nsize 2 2\nhead 0 0\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, name, content):
+        filename = os.path.join(self.directory, name)
+        with open(filename, 'w') as f:
+            f.write(content)
+        return filename
+
+    def test_expand_GivenOverlappingGlobs_andReturnEachPathOnce(self):
+        '''Paths matched by several globs are run once'''
+        self.assertEquals(expand([os.path.join(self.directory, '*'),
+                                  os.path.join(self.directory, '*.gbs')]),
+                          [self.board, self.program])
+
+    def test_run_task_GivenAReadRequest_andAnswerEndOfInput(self):
+        '''Reads get the end of input keycode and the run finishes'''
+        record = run_task((self.program, self.board, 'full', 'gobstones'),
+                          threadPool(ReadingWorker))
+        self.assertEquals(record['status'], 'ok')
+        self.assertEquals(record['log'], ['program {}'])
+        self.assertEquals(record['result'], [('key', END_OF_INPUT)])
+        self.assertEquals(record['final_board'],
+                          'GBB/1.0\nsize 2 2\nhead 0 0\n')
+
+    def test_run_task_GivenAFailure_andRecordItsTypeAndMessage(self):
+        '''Failures are recorded with the exception class name'''
+        record = run_task((self.program, self.board, 'full', 'gobstones'),
+                          threadPool(FailingWorker))
+        self.assertEquals(record['status'], 'failure')
+        self.assertEquals(record['failure'],
+                          {'type': 'ValueError', 'kind': 'other',
+                           'message': 'boom'})
+
+    def test_run_task_GivenAMalformedBoard_andRecordAnError(self):
+        '''Boards that cannot be read are reported without running'''
+        board = self.writeFile('bad.gbb', 'size 2 2\nfoo\n')
+        record = run_task((self.program, board, 'full', 'gobstones'),
+                          threadPool(FailingWorker))
+        self.assertEquals(record['status'], 'error')
+        self.assertEquals(record['failure']['type'], 'BoardParseException')
+
+    def test_run_batch_GivenARunawayProgram_andRecordALimitFailure(self):
+        '''Runs over the time limit are killed and reported as limit failures'''
+        out = StringIO.StringIO()
+        pool = create_pool(HangingWorker, size=0)
+        runs, seconds = run_batch(
+            [(self.program, self.board, 'full', 'gobstones')] * 2, out, 2,
+            RunLimits(wall_time=0.2), pool)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEquals(runs, 2)
+        self.assertTrue(seconds < 10)
+        self.assertEquals([record['failure']['kind'] for record in records],
+                          ['limit', 'limit'])
+
+    def test_run_batch_GivenImages_andSubmitTheFinalBoardsOfTheRuns(self):
+        '''Only runs that end have their final board rendered'''
+        images = CollectingImages()
+        out = StringIO.StringIO()
+        run_batch([(self.program, self.board, 'full', 'gobstones')], out, 1,
+                  pool=threadPool(ReadingWorker), images=images)
+        run_batch([(self.program, self.board, 'full', 'gobstones')], out, 1,
+                  pool=threadPool(FailingWorker), images=images)
+        self.assertEquals(images.submitted, ['GBB/1.0\nsize 2 2\nhead 0 0\n'])
+
+    def test_image_name_GivenPathsInDirectories_andFlattenThem(self):
+        '''Programs with the same name in different directories get
+           different images'''
+        self.assertEquals(image_name(os.path.join('alice', 'main.gbs'),
+                                     os.path.join('boards', 'b1.gbb'), 'png'),
+                          'alice_main--boards_b1.png')
+        self.assertNotEquals(image_name(os.path.join('bob', 'main.gbs'),
+                                        'b1.gbb', 'svg'),
+                             image_name(os.path.join('alice', 'main.gbs'),
+                                        'b1.gbb', 'svg'))
+
+
+if __name__ == '__main__':
+    unittest.main()
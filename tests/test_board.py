@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from gui.views.boardPrint.board import *
+from gui.views.boardPrint.parseBoard import *
+
+
+class TestArrayBoard(unittest.TestCase):
+
+    def setUp(self):
+        self.board = ArrayBoard((4, 3), {(1, 2): Cell(1, 2, 3, 4)}, (0, 0))
+
+    def test_getCell_GivenACellWithStones_andReturnItsStones(self):
+        '''Given a board with a cell in (1, 2) should return its stones'''
+        cell = self.board.getCell(1, 2)
+        self.assertEquals([cell.getStones(c) for c in COLORS], [1, 2, 3, 4])
+
+    def test_isEmptyCell_GivenACellWithoutStones_andReturnTrue(self):
+        '''A cell without stones is an empty cell'''
+        self.assertTrue(self.board.isEmptyCell(3, 2))
+        self.assertFalse(self.board.isEmptyCell(1, 2))
+
+    def test_putAndQuitStone_GivenAColor_andUpdateTheCount(self):
+        '''Putting and quitting stones changes only the given color'''
+        self.board.putStoneOfColorOnCell('red', (3, 0))
+        self.board.putStoneOfColorOnCell('red', (3, 0))
+        self.board.quitStoneOfColorOnCell('red', (3, 0))
+        self.board.quitStoneOfColorOnCell('blue', (3, 0))
+        self.assertEquals(self.board.getStonesOfColorOnCell('red', (3, 0)), 1)
+        self.assertEquals(self.board.getStonesOfColorOnCell('blue', (3, 0)), 0)
+
+    def test_cells_GivenABoard_andReturnOnlyTheCellsWithStones(self):
+        '''The cells attribute is a snapshot of the non empty cells'''
+        self.assertEquals(list(self.board.cells.keys()), [(1, 2)])
+        self.assertEquals(self.board.cells[(1, 2)].getStones('green'), 4)
+
+    def test_setSize_GivenABiggerSize_andKeepTheStones(self):
+        '''Growing the board keeps the stones in the same coordinates'''
+        self.board.setSize(6, 6)
+        self.assertEquals(self.board.getStonesOfColorOnCell('black', (1, 2)), 2)
+        self.assertEquals(len(self.board.stones), 4 * 6 * 6)
+
+    def test_countStones_GivenAColor_andReturnTheTotalOnTheBoard(self):
+        '''Should count the stones of a color on the whole board'''
+        self.board.putStoneOfColorOnCell('green', (0, 0))
+        self.assertEquals(self.board.countStones('green'), 5)
+
+    def test_getCell_GivenAnOutOfBoundsCell_andRaiseIndexError(self):
+        '''Cells out of the board raise IndexError'''
+        self.assertRaises(IndexError, self.board.getCell, 4, 0)
+
+    def test_parseABoardString_GivenArrayBoardClass_andReturnAnArrayBoard(self):
+        '''The parser can build an ArrayBoard'''
+        board = parseABoardString(
+            'size 6 6\ncell 0 4 Azul 1 Negro 3 Verde 1\nhead 4 2\n%%\n',
+            ArrayBoard)
+        self.assertEquals(board.getStonesOfColorOnCell('black', (0, 4)), 3)
+        self.assertEquals(board.getHeadPosition(), (4, 2))
+
+
+class TestCell(unittest.TestCase):
+
+    def test_getStones_GivenANameOrAnIndex_andReturnTheSameCount(self):
+        '''Colors can be given by name or by their index in COLORS'''
+        cell = Cell(1, 2, 3, 4)
+        self.assertEquals(cell.getStones('red'), 3)
+        self.assertEquals(cell.getStones(COLOR_INDEX['red']), 3)
+
+    def test_getAllStones_GivenACellChanged_andReturnTheNewStones(self):
+        '''The cached stones strings are refreshed after a change'''
+        cell = Cell(1, 0, 0, 0)
+        self.assertEquals(cell.getAllStones(), ('1', '0', '0', '0'))
+        cell.putStone('green')
+        cell.quitStone('blue')
+        self.assertEquals(cell.getAllStones(), ('0', '0', '0', '1'))
+        self.assertEquals(cell.getKey(), (0, 0, 0, 1))
+
+    def test_stones_GivenACell_andReturnADictionaryByColorName(self):
+        '''The stones attribute keeps the old dictionary shape'''
+        self.assertEquals(Cell(1, 2, 3, 4).stones,
+                          {'blue': 1, 'black': 2, 'red': 3, 'green': 4})
+
+    def test_cell_GivenANewAttribute_andRaiseAttributeError(self):
+        '''Cells have no per instance dictionary'''
+        self.assertRaises(AttributeError, setattr, Cell(), 'other', 1)
+
+
+class TestChangedCells(unittest.TestCase):
+
+    def test_changedCells_GivenTwoArrayBoards_andReturnTheCellsThatDiffer(self):
+        '''Only the cells with different stones are returned'''
+        old = ArrayBoard((4, 3), {(1, 2): Cell(1, 2, 3, 4)}, (0, 0))
+        new = ArrayBoard((4, 3), {(1, 2): Cell(1, 2, 3, 4)}, (1, 0))
+        self.assertEquals(changedCells(old, new), [])
+        new.putStoneOfColorOnCell('green', (3, 0))
+        new.quitStoneOfColorOnCell('red', (1, 2))
+        self.assertEquals(changedCells(old, new), [(1, 2), (3, 0)])
+
+    def test_changedCells_GivenBoardsOfAnyKind_andIgnoreEmptyCells(self):
+        '''Empty cells and missing cells are the same'''
+        old = parseABoardString('size 3 3\ncell 0 0 Azul 0\ncell 2 1 Rojo 2\nhead 0 0\n%%\n')
+        new = ArrayBoard((3, 3), {(2, 1): Cell(0, 0, 2, 0), (1, 1): Cell(1)}, (0, 0))
+        self.assertEquals(changedCells(old, new), [(1, 1)])
+
+    def test_changedCells_GivenHugeSparseBoards_andLookOnlyAtTheirCells(self):
+        '''Boards of cells are compared by their cells, not their grid'''
+        old = Board((10 ** 6, 10 ** 6), {(5, 7): Cell(1), (9, 9): Cell(2)}, (0, 0))
+        new = Board((10 ** 6, 10 ** 6), {(5, 7): Cell(1), (0, 3): Cell(0, 1)}, (0, 0))
+        self.assertEquals(changedCells(old, new), [(0, 3), (9, 9)])
+
+    def test_changedCells_GivenBoardsOfDifferentSizes_andReturnNone(self):
+        '''Boards of different sizes cannot be compared cell by cell'''
+        self.assertEquals(changedCells(ArrayBoard((2, 2), {}, (0, 0)),
+                                       ArrayBoard((2, 3), {}, (0, 0))), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pygobstones.language.boardSuite import *
+import pygobstones.gui.views.boardPrint.parseBoard as parseBoard
+from workers import ReadingWorker, HangingWorker, threadPool
+
+BOARD = 'GBB/1.0\nsize 2 2\nhead 0 0\n'
+
+
+class TestBoardSuite(unittest.TestCase):
+
+    def runSuite(self, worker_class, boards, cancel=False):
+        outcomes = []
+        finished = threading.Event()
+        suite = SuiteRun('gobstones', threadPool(worker_class), jobs=2)
+        suite.run('f.gbs', 'program', boards, outcomes.append, finished.set,
+                  'full')
+        if cancel:
+            time.sleep(0.1)
+            suite.cancel()
+        self.assertTrue(finished.wait(10))
+        return sorted(outcomes, key=lambda outcome: outcome.index)
+
+    def test_run_GivenASuite_andGetAnOutcomePerBoard(self):
+        '''Every board gets its outcome, reads get the end of input'''
+        outcomes = self.runSuite(ReadingWorker, [
+            ('a.gbb', BOARD),
+            ('b.gbb', 'GBB/1.0\nsize 2 2\nhead 1 1\n'),
+            ('c.gbb', 'not a board')])
+        self.assertEquals([o.status for o in outcomes],
+                          [SuiteOutcome.OK, SuiteOutcome.FAILURE,
+                           SuiteOutcome.ERROR])
+        self.assertEquals(outcomes[0].result, [('key', END_OF_INPUT)])
+        self.assertEquals(outcomes[1].exception.args, ('boom',))
+
+    def test_cancel_GivenHangingRuns_andInterruptThem(self):
+        '''Cancelling a suite interrupts the boards that are running'''
+        outcomes = self.runSuite(HangingWorker,
+                                 [('%d.gbb' % i, BOARD) for i in range(4)],
+                                 cancel=True)
+        self.assertEquals([o.status for o in outcomes],
+                          [SuiteOutcome.CANCELLED] * 4)
+
+    def test_boards_from_directory_GivenADirectory_andReadItsBoards(self):
+        '''Only .gbb files are read, sorted by name'''
+        directory = tempfile.mkdtemp()
+        try:
+            for name in ['b.gbb', 'a.gbb', 'notes.txt']:
+                with open(os.path.join(directory, name), 'w') as f:
+                    f.write(BOARD)
+            self.assertEquals(boards_from_directory(directory),
+                              [('a.gbb', BOARD), ('b.gbb', BOARD)])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_random_boards_GivenACount_andMakeValidBoards(self):
+        '''Random boards are GBB text the parser accepts'''
+        boards = random_boards(3)
+        self.assertEquals(len(boards), 3)
+        for name, board in boards:
+            parseBoard.parseABoardString(board)
+
+
+if __name__ == '__main__':
+    unittest.main()
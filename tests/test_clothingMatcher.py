@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import os
+import unittest
+from gui.views.boardPrint.clothingMatcher import *
+from gui.views.boardPrint.parseXML import ParseXML
+
+
+class TestClothingMatcher(unittest.TestCase):
+
+    def test_match_GivenAnExactPattern_andReturnItsImage(self):
+        '''Counts are matched against the patterns as strings'''
+        matcher = ClothingMatcher([(('1', '0', '0', '0'), 'one.png'),
+                                   (('2', '0', '0', '0'), 'two.png')])
+        self.assertEquals(matcher.match((2, 0, 0, 0)), 'two.png')
+        self.assertEquals(matcher.match((3, 0, 0, 0)), None)
+
+    def test_match_GivenWildcards_andMatchAnyOrPositiveCounts(self):
+        '''* matches any count and + any count but zero'''
+        matcher = ClothingMatcher([(('+', '0', '*', '0'), 'blue.png')])
+        self.assertEquals(matcher.match((1, 0, 0, 0)), 'blue.png')
+        self.assertEquals(matcher.match((7, 0, 3, 0)), 'blue.png')
+        self.assertEquals(matcher.match((0, 0, 3, 0)), None)
+        self.assertEquals(matcher.match((1, 1, 0, 0)), None)
+
+    def test_match_GivenOverlappingRules_andReturnTheFirstOne(self):
+        '''Exact and wildcard rules are tried in the order of the file'''
+        matcher = ClothingMatcher([(('*', '0', '0', '0'), 'any.png'),
+                                   (('1', '0', '0', '0'), 'one.png'),
+                                   (('2', '+', '*', '*'), 'two.png'),
+                                   (('2', '1', '0', '0'), 'unused.png')])
+        self.assertEquals(matcher.match((1, 0, 0, 0)), 'any.png')
+        self.assertEquals(matcher.match((2, 1, 0, 0)), 'two.png')
+
+    def test_match_GivenARepeatedPattern_andKeepTheLastImage(self):
+        '''A repeated pattern overrides the image of the first one'''
+        matcher = ClothingMatcher([(('0', '0', '0', '0'), 'empty.png'),
+                                   (('+', '*', '*', '*'), 'blue.png'),
+                                   (('0', '0', '0', '0'), 'floor.png')])
+        self.assertEquals(matcher.match((0, 0, 0, 0)), 'floor.png')
+
+    def test_match_GivenAnExampleClothing_andAgreeWithItsRules(self):
+        '''The rules of a clothing file are read in order'''
+        clothing = os.path.join(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))), 'examples', 'Zilfost', 'Vestimentas',
+            'zilfost-romano.xml')
+        rules = ParseXML().getRulesFromXML(clothing)
+        matcher = ClothingMatcher(rules)
+        self.assertEquals(matcher.match((0, 0, 0, 0)), 'fondo.png')
+        self.assertEquals(matcher.match((4, 0, 0, 0)), 'piso.png')
+        self.assertEquals(len(ParseXML().getDictFromXML(clothing)),
+                          len(set(pattern for pattern, image in rules)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from gui.views.boardPrint.clothingRegistry import *
+
+RULE = '''<Cell><Blue>%s</Blue><Black>0</Black><Red>0</Red><Green>0</Green>
+<Image>%s</Image></Cell>'''
+
+
+class TestClothingRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'Imagenes'))
+        self.clothing = os.path.join(self.directory, 'clothing.xml')
+        self.changed = []
+        self.registry = ClothingRegistry(self.changed.append)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def writeClothing(self, rules, mtime):
+        with open(self.clothing, 'w') as f:
+            f.write('<BoardCoding>%s</BoardCoding>' %
+                    ''.join(RULE % rule for rule in rules))
+        os.utime(self.clothing, (mtime, mtime))
+
+    def writeImage(self, name, mtime):
+        path = os.path.join(self.directory, 'Imagenes', name)
+        with open(path, 'w') as f:
+            f.write('')
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_get_GivenAnUnchangedFile_andParseItOnce(self):
+        '''The same clothing is answered until its file changes'''
+        self.writeClothing([('1', 'one.png')], 1000)
+        clothing = self.registry.get(self.clothing)
+        self.assertTrue(self.registry.get(self.clothing) is clothing)
+        self.writeClothing([('1', 'other.png')], 2000)
+        self.assertFalse(self.registry.get(self.clothing) is clothing)
+
+    def test_image_GivenAMissingFile_andReturnNone(self):
+        '''Only images whose files exist are given'''
+        self.writeClothing([('1', 'one.png'), ('+', 'many.png')], 1000)
+        path = self.writeImage('many.png', 1000)
+        clothing = self.registry.get(self.clothing)
+        self.assertEquals(clothing.image((1, 0, 0, 0)), None)
+        self.assertEquals(clothing.image((2, 0, 0, 0)), path)
+        self.assertEquals(clothing.image((0, 0, 0, 0)), None)
+
+    def test_get_GivenAChangedImage_andReportIt(self):
+        '''Images are looked at again on every get'''
+        self.writeClothing([('1', 'one.png')], 1000)
+        self.registry.get(self.clothing)
+        del self.changed[:]
+        self.registry.get(self.clothing)
+        self.assertEquals(self.changed, [])
+        path = self.writeImage('one.png', 3000)
+        clothing = self.registry.get(self.clothing)
+        self.assertEquals(self.changed, [path])
+        self.assertEquals(clothing.image((1, 0, 0, 0)), path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import Queue as queue
+import pygobstones.commons.concurrent as concurrent
+from pygobstones.commons.messaging import *
+
+
+class TestMessageReader(unittest.TestCase):
+
+    def setUp(self):
+        self.communicator = MessageCommunicator(concurrent.Queue(),
+                                                concurrent.Queue())
+        self.readers = []
+
+    def tearDown(self):
+        for reader in self.readers:
+            reader.stop()
+            reader.join()
+
+    def startReader(self, *args, **kwargs):
+        reader = MessageReader(self.communicator, *args, **kwargs)
+        self.readers.append(reader)
+        reader.start()
+        return reader
+
+    def test_run_GivenSentMessages_andCallBackInOrder(self):
+        '''Every message is handed to the callback in the order it was sent'''
+        received = []
+
+        def callback(message):
+            received.append(message.body)
+            if message.header == 'OK':
+                reader.stop()
+
+        reader = self.startReader(callback)
+        worker = self.communicator.opposite()
+        worker.send('LOG', 1)
+        worker.send('LOG', 2)
+        worker.send('OK', 3)
+        reader.join(5)
+        self.assertEquals(received, [1, 2, 3])
+
+    def test_stop_GivenNoMessages_andFinishTheThread(self):
+        '''A stopped reader finishes even if nothing arrives'''
+        reader = self.startReader(None, 0.01)
+        reader.stop()
+        reader.join(5)
+        self.assertFalse(reader.is_alive())
+
+    def test_run_GivenALastMessage_andFinishTheThread(self):
+        '''A reader ends by itself after a message it reads until'''
+        received = []
+        reader = self.startReader(received.append, until=('OK',))
+        worker = self.communicator.opposite()
+        worker.send('LOG', 1)
+        worker.send('OK', 2)
+        reader.join(5)
+        self.assertFalse(reader.is_alive())
+        self.assertEquals([message.body for message in received], [1, 2])
+
+
+def echo(communicator):
+    message = communicator.receive()
+    communicator.send(message.header, message.body)
+
+
+class TestChannels(unittest.TestCase):
+
+    def test_MessageCommunicator_GivenNoQueues_andCreateItsOwn(self):
+        '''Communicators created without queues do not share them'''
+        first = MessageCommunicator()
+        second = MessageCommunicator()
+        first.opposite().send('LOG', 'first')
+        self.assertRaises(queue.Empty, second.receive, 0.05)
+        self.assertEquals(first.receive(5).body, 'first')
+
+    def test_create_channel_GivenEachTransport_andEchoFromAnotherProcess(self):
+        '''Every transport carries messages to and from a process'''
+        for transport in [QUEUE, PIPE, SHARED_MEMORY]:
+            communicator = create_channel(transport, threshold=4)
+            process = concurrent.Process(target=echo,
+                                         args=(communicator.opposite(),))
+            process.start()
+            communicator.send('OK', ('board' * 1000, None))
+            self.assertEquals(communicator.receive(5).body,
+                              ('board' * 1000, None))
+            process.join()
+
+    def test_receive_GivenATimeoutAndNoMessages_andRaiseEmpty(self):
+        '''Receiving with a timeout raises Queue.Empty on every transport'''
+        for transport in [QUEUE, PIPE, SHARED_MEMORY]:
+            communicator = create_channel(transport)
+            self.assertRaises(queue.Empty, communicator.receive, 0.01)
+
+    def test_SharedRing_GivenPayloadsAroundTheEnd_andReadThemBack(self):
+        '''Payloads that wrap around the ring are read back whole'''
+        ring = SharedRing(10)
+        ring.read(ring.write('abcdef'))
+        payload = ring.write('ghijklm')
+        self.assertEquals(ring.read(payload), 'ghijklm')
+
+    def test_SharedMemoryCommunicator_GivenAFullRing_andSendInline(self):
+        '''Payloads that do not fit in the ring go through the queue'''
+        communicator = SharedMemoryCommunicator(capacity=8, threshold=4)
+        worker = communicator.opposite()
+        worker.send('PARTIAL', 'board')
+        worker.send('PARTIAL', 'other board')
+        self.assertEquals(communicator.receive(5).body, 'board')
+        self.assertEquals(communicator.receive(5).body, 'other board')
+
+
+if __name__ == '__main__':
+    unittest.main()
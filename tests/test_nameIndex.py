@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from pygobstones.language.nameIndex import *
+
+
+class CountingParser(object):
+
+    def __init__(self):
+        self.parsed = []
+
+    def __call__(self, filename, text):
+        self.parsed.append(os.path.basename(filename))
+        if 'broken' in text:
+            raise ValueError('Syntax error')
+        return dict((word, {'type': 'procedure', 'parameters': []})
+                    for word in text.split())
+
+
+class TestNameIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.program = os.path.join(self.directory, 'program.gbs')
+        self.parser = CountingParser()
+        self.index = NameIndex(self.parser)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def writeLibrary(self, text):
+        with open(os.path.join(self.directory, 'Biblioteca.gbs'), 'w') as f:
+            f.write(text)
+
+    def test_names_GivenTheSameText_andParseItOnce(self):
+        '''The names of a text are cached by its hash'''
+        self.index.names(self.program, 'Foo')
+        self.index.names(self.program, 'Bar')
+        names = self.index.names(self.program, 'Foo')
+        self.assertEquals(sorted(names.keys()), ['Foo'])
+        self.assertEquals(self.parser.parsed, ['program.gbs', 'program.gbs'])
+
+    def test_names_GivenALibrary_andParseItUntilItChanges(self):
+        '''The library is parsed on its own once per version of its text'''
+        self.writeLibrary('Lib')
+        self.index.names(self.program, 'Foo')
+        self.index.names(self.program, 'Bar')
+        self.writeLibrary('Lib Other')
+        names = self.index.names(self.program, 'Bar')
+        self.assertEquals(sorted(names.keys()), ['Bar', 'Lib', 'Other'])
+        self.assertEquals(self.parser.parsed.count('Biblioteca.gbs'), 2)
+
+    def test_names_GivenAProgramThatDoesNotParse_andRaise(self):
+        '''Program failures reach the caller'''
+        self.assertRaises(ValueError, self.index.names, self.program, 'broken')
+
+    def test_NameParser_GivenARequest_andAnswerFromItsThread(self):
+        '''Names are handed to the success callback'''
+        answered = []
+        done = threading.Event()
+        parser = NameParser(self.index, lambda names: (answered.append(names),
+                                                       done.set()),
+                            lambda exception: done.set())
+        parser.start()
+        parser.request(self.program, 'Foo')
+        self.assertTrue(done.wait(5))
+        parser.stop()
+        parser.join(5)
+        self.assertEquals(sorted(answered[0].keys()), ['Foo'])
+        self.assertFalse(parser.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,13 @@
 
 import unittest
 import sys
+import os
+import tempfile
+from StringIO import StringIO
+from array import array
 sys.path.append('../gui/views/boardPrint/')
 from gui.views.boardPrint.parseBoard import *
+from gui.views.boardPrint.board import ArrayBoard, InitialBoardGenerator
 
 
 class TestParseBoard(unittest.TestCase):
@@ -70,6 +75,68 @@ class TestParseBoard(unittest.TestCase):
         board = parseABoardString('size 6 6\nhead 4 2\n%%\n')
         self.assertEquals(board.cells, {})
 
+    def test_parseABoardString_GivenWindowsLineEndings_andParseTheCells(self):
+        '''Given a board with "\\r\\n" line endings and a GBB header should
+        parse it as if it had "\\n" line endings'''
+        board = parseABoardString(
+            'GBB/1.0\r\nsize 6 6\r\ncell 2 3 Rojo 7\r\nhead 4 2\r\n%%\r\n')
+        self.assertEquals(board.getCell(2, 3).getStones("red"), 7)
+        self.assertEquals(board.getHeadPosition(), (4, 2))
+
+    def test_parseABoardString_GivenAWorkerFinalBoard_andParseIt(self):
+        '''Given a final board as the worker sends it, with cells listing
+        every color, blank lines and a trailing newline, should parse it'''
+        board = parseABoardString(
+            'GBB/1.0\nsize 3 2\n'
+            'cell 0 0 Azul 1 Negro 0 Rojo 0 Verde 2\n'
+            'cell 2 1 Azul 0 Negro 3 Rojo 0 Verde 0\n'
+            'head 2 1\n%%\n\n')
+        self.assertEquals(board.size, (3, 2))
+        self.assertEquals(board.getCell(0, 0).getAllStones(),
+                          ('1', '0', '0', '2'))
+        self.assertEquals(board.getCell(2, 1).getStones("black"), 3)
+        self.assertEquals(board.getHeadPosition(), (2, 1))
+
+    def test_parseABoardString_GivenAnUnknownKeyword_andRaiseWithPosition(self):
+        '''Given a "size 6 6 hed 4 2" should raise a BoardParseException
+        pointing to line 2, column 1'''
+        with self.assertRaises(BoardParseException) as context:
+            parseABoardString('size 6 6\nhed 4 2\n%%\n')
+        self.assertEquals((context.exception.line, context.exception.column),
+                          (2, 1))
+
+    def test_parseABoardString_GivenABadColor_andRaiseWithPosition(self):
+        '''Given a "cell 0 4 Azul 1 Rosa 3" should raise a BoardParseException
+        pointing to the column of "Rosa"'''
+        with self.assertRaises(BoardParseException) as context:
+            parseABoardString('size 6 6\ncell 0 4 Azul 1 Rosa 3\nhead 4 2\n')
+        self.assertEquals((context.exception.line, context.exception.column),
+                          (2, 17))
+
+    def test_parseABoardString_GivenAMissingQuantity_andRaiseWithPosition(self):
+        '''Given a "cell 0 4 Azul" should raise a BoardParseException
+        pointing to the end of the line'''
+        with self.assertRaises(BoardParseException) as context:
+            parseABoardString('size 6 6\ncell 0 4 Azul\nhead 4 2\n')
+        self.assertEquals((context.exception.line, context.exception.column),
+                          (2, 14))
+
+    def test_parseABoardString_GivenAnIndentedCell_andParseItLikeTheOthers(self):
+        '''Given a cell line with leading spaces should read it, and point
+        to the columns of the line as it was written'''
+        board = parseABoardString('size 6 6\n  cell 0 4 Rojo 2\nhead 4 2\n')
+        self.assertEquals(board.getCell(0, 4).getStones("red"), 2)
+        with self.assertRaises(BoardParseException) as context:
+            parseABoardString('size 6 6\n  cell 0 4 Rosa 2\nhead 4 2\n')
+        self.assertEquals((context.exception.line, context.exception.column),
+                          (2, 12))
+
+    def test_parseABoardString_GivenLinesAfterTheEnd_andIgnoreThem(self):
+        '''Given a board followed by text after "%%" should ignore that
+        text'''
+        board = parseABoardString('size 6 6\nhead 4 2\n%%\nnot a board\n')
+        self.assertEquals(board.getHeadPosition(), (4, 2))
+
     ## Tests of evaluate
 
     def test_evaluate_GivenSize_30_4_andSetTheSize(self):
@@ -89,6 +156,17 @@ class TestParseBoard(unittest.TestCase):
         evaluate(line, board)
         self.assertEquals(board.getHeadPosition(), (10, 2))
 
+    def test_evaluate_GivenASizeWithoutNumbers_andRaise(self):
+        '''Given a string "size x 4" should raise a BoardParseException'''
+        board = Board(None, None, {})
+        self.assertRaises(BoardParseException, evaluate, 'size x 4', board)
+
+    def test_processQuantity_GivenNoNumber_andRaise(self):
+        '''Given a string that does not start with a number should raise a
+        BoardParseException'''
+        self.assertEquals(processQuantity('42 Azul'), (2, 42))
+        self.assertRaises(BoardParseException, processQuantity, 'Azul 42')
+
     # Tests of generateStones
 
     def test_generateStones_GivenAzul5_andReturnAListWith_5_0_0_0(self):
@@ -140,5 +218,197 @@ class TestParseBoard(unittest.TestCase):
             res = generateStones('Azul 20 Negro 30 Rojo 40 Verde 50')
             self.assertEquals(res, [20, 30, 40, 50])
 
+    # Tests of boardToString
+
+    def test_boardToString_GivenABoard_andWriteTheCellsSortedByPosition(self):
+        '''Given a board with cells inserted in any order should write the
+        cells with stones sorted by position'''
+        board = Board((3, 2), {}, (1, 1))
+        board.addCell((2, 0), Cell(0, 0, 0, 1))
+        board.addCell((0, 1), Cell(1, 2, 3, 4))
+        self.assertEquals(boardToString(board),
+                          'GBB/1.0\nsize 3 2\n'
+                          'cell 0 1 Azul 1 Negro 2 Rojo 3 Verde 4\n'
+                          'cell 2 0 Azul 0 Negro 0 Rojo 0 Verde 1\n'
+                          'head 1 1\n')
+
+    def test_boardToString_GivenNoSkipEmpty_andWriteEveryCell(self):
+        '''Given skipEmpty unset should write every cell of the board,
+        sorted by position'''
+        board = Board((3, 2), {}, (1, 1))
+        board.addCell((2, 0), Cell(0, 0, 0, 1))
+        board.addCell((0, 1), Cell(1, 2, 3, 4))
+        self.assertEquals(boardToString(board, skipEmpty=False),
+                          'GBB/1.0\nsize 3 2\n'
+                          'cell 0 0 Azul 0 Negro 0 Rojo 0 Verde 0\n'
+                          'cell 0 1 Azul 1 Negro 2 Rojo 3 Verde 4\n'
+                          'cell 1 0 Azul 0 Negro 0 Rojo 0 Verde 0\n'
+                          'cell 1 1 Azul 0 Negro 0 Rojo 0 Verde 0\n'
+                          'cell 2 0 Azul 0 Negro 0 Rojo 0 Verde 1\n'
+                          'cell 2 1 Azul 0 Negro 0 Rojo 0 Verde 0\n'
+                          'head 1 1\n')
+
+    def test_boardToString_GivenAnEmptyCell_andLeaveItOut(self):
+        '''Given a board with a stored empty cell should not write that
+        cell'''
+        board = Board((3, 3), {(0, 0): Cell(), (1, 1): Cell(0, 5, 0, 0)}, (0, 0))
+        self.assertEquals(boardToString(board),
+                          'GBB/1.0\nsize 3 3\n'
+                          'cell 1 1 Azul 0 Negro 5 Rojo 0 Verde 0\n'
+                          'head 0 0\n')
+
+    def test_writeBoard_GivenAFile_andWriteTheSameTextAsBoardToString(self):
+        '''Given a file object should stream the same text that
+        boardToString returns'''
+        board = parseABoardString(
+            'size 6 6\ncell 0 4 Azul 1 Negro 3 Verde 1\nhead 4 2\n%%\n')
+        out = StringIO()
+        writeBoard(board, out)
+        self.assertEquals(out.getvalue(), boardToString(board))
+
+    def test_boardToString_GivenAnArrayBoard_andWriteTheSameText(self):
+        '''Given the same board in both representations should write the
+        same text'''
+        text = 'size 6 6\ncell 0 4 Azul 1 Negro 3 Verde 1\ncell 5 0 Rojo 2\nhead 4 2\n'
+        self.assertEquals(boardToString(parseABoardString(text, ArrayBoard)),
+                          boardToString(parseABoardString(text)))
+
+    def test_boardToString_GivenEmptyCells_andWriteTheSameTextForBothClasses(self):
+        '''Given the same board in both representations, with an empty cell
+        stored in one of them, should write the same text with and without
+        skipEmpty'''
+        board = Board((2, 3), {(0, 0): Cell(), (1, 2): Cell(0, 5, 0, 0)}, (1, 0))
+        arrayBoard = ArrayBoard((2, 3), {(1, 2): Cell(0, 5, 0, 0)}, (1, 0))
+        for skipEmpty in [False, True]:
+            self.assertEquals(boardToString(arrayBoard, skipEmpty),
+                              boardToString(board, skipEmpty))
+        self.assertEquals(boardToString(arrayBoard, False).count('cell'), 6)
+
+    def test_boardToString_GivenACellOutOfTheBoard_andLeaveItOut(self):
+        '''Given a board with a cell stored out of its size should write
+        the cells of the board only'''
+        board = Board((2, 2), {(1, 1): Cell(1), (2, 0): Cell(1)}, (0, 0))
+        self.assertEquals(boardToString(board),
+                          'GBB/1.0\nsize 2 2\n'
+                          'cell 1 1 Azul 1 Negro 0 Rojo 0 Verde 0\n'
+                          'head 0 0\n')
+        self.assertEquals(boardToString(board, False).count('cell'), 4)
+
+    def test_iterCells_GivenABoardWithoutSize_andYieldTheStoredCells(self):
+        '''A board whose size line was not read yet has the cells stored
+        so far, and no grid'''
+        board = Board(None, {(3, 1): Cell(0, 2)}, None)
+        self.assertEquals(list(board.iterCells()), [((3, 1), (0, 2, 0, 0))])
+        self.assertEquals(list(board.iterAllCells()), [])
+
+    # Tests of binary boards
+
+    def test_parseABoardBinary_GivenAnEncodedBoard_andReturnTheSameBoard(self):
+        '''Given a board encoded with boardToBinary should decode a board
+        with the same size, head and stones'''
+        text = 'size 6 4\ncell 0 3 Azul 1 Negro 3 Verde 1\ncell 5 0 Rojo 200\nhead 4 2\n'
+        data = boardToBinary(parseABoardString(text))
+        self.assertTrue(isBinaryBoard(data))
+        self.assertEquals(boardToString(parseABoardBinary(data)),
+                          boardToString(parseABoardString(text)))
+
+    def test_boardToBinary_GivenABoard_andWriteLittleEndian32BitCounters(self):
+        '''Given a board should write each stone counter in 4 little-endian
+        bytes, whatever the platform'''
+        board = ArrayBoard((2, 1), {(1, 0): Cell(0, 0, 258, 0)}, (0, 0))
+        data = boardToBinary(board)
+        self.assertEquals(len(data), 24 + 4 * 4 * 2)
+        self.assertEquals(data[24 + 4 * (2 * 2 + 1):][:4], '\x02\x01\x00\x00')
+        self.assertEquals(array(ArrayBoard.TYPECODE).itemsize, 4)
+
+    def test_parseABoardBinary_GivenADictBoardClass_andReturnADictBoard(self):
+        '''Given Board as board class should return a dictionary board'''
+        data = boardToBinary(parseABoardString('size 2 2\ncell 1 1 Verde 2\nhead 0 0\n'))
+        board = parseABoardBinary(data, Board)
+        self.assertEquals(board.cells.keys(), [(1, 1)])
+        self.assertEquals(board.getCell(1, 1).getStones('green'), 2)
+
+    def test_parseABoardBinary_GivenATruncatedBoard_andRaise(self):
+        '''Given a binary board missing stones should raise a
+        BoardParseException'''
+        data = boardToBinary(parseABoardString('size 2 2\nhead 0 0\n'))
+        self.assertRaises(BoardParseException, parseABoardBinary, data[:-4])
+
+    def test_parseABoardBinary_GivenAPartialCounter_andRaise(self):
+        '''Given a binary board whose stones end in the middle of a counter
+        should raise a BoardParseException'''
+        data = boardToBinary(parseABoardString('size 2 2\nhead 0 0\n'))
+        for end in [-1, -2, -3, -5]:
+            self.assertRaises(BoardParseException, parseABoardBinary,
+                              data[:end])
+        self.assertRaises(BoardParseException, parseABoardBinary, data + '\0')
+
+    def test_parseABoard_GivenTextOrBinary_andReturnTheBoard(self):
+        '''parseABoard accepts both formats'''
+        text = 'size 3 3\ncell 1 2 Negro 9\nhead 1 1\n'
+        for data in [text, boardToBinary(parseABoardString(text))]:
+            self.assertEquals(parseABoard(data).getStonesOfColorOnCell('black', (1, 2)), 9)
+
+    # Tests of parseABoardFile
+
+    def writeTemporaryFile(self, data):
+        f = tempfile.NamedTemporaryFile(suffix='.gbb', delete=False)
+        f.write(data)
+        f.close()
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_parseABoardFile_GivenAGbbFile_andParseTheCellsOnFirstAccess(self):
+        '''Given a GBB file should read size and head, and parse the cells
+        only when they are used'''
+        filename = self.writeTemporaryFile(
+            'GBB/1.0\nsize 6 6\ncell 0 4 Azul 1 Negro 3\nhead 4 2\n%%\n')
+        board = parseABoardFile(filename)
+        self.assertEquals((board.size, board.head), ((6, 6), (4, 2)))
+        self.assertEquals(board.loadedCells, None)
+        self.assertEquals(board.getCell(0, 4).getStones("black"), 3)
+
+    def test_parseABoardFile_GivenAMalformedCell_andRaiseWhenParsingCells(self):
+        '''Given a GBB file with a malformed cell should raise once the
+        cells are parsed'''
+        filename = self.writeTemporaryFile(
+            'GBB/1.0\nsize 6 6\ncell 0 4 Azul\nhead 4 2\n%%\n')
+        board = parseABoardFile(filename)
+        self.assertRaises(BoardParseException, board.isEmptyCell, 0, 4)
+
+    def test_parseABoardFile_GivenAMalformedCell_andRaiseAgainOnRetry(self):
+        '''A failed parse of the cells is retried on the next access, from
+        the file as it is then'''
+        filename = self.writeTemporaryFile(
+            'GBB/1.0\nsize 6 6\ncell 0 4 Azul\nhead 4 2\n%%\n')
+        board = parseABoardFile(filename)
+        self.assertRaises(BoardParseException, board.getCells)
+        self.assertRaises(BoardParseException, board.getCells)
+        with open(filename, 'w') as f:
+            f.write('GBB/1.0\nsize 6 6\ncell 0 4 Azul 2\nhead 4 2\n%%\n')
+        self.assertEquals(board.getCell(0, 4).getStones("blue"), 2)
+
+    def test_loadInitialBoard_GivenAMalformedCell_andRaiseWhenUsingIt(self):
+        '''Loading a board file does not parse its cells, a malformed one
+        is reported when the board is used'''
+        filename = self.writeTemporaryFile(
+            'GBB/1.0\nsize 6 6\ncell 0 4 Azul\nhead 4 2\n%%\n')
+        generator = InitialBoardGenerator()
+        generator.loadInitialBoard(filename)
+        self.assertEquals(generator.board.size, (6, 6))
+        self.assertRaises(BoardParseException, generator.getInitialBoard)
+
+    def test_parseABoardFile_GivenAFileWithoutSize_andRaiseWhenLoading(self):
+        '''A board file without a size line is rejected right away'''
+        filename = self.writeTemporaryFile('GBB/1.0\nhead 4 2\n%%\n')
+        self.assertRaises(BoardParseException, parseABoardFile, filename)
+
+    def test_parseABoardFile_GivenABinaryFile_andReturnTheBoard(self):
+        '''Given a binary board file should decode it'''
+        board = parseABoardString('size 3 3\ncell 1 2 Rojo 4\nhead 1 1\n')
+        filename = self.writeTemporaryFile(boardToBinary(board))
+        self.assertEquals(boardToString(parseABoardFile(filename)),
+                          boardToString(board))
+
 if __name__ == '__main__':
     unittest.main()
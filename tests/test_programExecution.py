@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from pygobstones.language.programExecution import *
+import pygobstones.commons.messaging as messaging
+from gui.views.boardPrint.parseBoard import parseABoardString, BoardParseException
+from workers import EchoWorker, GbsRuntimeException, threadPool
+
+
+class RecordingHandler(EjecutionHandler):
+
+    def __init__(self):
+        self.events = []
+
+    def success(self, board_string, result):
+        self.events.append(('success', board_string))
+
+    def failure(self, exception):
+        self.events.append(('failure', exception.__class__.__name__))
+
+    def log(self, message_string):
+        self.events.append(('log', message_string))
+
+
+class FinalBoardHandler(EjecutionFailureHandler, EjecutionHandler):
+
+    def __init__(self):
+        self.served = []
+        super(FinalBoardHandler, self).__init__({
+            EjecutionFailureHandler.BOARD_FAILURE: self.served.append})
+
+    def success(self, board_string, result):
+        try:
+            parseABoardString(board_string)
+        except BoardParseException as exception:
+            self.failure(exception)
+
+
+class TestProgramExecution(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+
+    def test_SyncProgramRun_GivenAProgram_andReturnTheOKBody(self):
+        '''A synchronous run returns the final board and the result'''
+        execution = SyncProgramRun('gobstones', self.handler, pool=threadPool(EchoWorker))
+        self.assertEquals(execution.run('f.gbs', 'program', 'board', 'full'),
+                          ('board', 'full'))
+        self.assertEquals(self.handler.events,
+                          [('log', 'gobstones'), ('success', 'board')])
+        self.assertFalse(execution.running)
+
+    def test_SyncProgramRun_GivenAFailure_andReturnTheException(self):
+        '''Failures are rebuilt and handed to the handler'''
+        execution = SyncProgramRun('gobstones', self.handler, pool=threadPool(EchoWorker))
+        result = execution.run('f.gbs', 'boom', 'board', 'full')
+        self.assertEquals(result.msg, 'Boom')
+        self.assertEquals(self.handler.events[-1],
+                          ('failure', 'GbsRuntimeException'))
+
+    def test_SyncProgramRun_GivenATimeout_andAbortTheRun(self):
+        '''A run that stops answering is aborted'''
+        execution = SyncProgramRun('gobstones', self.handler, pool=threadPool(EchoWorker))
+        result = execution.run('f.gbs', 'hang', 'board', 'full', timeout=0.05)
+        self.assertEquals(str(result), 'Execution interrupted by the user')
+
+    def test_stop_GivenAFinishedRun_andJoinItsReader(self):
+        '''The reader of a run is over once the run is'''
+        execution = SyncProgramRun('gobstones', self.handler,
+                                   pool=threadPool(EchoWorker))
+        execution.start('f.gbs', 'program', 'board', 'full')
+        execution.reader_init(lambda comm, message: None)
+        reader = execution.reader
+        execution.stop()
+        self.assertFalse(reader.is_alive())
+
+    def test_ThreadedProgramRun_GivenAProgram_andWaitForTheResult(self):
+        '''A threaded run can be waited for'''
+        execution = ThreadedProgramRun('xgobstones', self.handler,
+                                       pool=threadPool(EchoWorker))
+        execution.run('f.gbs', 'program', 'board', 'full')
+        self.assertEquals(execution.wait(5), ('board', 'full'))
+        self.assertEquals(self.handler.events[0], ('log', 'xgobstones'))
+
+    def test_cancel_GivenAHangingRun_andFailItInTheSupervisor(self):
+        '''A cancelled run fails like an aborted one'''
+        execution = ThreadedProgramRun('gobstones', self.handler,
+                                       pool=threadPool(EchoWorker))
+        execution.run('f.gbs', 'hang', 'board', 'full')
+        execution.cancel()
+        result = execution.wait(5)
+        self.assertEquals(str(result), 'Execution interrupted by the user')
+        self.assertTrue(execution.cancelled)
+
+    def test_deliver_GivenAMessageOfAPreviousRun_andDropIt(self):
+        '''Messages from the channel of an older run are ignored'''
+        execution = SyncProgramRun('gobstones', self.handler, pool=threadPool(EchoWorker))
+        execution.running = True
+        execution.deliver(object(), messaging.Message('LOG', 'old'))
+        self.assertEquals(self.handler.events, [])
+
+    def test_failure_GivenARuntimeException_andServeTheDynamicHandler(self):
+        '''Failure handlers are chosen by the exception class name'''
+        served = []
+        handler = EjecutionFailureHandler({
+            EjecutionFailureHandler.STATIC_FAILURE: lambda e: served.append('static'),
+            EjecutionFailureHandler.DYNAMIC_FAILURE: lambda e: served.append('dynamic')})
+        handler.failure(GbsRuntimeException('Boom'))
+        self.assertEquals(served, ['dynamic'])
+
+    def test_dispatch_GivenAnUnreadableFinalBoard_andServeTheBoardHandler(self):
+        '''A final board that cannot be read is reported and the run stops'''
+        handler = FinalBoardHandler()
+        execution = SyncProgramRun('gobstones', handler, pool=threadPool(EchoWorker))
+        execution.run('f.gbs', 'program', 'GBB/1.0\nsize x 1\n', 'full')
+        self.assertEquals([e.__class__.__name__ for e in handler.served],
+                          ['BoardParseException'])
+        self.assertFalse(execution.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from pygobstones.language.programExecution import *
+import pygobstones.commons.messaging as messaging
+from workers import LoopingWorker, AllocatingWorker, QuickWorker
+
+
+class RecordingRun(SyncProgramRun):
+
+    def create_worker_process(self):
+        SyncProgramRun.create_worker_process(self)
+        self.started = self.process
+
+
+class TestRunLimits(unittest.TestCase):
+
+    def run_limited(self, worker_class, limits, transport=messaging.QUEUE):
+        execution = RecordingRun('gobstones', limits=limits,
+                                 pool=create_pool(worker_class, size=0,
+                                                  transport=transport))
+        result = execution.run('f.gbs', 'program', 'board', 'full', timeout=30)
+        return execution, result
+
+    def test_calls_GivenAnInfiniteLoop_andFailWithCallLimitException(self):
+        '''The worker counts its calls and fails when it goes over the limit'''
+        execution, result = self.run_limited(LoopingWorker, RunLimits(calls=10000))
+        self.assertTrue(isinstance(result, CallLimitException))
+        self.assertEquals(result.msg, 'Call limit exceeded (10000 calls)')
+
+    def test_wall_time_GivenAnInfiniteLoop_andKillTheWorker(self):
+        '''Going over the wall time fails the run and kills its worker'''
+        execution, result = self.run_limited(LoopingWorker, RunLimits(wall_time=0.1))
+        self.assertTrue(isinstance(result, TimeLimitException))
+        self.assertFalse(execution.started.is_alive())
+
+    def test_wall_time_GivenAPipeChannel_andFailWithoutWritingToIt(self):
+        '''Limit failures are dispatched in the supervisor, so they work on
+        channels that only the worker may write to'''
+        execution, result = self.run_limited(LoopingWorker,
+                                             RunLimits(wall_time=0.1),
+                                             messaging.PIPE)
+        self.assertTrue(isinstance(result, TimeLimitException))
+        self.assertFalse(execution.started.is_alive())
+
+    def test_LimitWatchdog_GivenAnExceededWallTime_andHandTheFailure(self):
+        '''The watchdog hands the limit failure to its callback'''
+        failures = []
+        watchdog = LimitWatchdog(RunLimits(wall_time=0.01), failures.append,
+                                 interval=0.02)
+        watchdog.run()
+        self.assertEquals([f.__class__ for f in failures], [TimeLimitException])
+
+    def test_memory_GivenAWorkerOverTheLimit_andFailWithMemoryLimitException(self):
+        '''The resident memory of the worker process is limited'''
+        execution, result = self.run_limited(AllocatingWorker,
+                                             RunLimits(memory=64 * 2 ** 20))
+        self.assertTrue(isinstance(result, MemoryLimitException))
+
+    def test_limits_GivenARunWithinThem_andSucceed(self):
+        '''Runs within their limits are not affected'''
+        execution, result = self.run_limited(QuickWorker,
+            RunLimits(wall_time=10, calls=10 ** 6, memory=2 ** 30))
+        self.assertEquals(result, ('board', None))
+
+    def test_failure_GivenALimitException_andServeTheLimitHandler(self):
+        '''Limit failures have their own handler, over the dynamic one'''
+        served = []
+        handler = EjecutionFailureHandler({
+            EjecutionFailureHandler.DYNAMIC_FAILURE: lambda e: served.append('dynamic'),
+            EjecutionFailureHandler.LIMIT_FAILURE: lambda e: served.append('limit')})
+        handler.failure(TimeLimitException('Time limit exceeded'))
+        self.assertEquals(served, ['limit'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import logging
+from pygobstones.commons.utils import *
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestLogTime(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.root = logging.getLogger()
+        self.rootLevel = self.root.level
+        self.root.addHandler(self.handler)
+        self.root.setLevel(logging.WARNING)
+
+    def tearDown(self):
+        self.root.removeHandler(self.handler)
+        self.root.setLevel(self.rootLevel)
+        timing_logger().setLevel(logging.NOTSET)
+
+    def test_log_time_GivenTheTimingLoggerAtInfo_andEmitTheTiming(self):
+        '''Timings reach the handlers of the application logger, which only
+        lets warnings through'''
+        timing_logger().setLevel(logging.INFO)
+        with log_time(timing_logger(), 'Parsing'):
+            pass
+        self.assertEquals(len(self.handler.records), 1)
+        record = self.handler.records[0]
+        self.assertEquals((record.name, record.levelno),
+                          (TIMING_LOGGER, logging.INFO))
+        self.assertTrue(record.getMessage().startswith('Parsing: '))
+
+    def test_log_time_GivenALevel_andLogAtIt(self):
+        '''The level of the timing record can be chosen'''
+        with log_time(logging.getLogger('other'), 'Parsing', logging.WARNING):
+            pass
+        self.assertEquals([record.levelno for record in self.handler.records],
+                          [logging.WARNING])
+
+
+if __name__ == '__main__':
+    unittest.main()
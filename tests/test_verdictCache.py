@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import shutil
+import tempfile
+from pygobstones.language.programExecution import *
+from workers import CountingWorker, GbsParserException, threadPool
+
+
+class CheckingRun(SyncProgramRun):
+
+    def is_check(self, run_mode):
+        return run_mode == 'check'
+
+
+class TestVerdictCache(unittest.TestCase):
+
+    def setUp(self):
+        CountingWorker.started = []
+        self.pool = threadPool(CountingWorker)
+
+    def run_program(self, text, run_mode):
+        return CheckingRun('gobstones', pool=self.pool).run(
+            'f.gbs', text, 'board', run_mode)
+
+    def test_key_GivenADifferentLibraryOrVersion_andChange(self):
+        '''Keys depend on the source, the language version and the library'''
+        cache = VerdictCache()
+        key = cache.key('program {}', 'gobstones', '')
+        self.assertEquals(key, cache.key('program {}', 'gobstones', ''))
+        self.assertNotEquals(key, cache.key('program {}', 'xgobstones', ''))
+        self.assertNotEquals(key, cache.key('program {}', 'gobstones', 'a'))
+        self.assertNotEquals(key, cache.key('program {} ', 'gobstones', ''))
+
+    def test_run_GivenAStaticFailureSeenBefore_andDoNotStartAWorker(self):
+        '''Static failures are answered from the cache on any mode'''
+        self.run_program('broken', 'check')
+        result = self.run_program('broken', 'full')
+        self.assertEquals(result.msg, 'Syntax error')
+        self.assertEquals(CountingWorker.started, ['broken'])
+
+    def test_run_GivenACheckedProgram_andRunItOnAWorker(self):
+        '''A check OK is reused by checks but not by full runs'''
+        self.run_program('program {}', 'check')
+        self.assertEquals(self.run_program('program {}', 'check'),
+                          ('board', 'check'))
+        self.run_program('program {}', 'full')
+        self.assertEquals(CountingWorker.started, ['program {}', 'program {}'])
+
+    def test_get_GivenMoreVerdictsThanCapacity_andForgetTheOldest(self):
+        '''Only the newest verdicts are kept in memory'''
+        cache = VerdictCache(capacity=2)
+        for key in ['a', 'b', 'c']:
+            cache.put(key, VerdictCache.CHECKED, key)
+        self.assertEquals(cache.get('a'), None)
+        self.assertEquals(cache.get('c'), ('OK', 'c'))
+
+    def test_get_GivenADirectory_andLoadVerdictsStoredByAnotherCache(self):
+        '''Verdicts kept on disk survive the cache that stored them'''
+        directory = tempfile.mkdtemp()
+        try:
+            VerdictCache(directory).put('key', VerdictCache.FAILED,
+                                        (GbsParserException, ('Syntax error',)))
+            self.assertEquals(VerdictCache(directory).get('key'),
+                              ('FAIL', (GbsParserException, ('Syntax error',))))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import threading
+from pygobstones.language.workerPool import WorkerPool
+from workers import MirrorWorker
+
+
+class FailingPool(WorkerPool):
+
+    def create_worker(self):
+        raise OSError('fork failed')
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(MirrorWorker, size=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_refill_GivenAnEmptyPool_andStartSizeWorkers(self):
+        '''Refilling starts workers until there are size idle ones'''
+        self.pool.refill()
+        self.assertEquals(len(self.pool.idle), 2)
+        self.assertTrue(all(pooled.is_alive() for pooled in self.pool.idle))
+
+    def test_refill_GivenConcurrentRefills_andStartAtMostSizeWorkers(self):
+        '''Refills from several threads share the missing workers'''
+        pool = WorkerPool(MirrorWorker, size=4)
+        self.addCleanup(pool.shutdown)
+        threads = [threading.Thread(target=pool.refill) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(len(pool.idle), 4)
+        self.assertEquals(pool.starting, 0)
+
+    def test_refill_GivenAFailingStart_andGiveBackTheReservations(self):
+        '''Workers that could not be started are not left reserved'''
+        pool = FailingPool(MirrorWorker, size=3)
+        self.assertRaises(OSError, pool.refill)
+        self.assertEquals(pool.starting, 0)
+        self.assertEquals(pool.idle, [])
+
+    def test_background_GivenSomeCalls_andRunThemInOrderOffTheCaller(self):
+        '''Background calls run one after the other in the helper thread,
+        and shutdown waits for them'''
+        calls = []
+
+        def record(name):
+            calls.append((name, threading.current_thread()))
+        self.pool.background(record, 'first')
+        self.pool.background(self.pool.refill)
+        self.pool.background(record, 'second')
+        self.pool.shutdown()
+        self.assertEquals([name for name, thread in calls], ['first', 'second'])
+        self.assertFalse(calls[0][1] is threading.current_thread())
+        self.assertEquals(self.pool.idle, [])
+
+    def test_lease_GivenAnIdleWorker_andRunAProgramOnIt(self):
+        '''A leased worker is already started and answers its START'''
+        self.pool.refill()
+        pooled = self.pool.lease()
+        pooled.comm.send('START', 'program')
+        self.assertEquals(pooled.comm.receive().body, 'program')
+        self.assertEquals(len(self.pool.idle), 1)
+        self.pool.release(pooled)
+
+    def test_lease_GivenADeadIdleWorker_andSkipIt(self):
+        '''Workers that died while idle are never leased'''
+        self.pool.refill()
+        dead = self.pool.idle[0]
+        dead.terminate()
+        dead.process.join()
+        self.assertFalse(self.pool.lease() is dead)
+
+    def test_release_GivenAWorkerThatReachedMaxRuns_andTerminateIt(self):
+        '''Workers are recycled after max_runs programs'''
+        pooled = self.pool.lease()
+        self.pool.release(pooled)
+        pooled.process.join()
+        self.assertFalse(pooled.is_alive())
+        self.assertEquals(self.pool.idle, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
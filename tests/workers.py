@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+'''Fake workers shared by the tests of the program runs. They talk the
+protocol of GobstonesWorker on their communicator without running any
+program, so the runs can be tested without pygobstoneslang.'''
+
+import time
+from pygobstones.language.programExecution import create_pool
+import pygobstones.commons.messaging as messaging
+
+
+class GbsRuntimeException(Exception):
+
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+        self.msg = msg
+
+
+class GbsParserException(Exception):
+
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+        self.msg = msg
+
+
+class FakeWorker(object):
+
+    def __init__(self, communicator):
+        self.communicator = communicator
+
+    def receiveStart(self):
+        '''(filename, text, board, run_mode, version) of the START'''
+        return self.communicator.receive().body
+
+    def read(self):
+        self.communicator.send('READ_REQUEST')
+        return self.communicator.receive().body
+
+
+class EchoWorker(FakeWorker):
+    '''Logs the version and answers the board and the run mode. Fails on
+    the program 'boom' and never answers the program 'hang' '''
+
+    def run(self):
+        filename, text, board, run_mode, version = self.receiveStart()
+        self.communicator.send('LOG', version)
+        if text == 'boom':
+            self.communicator.send('FAIL', (GbsRuntimeException, ('Boom',)))
+        elif text != 'hang':
+            self.communicator.send('OK', (board, run_mode))
+
+
+class ReadingWorker(FakeWorker):
+    '''Logs the program, reads a key and answers the board with the key as
+    result. Fails on boards with the head at 1 1'''
+
+    def run(self):
+        filename, text, board, run_mode, version = self.receiveStart()
+        if 'head 1 1' in board:
+            self.communicator.send('FAIL', (ValueError, ('boom',)))
+            return
+        self.communicator.send('LOG', text)
+        keycode = self.read()
+        self.communicator.send('OK', (board, [('key', keycode)]))
+
+
+class StreamingWorker(FakeWorker):
+    '''Sends the board as a partial one, reads a key and logs it. Fails on
+    the program 'boom' '''
+
+    def run(self):
+        filename, text, board, run_mode, version = self.receiveStart()
+        self.communicator.send('PARTIAL', board)
+        self.communicator.send('LOG', self.read())
+        if text == 'boom':
+            self.communicator.send('FAIL', (ValueError, ('Boom',)))
+        else:
+            self.communicator.send('OK', (board, run_mode))
+
+
+class CountingWorker(FakeWorker):
+    '''Keeps the programs it is started with. Fails with a static failure
+    on the program 'broken' '''
+    started = []
+
+    def run(self):
+        filename, text, board, run_mode, version = self.receiveStart()
+        CountingWorker.started.append(text)
+        if text == 'broken':
+            self.communicator.send('FAIL', (GbsParserException, ('Syntax error',)))
+        else:
+            self.communicator.send('OK', (board, run_mode))
+
+
+class FailingWorker(FakeWorker):
+
+    def run(self):
+        self.receiveStart()
+        self.communicator.send('FAIL', (ValueError, ('boom',)))
+
+
+class QuickWorker(FakeWorker):
+
+    def run(self):
+        self.receiveStart()
+        self.communicator.send('OK', ('board', None))
+
+
+class HangingWorker(FakeWorker):
+
+    def run(self):
+        self.receiveStart()
+        time.sleep(60)
+
+
+class LoopingWorker(FakeWorker):
+
+    def run(self):
+        self.receiveStart()
+        while True:
+            self.step()
+
+    def step(self):
+        pass
+
+
+class AllocatingWorker(FakeWorker):
+
+    def run(self):
+        self.receiveStart()
+        memory = 'x' * (256 * 2 ** 20)
+        time.sleep(60)
+
+
+class MirrorWorker(FakeWorker):
+    '''Answers the body of the first message it gets, whatever it is'''
+
+    def run(self):
+        self.communicator.send('OK', self.communicator.receive().body)
+
+
+def threadPool(worker_class):
+    '''Pool that runs the workers in threads of the test, started on lease'''
+    return create_pool(worker_class, size=0, use_threads=True,
+                       transport=messaging.THREAD)